@@ -11,7 +11,7 @@ from dotenv import load_dotenv
 from pathlib import Path
 
 # 📦 A2A modules from shared common/ folder
-from common.server import A2AServer
+from common.server import A2AServer, AgentScheduler
 from common.types import AgentCard, AgentCapabilities, AgentSkill, MissingAPIKeyError
 from common.utils.push_notification_auth import PushNotificationSenderAuth
 
@@ -30,7 +30,14 @@ logger = logging.getLogger(__name__)
 @click.command()
 @click.option("--host", default="localhost", help="Host to bind the CEBAgent server.")
 @click.option("--port", default=10010, help="Port to serve the CEBAgent.")
-def main(host, port):
+@click.option("--task-db", default=None, envvar="TASK_DB_PATH", help="SQLite file to persist tasks in. Tasks are kept in memory only when unset.")
+@click.option("--async-send", is_flag=True, envvar="ASYNC_SEND", help="Reply to tasks/send as soon as the task is accepted instead of when the agent finishes.")
+@click.option("--max-agent-runs", default=8, envvar="MAX_AGENT_RUNS", help="Maximum agent runs (LLM calls) executing at once.")
+@click.option("--max-agent-queue", default=100, envvar="MAX_AGENT_QUEUE", help="Maximum agent runs waiting for a slot before requests are rejected as busy.")
+@click.option("--push-notification-mode", type=click.Choice(["full", "delta"]), default="full", envvar="PUSH_NOTIFICATION_MODE", help="Send the whole task, or only what changed since the last notification, in each push notification.")
+@click.option("--push-signing-alg", type=click.Choice(["RS256", "ES256", "EdDSA"]), default="RS256", envvar="PUSH_SIGNING_ALG", help="Algorithm push notifications are signed with. ES256 and EdDSA are much cheaper than RS256.")
+@click.option("--push-key-store", default=None, envvar="PUSH_KEY_STORE", help="JSON file to keep push-notification signing keys in across restarts. A new key is generated at each start when unset.")
+def main(host, port, task_db, async_send, max_agent_runs, max_agent_queue, push_notification_mode, push_signing_alg, push_key_store):
     print(f"🚀 Starting CEBAgent server at http://{host}:{port}")
 
 
@@ -59,13 +66,16 @@ def main(host, port):
     )
 
     # Setup push notification signing
-    notification_sender_auth = PushNotificationSenderAuth()
-    notification_sender_auth.generate_jwk()
+    notification_sender_auth = PushNotificationSenderAuth(algorithm=push_signing_alg)
+    if push_key_store:
+        notification_sender_auth.load_keys(push_key_store)
+    else:
+        notification_sender_auth.generate_jwk()
 
     # Create the A2A server
     server = A2AServer(
         agent_card=agent_card,
-        task_manager=AgentTaskManager(agent=CEBAgent(), notification_sender_auth=notification_sender_auth),
+        task_manager=AgentTaskManager(agent=CEBAgent(), notification_sender_auth=notification_sender_auth, task_db_path=task_db, async_send=async_send, agent_scheduler=AgentScheduler(max_concurrency=max_agent_runs, max_queue_size=max_agent_queue), push_notification_mode=push_notification_mode),
         host=host,
         port=port,
     )
@@ -0,0 +1,87 @@
+"""Measures tasks/get latency while the server is flooded with slow
+tasks/send calls, with per-method admission limits effectively off and on.
+
+The sends burn CPU in small steps, like an agent that parses and formats a
+lot between awaits, so without a limit every in-flight send competes with
+tasks/get for the event loop.
+
+Run from agent/backend:
+    python -m benchmarks.bench_admission
+"""
+
+import asyncio
+import time
+
+from benchmarks.utils import EchoTaskManager, report, running_server, timed
+from common.client import A2AClient
+from common.server import AdmissionController
+from common.types import A2AClientHTTPError, SendTaskRequest, SendTaskResponse
+
+PORT = 18806
+SENDS = 400
+GETS = 200
+SEND_STEPS = 20
+STEP_SECONDS = 0.0005
+
+
+class BusyTaskManager(EchoTaskManager):
+    async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
+        for _ in range(SEND_STEPS):
+            deadline = time.perf_counter() + STEP_SECONDS
+            while time.perf_counter() < deadline:
+                pass
+            await asyncio.sleep(0)
+        return await super().on_send_task(request)
+
+
+async def send(client: A2AClient, i: int) -> bool:
+    try:
+        await client.send_task(
+            {
+                "id": f"send-{i}",
+                "message": {"role": "user", "parts": [{"type": "text", "text": "hi"}]},
+            }
+        )
+        return True
+    except A2AClientHTTPError as e:
+        if e.status_code != 503:
+            raise
+        return False
+
+
+async def run(name: str, admission: AdmissionController, port: int):
+    task_manager = BusyTaskManager()
+    async with running_server(task_manager, port, admission=admission) as url:
+        async with A2AClient(url=url) as client:
+            await client.send_task(
+                {
+                    "id": "task-1",
+                    "message": {"role": "user", "parts": [{"type": "text", "text": "hi"}]},
+                }
+            )
+            sends = asyncio.gather(*(send(client, i) for i in range(SENDS)))
+            await asyncio.sleep(0.05)
+            samples = []
+            for _ in range(GETS):
+                samples.append(await timed(client.get_task({"id": "task-1"})))
+            accepted = sum(await sends)
+
+    report(f"{name} tasks/get", samples)
+    print(f"{'':>24}  tasks/send accepted {accepted}/{SENDS}")
+
+
+async def main():
+    await run(
+        "unlimited",
+        AdmissionController(method_limits={"tasks/send": SENDS}, max_queue_wait=60),
+        PORT,
+    )
+    await run(
+        "limited",
+        AdmissionController(method_limits={"tasks/send": 4}, max_queue_wait=60),
+        PORT + 1,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+"""Measures the cost of reading the status of many tasks: one tasks/get
+request per task versus JSON-RPC batches via A2AClient.get_tasks and the
+TaskFetchBatcher used by the host's polling.
+
+Run from agent/backend:
+    python -m benchmarks.bench_batch_get_task
+"""
+
+import asyncio
+import time
+
+from benchmarks.utils import EchoTaskManager, running_server
+from common.client import A2AClient, TaskFetchBatcher
+
+PORT = 18802
+TASKS = 500
+ROUNDS = 5
+
+
+async def measure(name: str, poll):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        responses = await poll()
+        assert all(response.result is not None for response in responses)
+    elapsed = (time.perf_counter() - start) / ROUNDS
+    print(f"{name:>28}: {elapsed * 1e3:8.1f}ms per {TASKS} tasks")
+
+
+async def main():
+    async with running_server(EchoTaskManager(), PORT) as url:
+        async with A2AClient(url=url) as client:
+            payloads = [{"id": f"task-{i}"} for i in range(TASKS)]
+            for payload in payloads:
+                await client.send_task(
+                    {
+                        **payload,
+                        "message": {"role": "user", "parts": [{"type": "text", "text": "hi"}]},
+                    }
+                )
+
+            async def sequential():
+                return [await client.get_task(payload) for payload in payloads]
+
+            async def concurrent():
+                return await asyncio.gather(*(client.get_task(p) for p in payloads))
+
+            batcher = TaskFetchBatcher(client)
+
+            async def batched_polls():
+                return await asyncio.gather(*(batcher.get_task(p) for p in payloads))
+
+            await measure("sequential tasks/get", sequential)
+            await measure("concurrent tasks/get", concurrent)
+            await measure("get_tasks (batches of 100)", lambda: client.get_tasks(payloads))
+            await measure("TaskFetchBatcher", batched_polls)
+            await batcher.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
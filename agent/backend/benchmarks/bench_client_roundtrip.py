@@ -0,0 +1,49 @@
+"""Measures host -> agent round-trip latency of A2AClient calls with a
+fresh httpx.AsyncClient per call versus the client's pooled connection.
+
+Run from agent/backend:
+    python -m benchmarks.bench_client_roundtrip
+"""
+
+import asyncio
+
+import httpx
+
+from benchmarks.utils import EchoTaskManager, report, running_server, timed
+from common.client import A2AClient
+from common.types import GetTaskRequest
+
+PORT = 18801
+CALLS = 500
+
+
+async def unpooled_get_task(url: str, payload: dict):
+    # What A2AClient._send_request used to do for every call.
+    async with httpx.AsyncClient() as client:
+        response = await client.post(
+            url, json=GetTaskRequest(params=payload).model_dump(), timeout=5000
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+async def main():
+    async with running_server(EchoTaskManager(), PORT) as url:
+        async with A2AClient(url=url) as client:
+            await client.send_task(
+                {
+                    "id": "task-1",
+                    "message": {"role": "user", "parts": [{"type": "text", "text": "hi"}]},
+                }
+            )
+            payload = {"id": "task-1"}
+
+            unpooled = [await timed(unpooled_get_task(url, payload)) for _ in range(CALLS)]
+            pooled = [await timed(client.get_task(payload)) for _ in range(CALLS)]
+
+    report("new client per call", unpooled)
+    report("pooled client", pooled)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
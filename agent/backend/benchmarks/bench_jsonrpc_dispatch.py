@@ -0,0 +1,90 @@
+"""Compares the A2AServer request decode/encode path before and after the
+per-method dispatch table.
+
+Run from agent/backend:
+    python -m benchmarks.bench_jsonrpc_dispatch
+"""
+
+import json
+import timeit
+
+from common.server.utils import encode_json_rpc_response
+from common.types import (
+    A2A_REQUEST_ADAPTERS,
+    A2ARequest,
+    JSONRPCRequestHeaderAdapter,
+    Message,
+    SendTaskRequest,
+    SendTaskResponse,
+    Task,
+    TaskStatus,
+    TaskState,
+    TextPart,
+)
+
+ITERATIONS = 20000
+
+
+def _sample_request_body() -> bytes:
+    message = Message(role="user", parts=[TextPart(text="Any power cuts in Colombo today?")])
+    request = SendTaskRequest(
+        params={
+            "id": "task-1",
+            "sessionId": "session-1",
+            "message": message,
+            "acceptedOutputModes": ["text", "text/plain"],
+            "metadata": {"conversation_id": "session-1"},
+        }
+    )
+    return request.model_dump_json().encode()
+
+
+def _sample_response() -> SendTaskResponse:
+    history = [
+        Message(role="user" if i % 2 == 0 else "agent", parts=[TextPart(text=f"turn {i}")])
+        for i in range(10)
+    ]
+    task = Task(
+        id="task-1",
+        sessionId="session-1",
+        status=TaskStatus(state=TaskState.COMPLETED, message=history[-1]),
+        history=history,
+    )
+    return SendTaskResponse(id="req-1", result=task)
+
+
+def legacy_roundtrip(body: bytes, response: SendTaskResponse) -> bytes:
+    request = A2ARequest.validate_python(json.loads(body))
+    assert request.method == "tasks/send"
+    # Mirrors starlette's JSONResponse.render.
+    return json.dumps(
+        response.model_dump(exclude_none=True),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def fast_roundtrip(body: bytes, response: SendTaskResponse) -> bytes:
+    header = JSONRPCRequestHeaderAdapter.validate_json(body)
+    request = A2A_REQUEST_ADAPTERS[header.method].validate_json(body)
+    assert request.method == "tasks/send"
+    return encode_json_rpc_response(response)
+
+
+def main():
+    body = _sample_request_body()
+    response = _sample_response()
+
+    results = {}
+    for name, fn in (("legacy", legacy_roundtrip), ("fast-path", fast_roundtrip)):
+        seconds = min(timeit.repeat(lambda: fn(body, response), number=ITERATIONS, repeat=5))
+        results[name] = seconds / ITERATIONS * 1e6
+        print(f"{name:>10}: {results[name]:8.2f} us/request")
+
+    print(f"   speedup: {results['legacy'] / results['fast-path']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Measures push-notification signing throughput per core for each signing
+algorithm: key generation time, JWTs signed per second, and JWTs verified
+per second on the receiving side.
+
+Run from agent/backend:
+    python -m benchmarks.bench_push_signing
+"""
+
+import time
+
+import jwt
+from jwt import PyJWK
+
+from common.types import Message, Task, TaskState, TaskStatus, TextPart
+from common.utils.push_notification_auth import (
+    SIGNING_ALGORITHMS,
+    PushNotificationSenderAuth,
+)
+
+DURATION = 2.0
+
+
+def rate(fn, duration: float = DURATION) -> float:
+    count = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < duration:
+        for _ in range(20):
+            fn()
+        count += 20
+    return count / elapsed
+
+
+def main():
+    message = Message(role="agent", parts=[TextPart(text="Scheduled maintenance 9-12.")])
+    payload = Task(
+        id="task-1",
+        sessionId="session-1",
+        status=TaskStatus(state=TaskState.COMPLETED, message=message),
+        history=[message],
+    ).model_dump(exclude_none=True)
+
+    print(f"{'algorithm':<10} {'keygen ms':>10} {'signs/s':>10} {'verifies/s':>11}")
+    for algorithm in SIGNING_ALGORITHMS:
+        auth = PushNotificationSenderAuth(algorithm=algorithm)
+        start = time.perf_counter()
+        auth.generate_jwk()
+        keygen = (time.perf_counter() - start) * 1000
+
+        token = auth._generate_jwt(payload)
+        public_key = PyJWK.from_dict(auth.public_keys[0])
+        signs = rate(lambda: auth._generate_jwt(payload))
+        verifies = rate(lambda: jwt.decode(token, public_key, algorithms=[algorithm]))
+        print(f"{algorithm:<10} {keygen:>10.1f} {signs:>10.0f} {verifies:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
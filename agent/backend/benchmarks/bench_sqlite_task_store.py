@@ -0,0 +1,72 @@
+"""Compares task-store latency of InMemoryTaskManager and SQLiteTaskManager:
+updates (write-behind), cached reads and cold reads from disk.
+
+Run from agent/backend:
+    python -m benchmarks.bench_sqlite_task_store
+"""
+
+import asyncio
+import os
+import tempfile
+
+from benchmarks.utils import EchoTaskManager, report, timed
+from common.server import SQLiteTaskManager
+from common.types import (
+    GetTaskRequest,
+    Message,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+
+TASKS = 1000
+
+
+class SQLiteEchoTaskManager(EchoTaskManager, SQLiteTaskManager):
+    pass
+
+
+async def measure(name: str, manager):
+    message = Message(role="agent", parts=[TextPart(text="Scheduled maintenance 9-12.")])
+    task_ids = [f"task-{i}" for i in range(TASKS)]
+    for task_id in task_ids:
+        await manager.upsert_task(TaskSendParams(id=task_id, message=message))
+
+    updates = [
+        await timed(
+            manager.update_store(
+                task_id, TaskStatus(state=TaskState.COMPLETED, message=message), None
+            )
+        )
+        for task_id in task_ids
+    ]
+    reads = [
+        await timed(manager.on_get_task(GetTaskRequest(params={"id": task_id})))
+        for task_id in task_ids
+    ]
+    report(f"{name} update", updates)
+    report(f"{name} cached read", reads)
+
+    if isinstance(manager, SQLiteTaskManager):
+        await manager.flush()
+        manager.tasks.clear()
+        manager.terminal_tasks.clear()
+        cold_reads = [
+            await timed(manager.on_get_task(GetTaskRequest(params={"id": task_id})))
+            for task_id in task_ids
+        ]
+        report(f"{name} cold read", cold_reads)
+
+    await manager.aclose()
+
+
+async def main():
+    await measure("in-memory", EchoTaskManager())
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "tasks.db")
+        await measure("sqlite", SQLiteEchoTaskManager(db_path=db_path))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+"""Measures the cost of fanning task events out to 1/10/100 SSE subscribers
+when each subscriber serializes every event itself (the old behaviour)
+versus encoding each event once and splicing in the request id.
+
+Run from agent/backend:
+    python -m benchmarks.bench_sse_fanout
+"""
+
+import asyncio
+import time
+
+from benchmarks.utils import EchoTaskManager
+from common.server.task_manager import SSEEvent
+from common.types import (
+    Artifact,
+    Message,
+    SendTaskStreamingResponse,
+    TaskArtifactUpdateEvent,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+
+EVENTS = 200
+TASK_ID = "task-1"
+
+
+class PerSubscriberEncodingTaskManager(EchoTaskManager):
+    async def dequeue_events_for_sse(self, request_id, task_id, subscriber):
+        try:
+            while True:
+                logged_event = await subscriber.get()
+                response = SendTaskStreamingResponse(id=request_id, result=logged_event.event)
+                yield SSEEvent(logged_event.id, response.model_dump_json(exclude_none=True))
+                if getattr(logged_event.event, "final", False):
+                    break
+        finally:
+            async with self.subscriber_lock:
+                self.task_sse_subscribers[task_id].remove(subscriber)
+
+
+def _events():
+    text = "Routine maintenance from 9:00 AM to 12:00 PM in selected regions. " * 4
+    parts = [TextPart(text=text)]
+    for i in range(EVENTS):
+        final = i == EVENTS - 1
+        if i % 10 == 9:
+            yield TaskArtifactUpdateEvent(id=TASK_ID, artifact=Artifact(parts=parts, index=i))
+        yield TaskStatusUpdateEvent(
+            id=TASK_ID,
+            status=TaskStatus(state=TaskState.WORKING, message=Message(role="agent", parts=parts)),
+            final=final,
+        )
+
+
+async def run(manager_class, subscribers: int) -> float:
+    manager = manager_class(sse_queue_size=10 * EVENTS)
+    streams = []
+    for i in range(subscribers):
+        subscriber = await manager.setup_sse_consumer(TASK_ID)
+        streams.append(manager.dequeue_events_for_sse(f"request-{i}", TASK_ID, subscriber))
+
+    async def drain(stream):
+        async for item in stream:
+            assert item.data
+
+    events = list(_events())
+    start = time.perf_counter()
+    for event in events:
+        await manager.enqueue_events_for_sse(TASK_ID, event)
+    await asyncio.gather(*(drain(stream) for stream in streams))
+    return time.perf_counter() - start
+
+
+async def main():
+    print(f"{'subscribers':>11} {'per-subscriber':>15} {'encode once':>12}")
+    for subscribers in (1, 10, 100):
+        legacy = await run(PerSubscriberEncodingTaskManager, subscribers)
+        shared = await run(EchoTaskManager, subscribers)
+        print(f"{subscribers:>11} {legacy * 1e3:>12.1f} ms {shared * 1e3:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+"""Measures task-store update throughput as the number of concurrently
+updated tasks grows, with one global lock (lock_stripes=1, the old
+behaviour) versus striped per-task locks.
+
+Each update holds its task's lock across a short await, standing in for a
+store that does I/O while the task is locked.
+
+Run from agent/backend:
+    python -m benchmarks.bench_task_store_concurrency
+"""
+
+import asyncio
+import time
+
+from benchmarks.utils import EchoTaskManager
+from common.types import Message, TaskSendParams, TaskState, TaskStatus, TextPart
+
+UPDATES_PER_TASK = 50
+HOLD_SECONDS = 0.0005
+
+
+class LockHoldingTaskManager(EchoTaskManager):
+    async def update_store(self, task_id, status, artifacts):
+        async with self.task_lock(task_id):
+            await asyncio.sleep(HOLD_SECONDS)
+        return await super().update_store(task_id, status, artifacts)
+
+
+async def run(concurrent_tasks: int, lock_stripes: int) -> float:
+    manager = LockHoldingTaskManager(lock_stripes=lock_stripes)
+    message = Message(role="user", parts=[TextPart(text="hi")])
+    task_ids = [f"task-{i}" for i in range(concurrent_tasks)]
+    for task_id in task_ids:
+        await manager.upsert_task(TaskSendParams(id=task_id, message=message))
+
+    async def drive(task_id: str):
+        for _ in range(UPDATES_PER_TASK):
+            await manager.update_store(task_id, TaskStatus(state=TaskState.WORKING), None)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(drive(task_id) for task_id in task_ids))
+    elapsed = time.perf_counter() - start
+    return concurrent_tasks * UPDATES_PER_TASK / elapsed
+
+
+async def main():
+    print(f"{'tasks':>6} {'global lock':>14} {'striped (64)':>14}")
+    for concurrent_tasks in (1, 4, 16, 64):
+        global_lock = await run(concurrent_tasks, lock_stripes=1)
+        striped = await run(concurrent_tasks, lock_stripes=64)
+        print(f"{concurrent_tasks:>6} {global_lock:>10.0f} u/s {striped:>10.0f} u/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""Helpers shared by the benchmark scripts."""
+
+import asyncio
+import contextlib
+import time
+
+import uvicorn
+
+from common.server import A2AServer, InMemoryTaskManager
+from common.types import (
+    SendTaskRequest,
+    SendTaskResponse,
+    SendTaskStreamingRequest,
+    TaskState,
+    TaskStatus,
+)
+
+
+class EchoTaskManager(InMemoryTaskManager):
+    """A task manager that completes every task immediately, so benchmarks
+    measure the A2A plumbing rather than an LLM."""
+
+    async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
+        await self.upsert_task(request.params)
+        task = await self.update_store(
+            request.params.id, TaskStatus(state=TaskState.COMPLETED), None
+        )
+        return SendTaskResponse(
+            id=request.id,
+            result=self.append_task_history(task, request.params.historyLength),
+        )
+
+    async def on_send_task_subscribe(self, request: SendTaskStreamingRequest):
+        raise NotImplementedError
+
+
+@contextlib.asynccontextmanager
+async def running_server(task_manager: InMemoryTaskManager, port: int, **server_kwargs):
+    """Serve an A2AServer on localhost for the duration of the block."""
+    server = A2AServer(
+        host="127.0.0.1", port=port, task_manager=task_manager, **server_kwargs
+    )
+    uvicorn_server = uvicorn.Server(
+        uvicorn.Config(server.app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    serve_task = asyncio.create_task(uvicorn_server.serve())
+    while not uvicorn_server.started:
+        await asyncio.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}/"
+    finally:
+        uvicorn_server.should_exit = True
+        await serve_task
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def report(name: str, samples: list[float]):
+    """Print p50/p95/p99 of latency samples given in seconds."""
+    print(
+        f"{name:>24}: p50={percentile(samples, 50) * 1e3:7.3f}ms "
+        f"p95={percentile(samples, 95) * 1e3:7.3f}ms "
+        f"p99={percentile(samples, 99) * 1e3:7.3f}ms"
+    )
+
+
+async def timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
@@ -1,4 +1,14 @@
 from .client import A2AClient
 from .card_resolver import A2ACardResolver
+from .card_discovery import AgentCardDiscovery
+from .batching import TaskFetchBatcher
+from .resilience import CircuitBreaker, deadline
 
-__all__ = ["A2AClient", "A2ACardResolver"]
+__all__ = [
+    "A2AClient",
+    "A2ACardResolver",
+    "AgentCardDiscovery",
+    "CircuitBreaker",
+    "TaskFetchBatcher",
+    "deadline",
+]
@@ -0,0 +1,97 @@
+"""Coalescing of concurrent tasks/get calls into JSON-RPC batches.
+
+Callers polling different tasks on the same agent each ask for their own
+task; a TaskFetchBatcher collects the calls made within `window` seconds
+and sends them as one batch request.
+"""
+
+from typing import Any
+import asyncio
+import contextvars
+import logging
+
+from common.client.client import MAX_BATCH_SIZE, A2AClient
+from common.client.resilience import cap_timeout
+from common.types import A2AClientHTTPError, GetTaskResponse
+
+logger = logging.getLogger(__name__)
+
+
+class TaskFetchBatcher:
+    def __init__(
+        self,
+        client: A2AClient,
+        window: float = 0.005,
+        max_batch_size: int = MAX_BATCH_SIZE,
+    ):
+        """
+        Args:
+            client: Client of the agent the tasks live on.
+            window: Seconds to wait for more calls before sending a batch.
+            max_batch_size: A batch is sent as soon as it has this many calls.
+        """
+        self.client = client
+        self.window = window
+        self.max_batch_size = max_batch_size
+        # Agents that answer batches with HTTP 400 get one request per task.
+        self.batching_supported = True
+        self.pending: list[tuple[dict[str, Any], asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._sends: set[asyncio.Task] = set()
+
+    async def get_task(self, payload: dict[str, Any]) -> GetTaskResponse:
+        if not self.batching_supported:
+            return await self.client.get_task(payload)
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((payload, future))
+        if len(self.pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        # Each caller waits within its own deadline; the batch itself runs
+        # outside any caller's context.
+        return await asyncio.wait_for(future, cap_timeout(None))
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self.pending = self.pending, []
+        batch = [(payload, future) for payload, future in batch if not future.done()]
+        if not batch:
+            return
+        send = asyncio.create_task(self._send(batch), context=contextvars.Context())
+        self._sends.add(send)
+        send.add_done_callback(self._sends.discard)
+
+    async def _send(self, batch: list[tuple[dict[str, Any], asyncio.Future]]):
+        payloads = [payload for payload, _ in batch]
+        try:
+            if len(batch) == 1:
+                responses = [await self.client.get_task(payloads[0])]
+            else:
+                try:
+                    responses = await self.client.get_tasks(payloads)
+                except A2AClientHTTPError as e:
+                    if e.status_code != 400:
+                        raise
+                    logger.warning(f"{self.client.url} rejected a batch; polling tasks one by one")
+                    self.batching_supported = False
+                    responses = await asyncio.gather(
+                        *(self.client.get_task(payload) for payload in payloads)
+                    )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), response in zip(batch, responses):
+            if not future.done():
+                future.set_result(response)
+
+    async def aclose(self):
+        self._flush()
+        if self._sends:
+            await asyncio.gather(*self._sends, return_exceptions=True)
@@ -0,0 +1,194 @@
+"""Concurrent agent-card discovery with an on-disk cache.
+
+All addresses are fetched at once, each bounded by a timeout, so one slow
+agent no longer delays the others. Cards from the previous run are loaded
+from the cache file and used straight away, then revalidated in the
+background with If-None-Match once their max-age (or ttl) has passed.
+Agents that cannot be reached are retried with backoff and announced
+through on_card when they come up.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+import asyncio
+import json
+import logging
+import os
+import time
+
+import httpx
+
+from common.client.card_resolver import A2ACardResolver
+from common.types import AgentCard
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CardEntry:
+    address: str
+    card: AgentCard | None = None
+    etag: str | None = None
+    max_age: float | None = None
+    # Wall-clock time the card was last fetched or revalidated.
+    fetched_at: float = 0.0
+    # Consecutive failed fetches.
+    failures: int = 0
+
+
+class AgentCardDiscovery:
+    def __init__(
+        self,
+        addresses: list[str],
+        on_card: Callable[[str, AgentCard], None],
+        cache_path: str | None = None,
+        timeout: float = 5.0,
+        ttl: float = 300.0,
+        retry_interval: float = 2.0,
+        max_retry_interval: float = 60.0,
+    ):
+        """
+        Args:
+            addresses: Base URLs of the agents.
+            on_card: Called with the address and card of each agent when its
+                card is first seen or changes.
+            cache_path: JSON file cards are kept in between runs. No cache
+                when None.
+            timeout: Seconds allowed per card fetch.
+            ttl: Seconds a card is used before being revalidated, when the
+                agent does not send a Cache-Control max-age.
+            retry_interval: Seconds before retrying a failed fetch; doubles
+                per failure.
+            max_retry_interval: Upper bound on the retry delay in seconds.
+        """
+        self.on_card = on_card
+        self.cache_path = cache_path
+        self.timeout = timeout
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        self.entries = {address: CardEntry(address) for address in addresses}
+        self._client: httpx.AsyncClient | None = None
+        self._watchers: list[asyncio.Task] = []
+
+    async def start(self):
+        """Announce cached cards, then fetch the rest concurrently. Returns
+        once every uncached agent has answered or timed out."""
+        self._load_cache()
+        for entry in self.entries.values():
+            if entry.card is not None:
+                self._announce(entry)
+
+        self._client = httpx.AsyncClient(timeout=self.timeout)
+        await asyncio.gather(
+            *(
+                self._refresh(entry)
+                for entry in self.entries.values()
+                if entry.card is None
+            )
+        )
+        unreachable = [
+            entry.address for entry in self.entries.values() if entry.card is None
+        ]
+        if unreachable:
+            logger.warning(
+                f"Agents not reachable yet, will register when they come up: {unreachable}"
+            )
+        self._watchers = [
+            asyncio.create_task(self._watch(entry)) for entry in self.entries.values()
+        ]
+
+    async def aclose(self):
+        for watcher in self._watchers:
+            watcher.cancel()
+        await asyncio.gather(*self._watchers, return_exceptions=True)
+        self._watchers = []
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _next_refresh_delay(self, entry: CardEntry) -> float:
+        if entry.failures:
+            return min(
+                self.max_retry_interval,
+                self.retry_interval * 2 ** (entry.failures - 1),
+            )
+        max_age = entry.max_age if entry.max_age is not None else self.ttl
+        return max(0.0, entry.fetched_at + max_age - time.time())
+
+    async def _watch(self, entry: CardEntry):
+        while True:
+            await asyncio.sleep(self._next_refresh_delay(entry))
+            await self._refresh(entry)
+
+    async def _refresh(self, entry: CardEntry):
+        resolver = A2ACardResolver(entry.address)
+        etag = entry.etag if entry.card is not None else None
+        try:
+            resolved = await asyncio.wait_for(
+                resolver.fetch_agent_card(self._client, etag), self.timeout
+            )
+        except Exception as e:
+            entry.failures += 1
+            if entry.failures == 1:
+                logger.warning(
+                    f"Failed to fetch agent card from {entry.address}: {e!r}"
+                )
+            return
+
+        if entry.failures and entry.card is not None:
+            logger.info(f"Agent at {entry.address} is reachable again")
+        entry.failures = 0
+        entry.fetched_at = time.time()
+        if resolved is not None:
+            changed = resolved.card != entry.card
+            entry.card = resolved.card
+            entry.etag = resolved.etag
+            entry.max_age = resolved.max_age
+            if changed:
+                self._announce(entry)
+        self._save_cache()
+
+    def _announce(self, entry: CardEntry):
+        try:
+            self.on_card(entry.address, entry.card)
+        except Exception:
+            logger.exception(f"Failed to register agent card from {entry.address}")
+
+    def _load_cache(self):
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+            for address, data in cached.items():
+                entry = self.entries.get(address)
+                if entry is None:
+                    continue
+                entry.card = AgentCard(**data["card"])
+                entry.etag = data.get("etag")
+                entry.max_age = data.get("max_age")
+                entry.fetched_at = data.get("fetched_at", 0.0)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable agent card cache {self.cache_path}: {e!r}")
+
+    def _save_cache(self):
+        if self.cache_path is None:
+            return
+        cached = {
+            entry.address: {
+                "card": entry.card.model_dump(exclude_none=True),
+                "etag": entry.etag,
+                "max_age": entry.max_age,
+                "fetched_at": entry.fetched_at,
+            }
+            for entry in self.entries.values()
+            if entry.card is not None
+        }
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(cached, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to write agent card cache {self.cache_path}: {e!r}")
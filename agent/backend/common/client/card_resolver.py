@@ -1,9 +1,24 @@
 import httpx
+from dataclasses import dataclass
 from common.types import (
     AgentCard,
     A2AClientJSONError,
 )
 import json
+import re
+
+
+@dataclass
+class ResolvedAgentCard:
+    card: AgentCard
+    etag: str | None = None
+    # Seconds the server allows the card to be cached, from Cache-Control.
+    max_age: float | None = None
+
+
+def _parse_max_age(cache_control: str | None) -> float | None:
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+    return float(match.group(1)) if match else None
 
 
 class A2ACardResolver:
@@ -11,11 +26,35 @@ class A2ACardResolver:
         self.base_url = base_url.rstrip("/")
         self.agent_card_path = agent_card_path.lstrip("/")
 
+    @property
+    def card_url(self) -> str:
+        return self.base_url + "/" + self.agent_card_path
+
     def get_agent_card(self) -> AgentCard:
         with httpx.Client() as client:
-            response = client.get(self.base_url + "/" + self.agent_card_path)
+            response = client.get(self.card_url)
             response.raise_for_status()
             try:
                 return AgentCard(**response.json())
             except json.JSONDecodeError as e:
                 raise A2AClientJSONError(str(e)) from e
+
+    async def fetch_agent_card(
+        self, client: httpx.AsyncClient, etag: str | None = None
+    ) -> ResolvedAgentCard | None:
+        """Fetch the card over client. When etag is given and the card has
+        not changed since (HTTP 304), returns None."""
+        headers = {"If-None-Match": etag} if etag else {}
+        response = await client.get(self.card_url, headers=headers)
+        if etag and response.status_code == 304:
+            return None
+        response.raise_for_status()
+        try:
+            card = AgentCard(**response.json())
+        except json.JSONDecodeError as e:
+            raise A2AClientJSONError(str(e)) from e
+        return ResolvedAgentCard(
+            card,
+            etag=response.headers.get("etag"),
+            max_age=_parse_max_age(response.headers.get("cache-control")),
+        )
@@ -1,5 +1,6 @@
+import asyncio
 import httpx
-from httpx_sse import connect_sse
+from httpx_sse import aconnect_sse
 from typing import Any, AsyncIterable
 from common.types import (
     AgentCard,
@@ -16,58 +17,276 @@ from common.types import (
     GetTaskPushNotificationResponse,
     A2AClientHTTPError,
     A2AClientJSONError,
+    A2AClientTimeoutError,
     SendTaskStreamingRequest,
     SendTaskStreamingResponse,
+    TaskResubscriptionRequest,
 )
+from common.client.resilience import cap_timeout, retry
 import json
 
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0
+)
+
+# Most requests sent in one JSON-RPC batch; larger calls are split.
+MAX_BATCH_SIZE = 100
+
+# Default for per-call timeouts: use the client's request_timeout. A sentinel
+# rather than None, since None means the call has no timeout.
+REQUEST_TIMEOUT = object()
+
 
 class A2AClient:
-    def __init__(self, agent_card: AgentCard = None, url: str = None):
+    def __init__(
+        self,
+        agent_card: AgentCard = None,
+        url: str = None,
+        stream_connect_timeout: float | None = 10.0,
+        stream_read_timeout: float | None = 60.0,
+        stream_idle_timeout: float | None = None,
+        request_timeout: float | None = 30.0,
+        send_timeout: float | None = 5000.0,
+        limits: httpx.Limits | None = None,
+        idempotent_attempts: int = 3,
+    ):
+        """The client keeps one pooled, keep-alive httpx.AsyncClient for its
+        whole lifetime; call aclose() (or use it as an async context manager)
+        to release the connections.
+
+        Args:
+            stream_connect_timeout: Seconds allowed to open a streaming connection.
+            stream_read_timeout: Seconds a streaming socket may go without any
+                bytes. The server sends SSE pings, so this only trips on a dead link.
+            stream_idle_timeout: Seconds allowed between two SSE events, pings
+                excluded. None waits for as long as the agent keeps working.
+            request_timeout: Timeout for cheap calls such as tasks/get and tasks/cancel.
+            send_timeout: Timeout for tasks/send, which waits on the agent's LLM
+                run. None waits for as long as the run takes.
+            limits: Connection pool limits. Defaults to DEFAULT_LIMITS.
+            idempotent_attempts: Attempts at idempotent calls (tasks/get,
+                tasks/pushNotification/get) that fail with a timeout,
+                connection error or 429/5xx status.
+
+        All timeouts are cut to the time left before the deadline set with
+        common.client.resilience.deadline(), if any.
+        """
         if agent_card:
             self.url = agent_card.url
         elif url:
             self.url = url
         else:
             raise ValueError("Must provide either agent_card or url")
+        self.stream_connect_timeout = stream_connect_timeout
+        self.stream_read_timeout = stream_read_timeout
+        self.stream_idle_timeout = stream_idle_timeout
+        self.request_timeout = request_timeout
+        self.send_timeout = send_timeout
+        self.limits = limits or DEFAULT_LIMITS
+        self.idempotent_attempts = idempotent_attempts
+        self._http_client: httpx.AsyncClient | None = None
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                limits=self.limits, timeout=self.request_timeout
+            )
+        return self._http_client
+
+    async def aclose(self):
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
 
     async def send_task(self, payload: dict[str, Any]) -> SendTaskResponse:
         request = SendTaskRequest(params=payload)
-        return SendTaskResponse(**await self._send_request(request))
+        return SendTaskResponse(
+            **await self._send_request(request, timeout=self.send_timeout)
+        )
 
     async def send_task_streaming(
         self, payload: dict[str, Any]
     ) -> AsyncIterable[SendTaskStreamingResponse]:
         request = SendTaskStreamingRequest(params=payload)
-        with httpx.Client(timeout=None) as client:
-            with connect_sse(
-                client, "POST", self.url, json=request.model_dump()
+        async for response in self._send_streaming_request(request):
+            yield response
+
+    async def resubscribe_task(
+        self, payload: dict[str, Any], last_event_id: int | None = None
+    ) -> AsyncIterable[SendTaskStreamingResponse]:
+        """Reattach to a task's event stream. The server first replays the
+        events after last_event_id (all logged events when None)."""
+        request = TaskResubscriptionRequest(params=payload)
+        headers = (
+            {"Last-Event-ID": str(last_event_id)} if last_event_id is not None else {}
+        )
+        async for response in self._send_streaming_request(request, headers):
+            yield response
+
+    async def _send_streaming_request(
+        self, request: JSONRPCRequest, headers: dict[str, str] | None = None
+    ) -> AsyncIterable[SendTaskStreamingResponse]:
+        try:
+            timeout = httpx.Timeout(
+                cap_timeout(self.stream_read_timeout),
+                connect=cap_timeout(self.stream_connect_timeout),
+            )
+            async with aconnect_sse(
+                self.http_client,
+                "POST",
+                self.url,
+                json=request.model_dump(),
+                headers=dict(headers or {}),
+                timeout=timeout,
             ) as event_source:
-                try:
-                    for sse in event_source.iter_sse():
-                        yield SendTaskStreamingResponse(**json.loads(sse.data))
-                except json.JSONDecodeError as e:
-                    raise A2AClientJSONError(str(e)) from e
-                except httpx.RequestError as e:
-                    raise A2AClientHTTPError(400, str(e)) from e
-
-    async def _send_request(self, request: JSONRPCRequest) -> dict[str, Any]:
-        async with httpx.AsyncClient() as client:
-            try:
-                # Image generation could take time, adding timeout
-                response = await client.post(
-                    self.url, json=request.model_dump(), timeout=5000
-                )
+                response = event_source.response
                 response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                raise A2AClientHTTPError(e.response.status_code, str(e)) from e
-            except json.JSONDecodeError as e:
-                raise A2AClientJSONError(str(e)) from e
+                if response.headers.get("content-type", "").startswith(
+                    "application/json"
+                ):
+                    # The server answers with a plain JSON-RPC error when
+                    # the stream could not be set up.
+                    await response.aread()
+                    yield SendTaskStreamingResponse(**response.json())
+                    return
+
+                events = event_source.aiter_sse()
+                while True:
+                    try:
+                        sse = await asyncio.wait_for(
+                            anext(events), cap_timeout(self.stream_idle_timeout)
+                        )
+                    except StopAsyncIteration:
+                        break
+                    response = SendTaskStreamingResponse(**json.loads(sse.data))
+                    if sse.id and sse.id.isdigit():
+                        response.eventId = int(sse.id)
+                    yield response
+        except asyncio.TimeoutError as e:
+            raise A2AClientTimeoutError(
+                "No event received before the idle timeout or deadline"
+            ) from e
+        except json.JSONDecodeError as e:
+            raise A2AClientJSONError(str(e)) from e
+        except httpx.HTTPStatusError as e:
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        except httpx.TimeoutException as e:
+            raise A2AClientTimeoutError(str(e)) from e
+        except httpx.RequestError as e:
+            raise A2AClientHTTPError(400, str(e)) from e
+
+    def _timeout(self, timeout: float | None | object) -> float | None:
+        """Resolve a per-call timeout; None means no timeout."""
+        return self.request_timeout if timeout is REQUEST_TIMEOUT else timeout
+
+    async def _send_request(
+        self, request: JSONRPCRequest, timeout: float | None | object = REQUEST_TIMEOUT
+    ) -> dict[str, Any]:
+        try:
+            response = await self.http_client.post(
+                self.url,
+                content=request.model_dump_json(),
+                headers={"Content-Type": "application/json"},
+                timeout=cap_timeout(self._timeout(timeout)),
+            )
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        except json.JSONDecodeError as e:
+            raise A2AClientJSONError(str(e)) from e
+        except httpx.TimeoutException as e:
+            raise A2AClientTimeoutError(str(e)) from e
+
+    async def _send_batch_request(
+        self, requests: list[JSONRPCRequest], timeout: float | None | object = REQUEST_TIMEOUT
+    ) -> list[dict[str, Any]]:
+        """Send requests as one JSON-RPC batch and return their responses in
+        the same order."""
+        content = b"[" + b",".join(r.model_dump_json().encode() for r in requests) + b"]"
+        try:
+            response = await self.http_client.post(
+                self.url,
+                content=content,
+                headers={"Content-Type": "application/json"},
+                timeout=cap_timeout(self._timeout(timeout)),
+            )
+            response.raise_for_status()
+            results = response.json()
+        except httpx.HTTPStatusError as e:
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        except json.JSONDecodeError as e:
+            raise A2AClientJSONError(str(e)) from e
+        except httpx.TimeoutException as e:
+            raise A2AClientTimeoutError(str(e)) from e
+
+        if not isinstance(results, list):
+            raise A2AClientJSONError(f"Expected a batch response, got: {results}")
+        by_id = {result.get("id"): result for result in results}
+        try:
+            return [by_id[request.id] for request in requests]
+        except KeyError as e:
+            raise A2AClientJSONError(f"No response for request {e} in batch") from e
 
     async def get_task(self, payload: dict[str, Any]) -> GetTaskResponse:
         request = GetTaskRequest(params=payload)
-        return GetTaskResponse(**await self._send_request(request))
+        return GetTaskResponse(
+            **await retry(
+                lambda: self._send_request(request), self.idempotent_attempts
+            )
+        )
+
+    async def wait_for_task_change(
+        self,
+        task_id: str,
+        since_version: int,
+        history_length: int | None = None,
+        wait_timeout: float = 30.0,
+    ) -> GetTaskResponse:
+        """Long-poll tasks/get: the server answers once the task's version is
+        above since_version, or after wait_timeout seconds with the task
+        unchanged."""
+        remaining = cap_timeout(None)
+        if remaining is not None:
+            wait_timeout = min(wait_timeout, remaining)
+        request = GetTaskRequest(
+            params={
+                "id": task_id,
+                "historyLength": history_length,
+                "sinceVersion": since_version,
+                "waitTimeout": wait_timeout,
+            }
+        )
+        return GetTaskResponse(
+            **await retry(
+                lambda: self._send_request(
+                    request, timeout=wait_timeout + (self.request_timeout or 0)
+                ),
+                self.idempotent_attempts,
+            )
+        )
+
+    async def get_tasks(self, payloads: list[dict[str, Any]]) -> list[GetTaskResponse]:
+        """Get many tasks in one round-trip (per MAX_BATCH_SIZE tasks) with
+        JSON-RPC batches. Responses are in the order of payloads."""
+        requests = [GetTaskRequest(params=payload) for payload in payloads]
+        chunks = await asyncio.gather(
+            *(
+                retry(
+                    lambda chunk=requests[i : i + MAX_BATCH_SIZE]: self._send_batch_request(chunk),
+                    self.idempotent_attempts,
+                )
+                for i in range(0, len(requests), MAX_BATCH_SIZE)
+            )
+        )
+        return [GetTaskResponse(**result) for chunk in chunks for result in chunk]
 
     async def cancel_task(self, payload: dict[str, Any]) -> CancelTaskResponse:
         request = CancelTaskRequest(params=payload)
@@ -83,4 +302,8 @@ class A2AClient:
         self, payload: dict[str, Any]
     ) -> GetTaskPushNotificationResponse:
         request = GetTaskPushNotificationRequest(params=payload)
-        return GetTaskPushNotificationResponse(**await self._send_request(request))
+        return GetTaskPushNotificationResponse(
+            **await retry(
+                lambda: self._send_request(request), self.idempotent_attempts
+            )
+        )
@@ -0,0 +1,168 @@
+"""Deadlines, retries and circuit breaking for calls to remote agents.
+
+A deadline set with `deadline()` applies to every A2AClient call made in
+the same context (including tasks it spawns): request timeouts are cut to
+the time left, and calls fail fast once it has passed. `retry()` retries an
+idempotent call with jittered exponential backoff within the deadline.
+A CircuitBreaker stops calls to an endpoint that keeps failing and lets a
+single probe through once its open period is over.
+"""
+
+from collections.abc import Awaitable, Callable
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TypeVar
+import asyncio
+import logging
+import random
+import time
+
+import httpx
+
+from common.types import A2AClientHTTPError, A2AClientTimeoutError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Absolute time.monotonic() by which the current request must be done.
+_deadline: ContextVar[float | None] = ContextVar("a2a_deadline", default=None)
+
+# Status codes of responses worth retrying.
+RETRYABLE_STATUS_CODES = (429, 502, 503, 504)
+
+
+@contextmanager
+def deadline(seconds: float | None):
+    """Bound calls made inside the block to `seconds` from now. A deadline
+    already in effect is only ever shortened."""
+    if seconds is None:
+        yield
+        return
+    until = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(until if current is None else min(current, until))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_remaining() -> float | None:
+    """Seconds left before the current deadline, or None without one."""
+    until = _deadline.get()
+    return None if until is None else until - time.monotonic()
+
+
+def cap_timeout(timeout: float | None) -> float | None:
+    """Cut timeout to the time left before the deadline. Raises
+    A2AClientTimeoutError when the deadline has already passed."""
+    remaining = time_remaining()
+    if remaining is None:
+        return timeout
+    if remaining <= 0:
+        raise A2AClientTimeoutError("Deadline exceeded")
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, A2AClientHTTPError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (A2AClientTimeoutError, httpx.TransportError))
+
+
+async def retry(
+    call: Callable[[], Awaitable[T]],
+    attempts: int = 3,
+    initial_backoff: float = 0.2,
+    max_backoff: float = 2.0,
+) -> T:
+    """Await call(), retrying retryable failures with full-jitter backoff.
+    Only for idempotent calls. Gives up early when the next attempt would
+    start after the deadline."""
+    for attempt in range(1, attempts + 1):
+        try:
+            return await call()
+        except Exception as e:
+            if attempt == attempts or not is_retryable(e):
+                raise
+            delay = random.uniform(0, min(max_backoff, initial_backoff * 2 ** (attempt - 1)))
+            remaining = time_remaining()
+            if remaining is not None and delay >= remaining:
+                raise
+            logger.info(f"Retrying after {e!r} in {delay:.2f}s (attempt {attempt})")
+            await asyncio.sleep(delay)
+
+
+class CircuitBreaker:
+    """Closed while calls succeed; opens after failure_threshold consecutive
+    failures. Once open for reset_timeout seconds it is half-open and lets
+    one probe call through: success closes it, failure opens it again for
+    twice as long, up to max_reset_timeout."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 5.0,
+        max_reset_timeout: float = 60.0,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.consecutive_failures = 0
+        self.openings = 0
+        self.opened_until = 0.0
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if not self.openings:
+            return self.CLOSED
+        if self.probing or time.monotonic() >= self.opened_until:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    @property
+    def available(self) -> bool:
+        """Whether a call may be sent now."""
+        state = self.state
+        return state == self.CLOSED or (state == self.HALF_OPEN and not self.probing)
+
+    def on_call(self) -> bool:
+        """Note that a call is being sent. Returns True when it is the
+        half-open probe, whose caller must record its outcome or call
+        release_probe()."""
+        if self.state == self.HALF_OPEN:
+            self.probing = True
+            return True
+        return False
+
+    def release_probe(self):
+        """The probe ended without a verdict (cancelled, or cut short by the
+        caller's deadline); let the next call probe instead."""
+        self.probing = False
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.openings = 0
+        self.probing = False
+
+    def record_failure(self):
+        if self.state == self.OPEN:
+            # A call sent before the breaker opened; already counted.
+            return
+        self.consecutive_failures += 1
+        if self.probing or self.consecutive_failures >= self.failure_threshold:
+            self.opened_until = time.monotonic() + min(
+                self.max_reset_timeout, self.reset_timeout * 2 ** self.openings
+            )
+            self.openings += 1
+            self.consecutive_failures = 0
+            self.probing = False
+
+    def seconds_until_probe(self) -> float:
+        return max(0.0, self.opened_until - time.monotonic()) if self.openings else 0.0
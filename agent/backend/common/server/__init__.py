@@ -1,4 +1,18 @@
 from .server import A2AServer
 from .task_manager import TaskManager, InMemoryTaskManager
+from .sqlite_task_manager import SQLiteTaskManager
+from .agent_task_manager import BaseAgentTaskManager
+from .agent_scheduler import AgentScheduler, AgentQueueFullError
+from .admission import AdmissionController, AdmissionRejectedError
 
-__all__ = ["A2AServer", "TaskManager", "InMemoryTaskManager"]
+__all__ = [
+    "A2AServer",
+    "TaskManager",
+    "InMemoryTaskManager",
+    "SQLiteTaskManager",
+    "BaseAgentTaskManager",
+    "AgentScheduler",
+    "AgentQueueFullError",
+    "AdmissionController",
+    "AdmissionRejectedError",
+]
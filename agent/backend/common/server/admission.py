@@ -0,0 +1,156 @@
+from collections.abc import Callable
+from typing import Any
+import asyncio
+import contextlib
+import math
+
+LONG_POLL_LANE = "tasks/get:wait"
+
+# Methods that start agent work get a small share; everything else is cheap
+# and falls back to default_limit. A2AServer sizes the agent methods to its
+# task manager's AgentScheduler instead; see agent_method_limits.
+DEFAULT_METHOD_LIMITS = {
+    "tasks/send": 32,
+    "tasks/sendSubscribe": 32,
+    "tasks/resubscribe": 64,
+    # Long-polling tasks/get calls mostly sit parked, so many can be in
+    # flight; they get their own lane to keep plain tasks/get fast.
+    LONG_POLL_LANE: 1024,
+}
+
+
+def agent_method_limits(max_concurrency: int, max_queue_size: int) -> dict[str, int]:
+    """Limits for the methods that start agent runs, wide enough for every run
+    an AgentScheduler of this size can hold, so that its queue, not
+    admission, decides when there are too many."""
+    capacity = max_concurrency + max_queue_size
+    return {"tasks/send": capacity, "tasks/sendSubscribe": capacity}
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a request is shed instead of being handled."""
+
+    def __init__(self, method: str, retry_after: int):
+        self.method = method
+        self.retry_after = retry_after
+        super().__init__(f"Too many concurrent {method} requests")
+
+
+class MethodLane:
+    """Concurrency limit and wait queue for a single JSON-RPC method."""
+
+    def __init__(self, limit: int, max_queue_size: int):
+        self.limit = max(1, limit)
+        self.max_queue_size = max_queue_size
+        self.semaphore = asyncio.Semaphore(self.limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = 0
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
+
+
+class AdmissionController:
+    """Per-method concurrency limits for A2AServer.
+
+    Each JSON-RPC method gets its own lane, so cheap calls such as tasks/get
+    never queue behind slow tasks/send calls. A request waits at most
+    max_queue_wait seconds for its lane; it is shed when that deadline passes
+    or when max_queue_size requests are already waiting.
+    """
+
+    def __init__(
+        self,
+        method_limits: dict[str, int] | None = None,
+        default_limit: int = 256,
+        max_queue_size: int = 256,
+        max_queue_wait: float = 5.0,
+        max_stream_idle: float | None = 60.0,
+    ):
+        """
+        Args:
+            method_limits: Concurrent requests allowed per method, merged over
+                DEFAULT_METHOD_LIMITS.
+            default_limit: Concurrent requests allowed for any other method.
+            max_queue_size: Requests per method that may wait for a slot.
+            max_queue_wait: Seconds a request may wait before it is shed.
+            max_stream_idle: Seconds a streaming response may go without its
+                client taking an event before its slot is freed; the stream
+                itself goes on. None holds the slot until the stream ends.
+        """
+        self.method_limits = {**DEFAULT_METHOD_LIMITS, **(method_limits or {})}
+        self.default_limit = default_limit
+        self.max_queue_size = max_queue_size
+        self.max_queue_wait = max_queue_wait
+        self.max_stream_idle = max_stream_idle
+        self.retry_after = max(1, math.ceil(max_queue_wait))
+        self.lanes: dict[str, MethodLane] = {}
+
+    def get_lane(self, method: str) -> MethodLane:
+        lane = self.lanes.get(method)
+        if lane is None:
+            lane = MethodLane(
+                self.method_limits.get(method, self.default_limit),
+                self.max_queue_size,
+            )
+            self.lanes[method] = lane
+        return lane
+
+    @contextlib.asynccontextmanager
+    async def admit(self, method: str):
+        """Hold a slot in the method's lane for the duration of the block.
+
+        Raises AdmissionRejectedError if the request is shed.
+        """
+        release = await self.acquire(method)
+        try:
+            yield
+        finally:
+            release()
+
+    async def acquire(self, method: str) -> Callable[[], None]:
+        """Take a slot in the method's lane and return a function that frees
+        it; calling that function again does nothing.
+
+        Raises AdmissionRejectedError if the request is shed.
+        """
+        lane = self.get_lane(method)
+        if lane.semaphore.locked():
+            if lane.waiting >= lane.max_queue_size:
+                lane.shed += 1
+                raise AdmissionRejectedError(method, self.retry_after)
+
+            lane.waiting += 1
+            try:
+                await asyncio.wait_for(lane.semaphore.acquire(), self.max_queue_wait)
+            except asyncio.TimeoutError:
+                lane.shed += 1
+                raise AdmissionRejectedError(method, self.retry_after)
+            finally:
+                lane.waiting -= 1
+        else:
+            await lane.semaphore.acquire()
+
+        lane.admitted += 1
+        lane.in_flight += 1
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                lane.in_flight -= 1
+                lane.semaphore.release()
+
+        return release
+
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        return {method: lane.get_stats() for method, lane in self.lanes.items()}
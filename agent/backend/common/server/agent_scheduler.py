@@ -0,0 +1,166 @@
+from collections import OrderedDict, deque
+from typing import Any
+from common.utils.metrics import REGISTRY
+import asyncio
+import time
+
+AGENT_RUN_SECONDS = REGISTRY.histogram(
+    "a2a_agent_run_duration_seconds",
+    "Agent run (LLM invoke or stream) time, excluding queueing, by outcome.",
+    ("outcome",),
+)
+AGENT_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "a2a_agent_queue_wait_seconds", "Time agent runs waited for a slot."
+)
+AGENT_RUNS_REJECTED = REGISTRY.counter(
+    "a2a_agent_runs_rejected_total", "Agent runs rejected because the queue was full."
+)
+
+
+class AgentQueueFullError(Exception):
+    """Raised by AgentScheduler.admit when no more runs can wait."""
+
+    pass
+
+
+class AgentSlot:
+    """A place in the AgentScheduler, from admission until the run finishes.
+
+    Entering waits until the run may start; exiting (or release) frees the
+    slot, or the place in the queue if the run never started.
+    """
+
+    def __init__(self, scheduler: "AgentScheduler", session_id: str):
+        self.scheduler = scheduler
+        self.session_id = session_id
+        self.admitted_at = time.monotonic()
+        # Resolved by the scheduler once the run may start.
+        self.granted = asyncio.get_running_loop().create_future()
+        self.released = False
+
+    async def __aenter__(self):
+        try:
+            await self.granted
+        except asyncio.CancelledError:
+            self.release()
+            raise
+        self.scheduler.record_wait(time.monotonic() - self.admitted_at)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+    async def run(self, coro):
+        async with self:
+            start = time.perf_counter()
+            outcome = "failed"
+            try:
+                result = await coro
+                outcome = "completed"
+                return result
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
+            finally:
+                AGENT_RUN_SECONDS.observe(time.perf_counter() - start, outcome)
+
+    def release(self):
+        if self.released:
+            return
+        self.released = True
+        if self.granted.done() and not self.granted.cancelled():
+            self.scheduler.release_slot()
+        else:
+            self.granted.cancel()
+            self.scheduler.remove_waiter(self)
+
+
+class AgentScheduler:
+    """Limits how many agent runs (LLM calls) execute at once.
+
+    Runs past max_concurrency wait in per-session queues, which are served
+    round-robin so one busy session cannot starve the others. Once
+    max_queue_size runs are waiting, admit raises AgentQueueFullError.
+    """
+
+    def __init__(self, max_concurrency: int = 8, max_queue_size: int = 100):
+        """
+        Args:
+            max_concurrency: Maximum agent runs executing at once.
+            max_queue_size: Maximum agent runs waiting for a slot.
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue_size = max_queue_size
+        self.running = 0
+        # Waiting slots per session, in round-robin order.
+        self.session_queues: OrderedDict[str, deque[AgentSlot]] = OrderedDict()
+        self.queued = 0
+        self.rejected = 0
+        self.started = 0
+        # Recent queue wait times in seconds.
+        self.wait_times: deque[float] = deque(maxlen=1000)
+
+    def admit(self, session_id: str) -> AgentSlot:
+        """Reserve a run for session_id; enter the returned slot to run it."""
+        slot = AgentSlot(self, session_id)
+        if self.running < self.max_concurrency and not self.queued:
+            self.running += 1
+            slot.granted.set_result(None)
+            return slot
+
+        if self.queued >= self.max_queue_size:
+            self.rejected += 1
+            AGENT_RUNS_REJECTED.inc()
+            raise AgentQueueFullError(
+                f"{self.running} agent runs in progress and {self.queued} waiting"
+            )
+
+        self.session_queues.setdefault(session_id, deque()).append(slot)
+        self.queued += 1
+        return slot
+
+    def release_slot(self):
+        """Hand a finished run's slot to the next session in turn."""
+        while self.session_queues:
+            session_id, slots = next(iter(self.session_queues.items()))
+            slot = slots.popleft()
+            self.queued -= 1
+            if slots:
+                self.session_queues.move_to_end(session_id)
+            else:
+                del self.session_queues[session_id]
+
+            if not slot.granted.done():
+                slot.granted.set_result(None)
+                return
+
+        self.running -= 1
+
+    def remove_waiter(self, slot: AgentSlot):
+        slots = self.session_queues.get(slot.session_id)
+        if slots is None or slot not in slots:
+            return
+        slots.remove(slot)
+        self.queued -= 1
+        if not slots:
+            del self.session_queues[slot.session_id]
+
+    def record_wait(self, seconds: float):
+        self.started += 1
+        self.wait_times.append(seconds)
+        AGENT_QUEUE_WAIT_SECONDS.observe(seconds)
+
+    def get_stats(self) -> dict[str, Any]:
+        wait_times = sorted(self.wait_times)
+        return {
+            "running": self.running,
+            "max_concurrency": self.max_concurrency,
+            "queued": self.queued,
+            "max_queue_size": self.max_queue_size,
+            "queued_sessions": len(self.session_queues),
+            "started": self.started,
+            "rejected": self.rejected,
+            "wait_seconds_avg": sum(wait_times) / len(wait_times) if wait_times else 0.0,
+            "wait_seconds_p95": wait_times[int(0.95 * (len(wait_times) - 1))] if wait_times else 0.0,
+            "wait_seconds_max": wait_times[-1] if wait_times else 0.0,
+        }
@@ -0,0 +1,257 @@
+from abc import abstractmethod
+from typing import Any, AsyncIterable, Union
+import asyncio
+import logging
+
+from common.types import (
+    SendTaskRequest,
+    SendTaskResponse,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    Message,
+    Artifact,
+    TextPart,
+    InternalError,
+    ServerBusyError,
+    InvalidParamsError,
+    JSONRPCResponse,
+    SendTaskStreamingRequest,
+    SendTaskStreamingResponse,
+    TaskArtifactUpdateEvent,
+    TaskStatusUpdateEvent,
+    Task,
+    PushNotificationConfig,
+)
+from common.server.sqlite_task_manager import SQLiteTaskManager
+from common.server.agent_scheduler import AgentScheduler, AgentQueueFullError
+from common.server.push_notifier import TaskPushNotifier
+from common.utils.push_notification_auth import PushNotificationSenderAuth
+from common.utils.push_notification_dispatcher import PushNotificationDispatcher
+import common.server.utils as utils
+
+logger = logging.getLogger(__name__)
+
+
+class BaseAgentTaskManager(SQLiteTaskManager):
+    """Serves one agent over A2A: scheduling of agent runs, tasks/send
+    (optionally answered before the run ends), streaming, cancellation and
+    push notifications.
+
+    Subclasses say how to call their agent through invoke_agent and
+    stream_agent, and which output modes it supports.
+    """
+
+    SUPPORTED_CONTENT_TYPES: list[str] = ["text", "text/plain"]
+
+    def __init__(self, agent, notification_sender_auth: PushNotificationSenderAuth, task_db_path: str | None = None, async_send: bool = False, agent_scheduler: AgentScheduler | None = None, push_notification_mode: str = "full"):
+        super().__init__(db_path=task_db_path, agent_scheduler=agent_scheduler)
+        self.agent = agent
+        self.notification_sender_auth = notification_sender_auth
+        # Coalesces task updates into push notifications, which are delivered
+        # in the background so tasks never wait on the receiver.
+        self.push_notifier = TaskPushNotifier(
+            PushNotificationDispatcher(notification_sender_auth), mode=push_notification_mode
+        )
+        # Reply to tasks/send with the WORKING task right away and run the
+        # agent in the background; clients poll tasks/get or use push
+        # notifications for the result.
+        self.async_send = async_send
+
+    @abstractmethod
+    async def invoke_agent(self, query: str, session_id: str) -> dict[str, Any]:
+        """Run the agent to completion. Returns {"content": str,
+        "require_user_input": bool}."""
+        pass
+
+    @abstractmethod
+    def stream_agent(self, query: str, session_id: str) -> AsyncIterable[dict[str, Any]]:
+        """Run the agent, yielding {"content": str, "is_task_complete": bool,
+        "require_user_input": bool} per update."""
+        pass
+
+    async def _run_streaming_agent(self, request: SendTaskStreamingRequest):
+        task_send_params: TaskSendParams = request.params
+        query = self._get_user_query(task_send_params)
+
+        try:
+            async for item in self.stream_agent(query, task_send_params.sessionId):
+                is_task_complete = item["is_task_complete"]
+                require_user_input = item["require_user_input"]
+                parts = [{"type": "text", "text": item["content"]}]
+                end_stream = is_task_complete or require_user_input
+
+                task_status = TaskStatus(
+                    state=TaskState.COMPLETED if is_task_complete else
+                          TaskState.INPUT_REQUIRED if require_user_input else
+                          TaskState.WORKING,
+                    message=Message(role="agent", parts=parts)
+                )
+
+                artifact = Artifact(parts=parts) if is_task_complete else None
+
+                task = await self.update_store(
+                    task_send_params.id, task_status, [artifact] if artifact else None
+                )
+
+                await self.send_task_notification(task)
+
+                if artifact:
+                    await self.enqueue_events_for_sse(
+                        task_send_params.id,
+                        TaskArtifactUpdateEvent(id=task_send_params.id, artifact=artifact)
+                    )
+
+                await self.enqueue_events_for_sse(
+                    task_send_params.id,
+                    TaskStatusUpdateEvent(id=task_send_params.id, status=task_status, final=end_stream)
+                )
+
+        except Exception as e:
+            logger.error(f"❌ Error in stream: {e}")
+            await self.enqueue_events_for_sse(
+                task_send_params.id,
+                InternalError(message=f"Streaming error: {str(e)}")
+            )
+
+    def _validate_request(self, request: Union[SendTaskRequest, SendTaskStreamingRequest]) -> JSONRPCResponse | None:
+        task_send_params: TaskSendParams = request.params
+        if not utils.are_modalities_compatible(
+            task_send_params.acceptedOutputModes, self.SUPPORTED_CONTENT_TYPES
+        ):
+            return utils.new_incompatible_types_error(request.id)
+
+        if task_send_params.pushNotification and not task_send_params.pushNotification.url:
+            return JSONRPCResponse(id=request.id, error=InvalidParamsError(message="Push notification URL is missing"))
+
+        return None
+
+    async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
+        if (error := self._validate_request(request)):
+            return SendTaskResponse(id=request.id, error=error.error)
+
+        if request.params.pushNotification:
+            if self.notification_sender_auth.check_push_notification_url(request.params.pushNotification.url) is False:
+                return SendTaskResponse(id=request.id, error=InvalidParamsError(message="Invalid push notification URL"))
+
+        query = self._get_user_query(request.params)
+        try:
+            slot = self.agent_scheduler.admit(request.params.sessionId)
+        except AgentQueueFullError as e:
+            logger.warning(f"Rejecting task {request.params.id}: {e}")
+            return SendTaskResponse(id=request.id, error=ServerBusyError())
+
+        try:
+            await self.upsert_task(request.params)
+            if request.params.pushNotification:
+                await self.set_push_notification_info(request.params.id, request.params.pushNotification)
+
+            task = await self.update_store(
+                request.params.id, TaskStatus(state=TaskState.WORKING), None
+            )
+            await self.send_task_notification(task)
+        except Exception:
+            slot.release()
+            raise
+
+        if self.async_send:
+            self.track_running_task(request.params.id, self._run_agent(request, query), slot)
+            return SendTaskResponse(id=request.id, result=self.append_task_history(task, request.params.historyLength))
+
+        agent_run = self.track_running_task(
+            request.params.id, self.invoke_agent(query, request.params.sessionId), slot
+        )
+        try:
+            agent_response = await agent_run
+        except asyncio.CancelledError:
+            task = await self.get_task(request.params.id)
+            if task is None or task.status.state != TaskState.CANCELED:
+                raise
+            # Stopped by tasks/cancel rather than by the server.
+            return SendTaskResponse(id=request.id, result=self.append_task_history(task, request.params.historyLength))
+        except Exception as e:
+            logger.exception("Agent invocation failed")
+            raise ValueError(f"Agent invocation failed: {e}")
+
+        return await self._process_agent_response(request, agent_response)
+
+    async def _run_agent(self, request: SendTaskRequest, query: str):
+        try:
+            agent_response = await self.invoke_agent(query, request.params.sessionId)
+        except Exception as e:
+            logger.exception("Agent invocation failed")
+            task_status = TaskStatus(
+                state=TaskState.FAILED,
+                message=Message(role="agent", parts=[TextPart(text=f"Agent invocation failed: {e}")])
+            )
+            task = await self.update_store(request.params.id, task_status, None)
+            await self.send_task_notification(task)
+            return
+
+        await self._process_agent_response(request, agent_response)
+
+    async def on_send_task_subscribe(self, request: SendTaskStreamingRequest) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
+        slot = None
+        try:
+            if (error := self._validate_request(request)):
+                return error
+
+            slot = self.agent_scheduler.admit(request.params.sessionId)
+            await self.upsert_task(request.params)
+
+            if request.params.pushNotification:
+                if not await self.set_push_notification_info(request.params.id, request.params.pushNotification):
+                    slot.release()
+                    return JSONRPCResponse(id=request.id, error=InvalidParamsError(message="Invalid push URL"))
+
+            sse_queue = await self.setup_sse_consumer(request.params.id, False)
+            self.track_running_task(request.params.id, self._run_streaming_agent(request), slot)
+            return self.dequeue_events_for_sse(request.id, request.params.id, sse_queue)
+
+        except AgentQueueFullError as e:
+            logger.warning(f"Rejecting task {request.params.id}: {e}")
+            return JSONRPCResponse(id=request.id, error=ServerBusyError())
+        except Exception as e:
+            if slot is not None:
+                slot.release()
+            logger.error(f"❌ Error in stream: {e}")
+            return JSONRPCResponse(id=request.id, error=InternalError(message="Streaming setup failed"))
+
+    async def _process_agent_response(self, request: SendTaskRequest, agent_response: dict) -> SendTaskResponse:
+        parts = [{"type": "text", "text": agent_response["content"]}]
+        task_status = TaskStatus(
+            state=TaskState.INPUT_REQUIRED if agent_response["require_user_input"] else TaskState.COMPLETED,
+            message=Message(role="agent", parts=parts)
+        )
+        artifact = Artifact(parts=parts) if task_status.state == TaskState.COMPLETED else None
+
+        task = await self.update_store(request.params.id, task_status, [artifact] if artifact else None)
+        task_result = self.append_task_history(task, request.params.historyLength)
+        await self.send_task_notification(task)
+        return SendTaskResponse(id=request.id, result=task_result)
+
+    def _get_user_query(self, task_send_params: TaskSendParams) -> str:
+        part = task_send_params.message.parts[0]
+        if not isinstance(part, TextPart):
+            raise ValueError("Only text input is supported.")
+        return part.text
+
+    async def send_task_notification(self, task: Task):
+        if not await self.has_push_notification_info(task.id):
+            logger.info(f"ℹ️ No push info for task {task.id}")
+            return
+        info = await self.get_push_notification_info(task.id)
+        self.push_notifier.notify(info.url, task)
+
+    async def aclose(self):
+        await self.push_notifier.aclose()
+        await super().aclose()
+
+    async def set_push_notification_info(self, task_id: str, push_notification_config: PushNotificationConfig):
+        # Only known-bad URLs are refused here. New URLs are verified in the
+        # background while the task starts; nothing is delivered to them
+        # until they pass.
+        if self.notification_sender_auth.check_push_notification_url(push_notification_config.url) is False:
+            return False
+        await super().set_push_notification_info(task_id, push_notification_config)
+        return True
@@ -0,0 +1,118 @@
+from collections import OrderedDict
+from typing import NamedTuple
+import asyncio
+import logging
+
+from common.types import Task, TaskNotificationDelta, TaskState
+from common.server.task_manager import TERMINAL_STATES
+from common.utils.push_notification_dispatcher import PushNotificationDispatcher
+
+logger = logging.getLogger(__name__)
+
+PUSH_NOTIFICATION_MODES = ("full", "delta")
+
+# States a client has to act on, so their notifications are never delayed.
+FLUSH_STATES = (*TERMINAL_STATES, TaskState.INPUT_REQUIRED)
+
+
+class DeliveredVersion(NamedTuple):
+    """How much of a task the receiver has been sent, in delta mode."""
+
+    sequence: int
+    history_length: int
+    artifacts_length: int
+
+
+class TaskPushNotifier:
+    """Turns task updates into push notifications.
+
+    Updates to a task within coalesce_window seconds are merged into a single
+    signed delivery of its latest state; final and input-required states go
+    out immediately. In "full" mode each notification is the whole task; in
+    "delta" mode it is a TaskNotificationDelta with only the messages and
+    artifacts added since the previous one.
+    """
+
+    def __init__(
+        self,
+        dispatcher: PushNotificationDispatcher,
+        mode: str = "full",
+        coalesce_window: float = 0.2,
+        max_tracked_tasks: int = 10000,
+    ):
+        """
+        Args:
+            dispatcher: Delivers the notifications.
+            mode: One of PUSH_NOTIFICATION_MODES.
+            coalesce_window: Seconds to wait for further updates to a task
+                before notifying. 0 sends every update.
+            max_tracked_tasks: Unfinished tasks whose delivered version is
+                remembered in delta mode; the least recently notified are
+                forgotten first and get a full delta next time.
+        """
+        if mode not in PUSH_NOTIFICATION_MODES:
+            raise ValueError(f"Unknown push notification mode: {mode}")
+
+        self.dispatcher = dispatcher
+        self.mode = mode
+        self.coalesce_window = coalesce_window
+        self.max_tracked_tasks = max_tracked_tasks
+        # Task id -> (url, latest task) waiting for its window to close.
+        self.pending: dict[str, tuple[str, Task]] = {}
+        self.flush_timers: dict[str, asyncio.TimerHandle] = {}
+        self.delivered_versions: OrderedDict[str, DeliveredVersion] = OrderedDict()
+
+    def notify(self, url: str, task: Task):
+        self.pending[task.id] = (url, task)
+        if self.coalesce_window <= 0 or task.status.state in FLUSH_STATES:
+            self.flush(task.id)
+        elif task.id not in self.flush_timers:
+            self.flush_timers[task.id] = asyncio.get_running_loop().call_later(
+                self.coalesce_window, self.flush, task.id
+            )
+
+    def flush(self, task_id: str):
+        timer = self.flush_timers.pop(task_id, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self.pending.pop(task_id, None)
+        if pending is None:
+            return
+
+        url, task = pending
+        if self.mode == "delta":
+            payload = self._delta(task).model_dump(exclude_none=True)
+        else:
+            payload = task.model_dump(exclude_none=True)
+        self.dispatcher.submit(url, payload)
+
+    def flush_all(self):
+        for task_id in list(self.pending):
+            self.flush(task_id)
+
+    def _delta(self, task: Task) -> TaskNotificationDelta:
+        previous = self.delivered_versions.pop(task.id, None) or DeliveredVersion(0, 0, 0)
+        history = task.history or []
+        artifacts = task.artifacts or []
+        final = task.status.state in TERMINAL_STATES
+        if not final:
+            self.delivered_versions[task.id] = DeliveredVersion(
+                previous.sequence + 1, len(history), len(artifacts)
+            )
+            if len(self.delivered_versions) > self.max_tracked_tasks:
+                self.delivered_versions.popitem(last=False)
+
+        return TaskNotificationDelta(
+            id=task.id,
+            sessionId=task.sessionId,
+            sequence=previous.sequence + 1,
+            status=task.status,
+            history=history[previous.history_length:] or None,
+            artifacts=artifacts[previous.artifacts_length:] or None,
+            metadata=task.metadata,
+            final=final,
+        )
+
+    async def aclose(self):
+        self.flush_all()
+        await self.dispatcher.aclose()
@@ -1,31 +1,89 @@
 from starlette.applications import Starlette
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 from sse_starlette.sse import EventSourceResponse
 from starlette.requests import Request
 from common.types import (
-    A2ARequest,
+    A2A_REQUEST_ADAPTERS,
+    JSONRPCRequestHeaderAdapter,
     JSONRPCResponse,
     InvalidRequestError,
     JSONParseError,
-    GetTaskRequest,
-    CancelTaskRequest,
-    SendTaskRequest,
-    SetTaskPushNotificationRequest,
-    GetTaskPushNotificationRequest,
+    MethodNotFoundError,
     InternalError,
     AgentCard,
     TaskResubscriptionRequest,
-    SendTaskStreamingRequest,
+    GetTaskRequest,
+    JSONRPCRequest,
+    ServerBusyError,
+    JSONRPCError,
 )
 from pydantic import ValidationError
+import asyncio
+import contextlib
+import hashlib
 import json
-from typing import AsyncIterable, Any
-from common.server.task_manager import TaskManager
+import time
+from typing import AsyncIterable, Any, Callable
+from common.server.task_manager import TaskManager, SSEEvent
+from common.server.admission import (
+    LONG_POLL_LANE,
+    AdmissionController,
+    AdmissionRejectedError,
+    agent_method_limits,
+)
+from common.utils.metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from common.utils.loop_monitor import LoopMonitor
+from common.utils.admin import is_admin_request
+from common.utils.profiling import RequestProfiler
+from common.server.utils import (
+    encode_json_rpc_batch_response,
+    encode_json_rpc_response,
+)
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+# JSON-RPC method -> TaskManager coroutine that handles it.
+METHOD_HANDLERS = {
+    "tasks/get": "on_get_task",
+    "tasks/send": "on_send_task",
+    "tasks/sendSubscribe": "on_send_task_subscribe",
+    "tasks/cancel": "on_cancel_task",
+    "tasks/pushNotification/set": "on_set_task_push_notification",
+    "tasks/pushNotification/get": "on_get_task_push_notification",
+    "tasks/resubscribe": "on_resubscribe_to_task",
+}
+
+# Methods that can be profiled on demand through /admin/profile.
+PROFILED_METHODS = ("tasks/send", "tasks/sendSubscribe")
+
+# Methods answered with an event stream, which cannot be part of a batch.
+STREAMING_METHODS = ("tasks/sendSubscribe", "tasks/resubscribe")
+
+# Most requests accepted in one JSON-RPC batch.
+MAX_BATCH_SIZE = 100
+
+REQUESTS = REGISTRY.counter(
+    "a2a_requests_total",
+    "JSON-RPC requests handled, by method and result (ok or error code).",
+    ("method", "code"),
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "a2a_request_duration_seconds",
+    "Time to produce a response (the first event for streams), by method.",
+    ("method",),
+)
+ADMISSION_IN_FLIGHT = REGISTRY.gauge(
+    "a2a_admission_in_flight", "Requests being handled, by method.", ("method",)
+)
+ADMISSION_WAITING = REGISTRY.gauge(
+    "a2a_admission_waiting", "Requests waiting for admission, by method.", ("method",)
+)
+
+# Seconds clients may use a cached agent card before revalidating it.
+AGENT_CARD_MAX_AGE = 300
+
 
 class A2AServer:
     def __init__(
@@ -35,17 +93,41 @@ class A2AServer:
         endpoint="/",
         agent_card: AgentCard = None,
         task_manager: TaskManager = None,
+        admission: AdmissionController | None = None,
+        loop_monitor: LoopMonitor | None = None,
     ):
         self.host = host
         self.port = port
         self.endpoint = endpoint
         self.task_manager = task_manager
         self.agent_card = agent_card
-        self.app = Starlette()
+        if admission is None:
+            admission = AdmissionController(
+                method_limits=self._agent_method_limits(task_manager)
+            )
+        self.admission = admission
+        self.loop_monitor = loop_monitor or LoopMonitor()
+        self.profiler = RequestProfiler()
+        self.app = Starlette(lifespan=self._lifespan)
         self.app.add_route(self.endpoint, self._process_request, methods=["POST"])
         self.app.add_route(
             "/.well-known/agent.json", self._get_agent_card, methods=["GET"]
         )
+        self.app.add_route("/metrics", self._get_metrics, methods=["GET"])
+        self.app.add_route(
+            "/admin/loop", self._loop_report, methods=["GET", "DELETE"]
+        )
+        self.app.add_route(
+            "/admin/profile", self._profile, methods=["GET", "POST", "DELETE"]
+        )
+
+    @contextlib.asynccontextmanager
+    async def _lifespan(self, app: Starlette):
+        self.loop_monitor.start()
+        yield
+        await self.loop_monitor.stop()
+        if self.task_manager is not None:
+            await self.task_manager.aclose()
 
     def start(self):
         if self.agent_card is None:
@@ -58,63 +140,298 @@ class A2AServer:
 
         uvicorn.run(self.app, host=self.host, port=self.port)
 
-    def _get_agent_card(self, request: Request) -> JSONResponse:
-        return JSONResponse(self.agent_card.model_dump(exclude_none=True))
+    def _get_agent_card(self, request: Request) -> Response:
+        body = json.dumps(
+            self.agent_card.model_dump(exclude_none=True), separators=(",", ":")
+        ).encode()
+        # Lets cached clients revalidate the card with If-None-Match.
+        etag = '"{}"'.format(hashlib.sha256(body).hexdigest()[:32])
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"max-age={AGENT_CARD_MAX_AGE}",
+        }
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
+
+    def _get_metrics(self, request: Request) -> Response:
+        for method, lane in self.admission.lanes.items():
+            ADMISSION_IN_FLIGHT.set(lane.in_flight, method)
+            ADMISSION_WAITING.set(lane.waiting, method)
+        if self.task_manager is not None:
+            self.task_manager.collect_metrics()
+        return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+    def _loop_report(self, request: Request) -> Response:
+        """Event-loop lag and the stacks that blocked the loop; DELETE clears
+        them."""
+        if not is_admin_request(request):
+            return JSONResponse({"error": "Forbidden"}, status_code=403)
+        if request.method == "DELETE":
+            self.loop_monitor.reset()
+        return JSONResponse(self.loop_monitor.get_report())
+
+    async def _profile(self, request: Request) -> Response:
+        """Start, stop and download on-demand request profiles; see
+        RequestProfiler.handle_admin_request."""
+        if not is_admin_request(request):
+            return JSONResponse({"error": "Forbidden"}, status_code=403)
+        return await self.profiler.handle_admin_request(request)
 
     async def _process_request(self, request: Request):
+        start = time.perf_counter()
+        # Only known methods are used as labels, to bound metric cardinality.
+        method = "invalid"
+        code = InternalError().code
         try:
-            body = await request.json()
-            json_rpc_request = A2ARequest.validate_python(body)
-
-            if isinstance(json_rpc_request, GetTaskRequest):
-                result = await self.task_manager.on_get_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SendTaskRequest):
-                result = await self.task_manager.on_send_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SendTaskStreamingRequest):
-                result = await self.task_manager.on_send_task_subscribe(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, CancelTaskRequest):
-                result = await self.task_manager.on_cancel_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SetTaskPushNotificationRequest):
-                result = await self.task_manager.on_set_task_push_notification(json_rpc_request)
-            elif isinstance(json_rpc_request, GetTaskPushNotificationRequest):
-                result = await self.task_manager.on_get_task_push_notification(json_rpc_request)
-            elif isinstance(json_rpc_request, TaskResubscriptionRequest):
-                result = await self.task_manager.on_resubscribe_to_task(
-                    json_rpc_request
+            body = await request.body()
+            if body.lstrip()[:1] == b"[":
+                # Each entry is also counted under its own method.
+                method = "batch"
+                response = await self._process_batch(json.loads(body))
+                code = "ok" if response.status_code == 200 else InvalidRequestError().code
+                return response
+
+            header = JSONRPCRequestHeaderAdapter.validate_json(body)
+
+            adapter = A2A_REQUEST_ADAPTERS.get(header.method)
+            if adapter is None:
+                logger.warning(f"Unexpected request method: {header.method}")
+                method = "unknown"
+                error = MethodNotFoundError()
+                code = error.code
+                return self._create_error_response(header.id, error)
+
+            method = header.method
+            json_rpc_request = adapter.validate_json(body)
+            if isinstance(json_rpc_request, TaskResubscriptionRequest):
+                self._apply_last_event_id(request, json_rpc_request)
+            handler = getattr(self.task_manager, METHOD_HANDLERS[header.method])
+            release = await self.admission.acquire(
+                self._admission_lane(json_rpc_request)
+            )
+            try:
+                handling = handler(json_rpc_request)
+                if header.method in PROFILED_METHODS:
+                    handling = self.profiler.wrap(header.method, handling)
+                result = await handling
+            except BaseException:
+                release()
+                raise
+            if isinstance(result, AsyncIterable):
+                # A stream does its work as EventSourceResponse consumes it,
+                # so it keeps the slot until it ends or disconnects.
+                result = self._release_when_done(result, release)
+            else:
+                release()
+
+            response = self._create_response(result)
+            code = result.error.code if getattr(result, "error", None) else "ok"
+            return response
+
+        except AdmissionRejectedError as e:
+            logger.warning(f"Shedding request {header.id}: {e}")
+            code = ServerBusyError().code
+            return self._create_overloaded_response(header.id, e.retry_after)
+        except Exception as e:
+            error = self._exception_to_error(e)
+            code = error.code
+            return self._create_error_response(None, error)
+        finally:
+            REQUESTS.inc(method, str(code))
+            REQUEST_SECONDS.observe(time.perf_counter() - start, method)
+
+    def _release_when_done(
+        self, stream: AsyncIterable, release: Callable[[], None]
+    ) -> AsyncIterable:
+        """Pass the stream through, freeing its admission slot when it ends,
+        or earlier once its client has left an event untaken for
+        max_stream_idle seconds."""
+        max_idle = self.admission.max_stream_idle
+        if max_idle is None:
+            return self._pass_through(stream, release, None, None)
+        loop = asyncio.get_running_loop()
+        # Armed until the client first pulls from the stream.
+        idle_timer = loop.call_later(max_idle, release)
+        return self._pass_through(stream, release, idle_timer, max_idle)
+
+    @staticmethod
+    async def _pass_through(stream, release, idle_timer, max_idle):
+        loop = asyncio.get_running_loop()
+        try:
+            if idle_timer is not None:
+                idle_timer.cancel()
+            async for item in stream:
+                if max_idle is not None:
+                    idle_timer = loop.call_later(max_idle, release)
+                yield item
+                if idle_timer is not None:
+                    idle_timer.cancel()
+        finally:
+            if idle_timer is not None:
+                idle_timer.cancel()
+            release()
+
+    async def _process_batch(self, entries: Any) -> Response:
+        """Handle a JSON-RPC batch: run its requests concurrently and answer
+        with their responses in one array."""
+        if not isinstance(entries, list) or not entries:
+            return self._create_error_response(None, InvalidRequestError())
+        if len(entries) > MAX_BATCH_SIZE:
+            return self._create_error_response(
+                None,
+                InvalidRequestError(
+                    message=f"Batch exceeds {MAX_BATCH_SIZE} requests"
+                ),
+            )
+
+        responses = await asyncio.gather(
+            *(self._process_batch_entry(entry) for entry in entries)
+        )
+        # Notifications are handled but, per JSON-RPC 2.0, never answered.
+        responses = [
+            response
+            for entry, response in zip(entries, responses)
+            if not self._is_notification(entry)
+        ]
+        if not responses:
+            return Response(status_code=204)
+        return Response(
+            encode_json_rpc_batch_response(responses), media_type="application/json"
+        )
+
+    @staticmethod
+    def _is_notification(entry: Any) -> bool:
+        """A request object without an id member; an explicit null id still
+        gets a response."""
+        return (
+            isinstance(entry, dict)
+            and "id" not in entry
+            and isinstance(entry.get("method"), str)
+        )
+
+    async def _process_batch_entry(self, entry: Any) -> JSONRPCResponse:
+        start = time.perf_counter()
+        method = "invalid"
+        code = InternalError().code
+        request_id = entry.get("id") if isinstance(entry, dict) else None
+        try:
+            header = JSONRPCRequestHeaderAdapter.validate_python(entry)
+            adapter = A2A_REQUEST_ADAPTERS.get(header.method)
+            if adapter is None:
+                method = "unknown"
+                error = MethodNotFoundError()
+            elif header.method in STREAMING_METHODS:
+                method = header.method
+                error = InvalidRequestError(
+                    message=f"{header.method} cannot be used in a batch"
                 )
             else:
-                logger.warning(f"Unexpected request type: {type(json_rpc_request)}")
-                raise ValueError(f"Unexpected request type: {type(request)}")
+                error = None
+            if error is not None:
+                code = error.code
+                return JSONRPCResponse(id=header.id, error=error)
+
+            method = header.method
+            json_rpc_request = adapter.validate_python(entry)
+            handler = getattr(self.task_manager, METHOD_HANDLERS[header.method])
+            async with self.admission.admit(self._admission_lane(json_rpc_request)):
+                handling = handler(json_rpc_request)
+                if header.method in PROFILED_METHODS:
+                    handling = self.profiler.wrap(header.method, handling)
+                result = await handling
 
-            return self._create_response(result)
+            code = result.error.code if result.error else "ok"
+            return result
 
+        except AdmissionRejectedError as e:
+            logger.warning(f"Shedding batched request {request_id}: {e}")
+            code = ServerBusyError().code
+            return JSONRPCResponse(id=request_id, error=ServerBusyError())
         except Exception as e:
-            return self._handle_exception(e)
+            error = self._exception_to_error(e)
+            code = error.code
+            return JSONRPCResponse(id=request_id, error=error)
+        finally:
+            REQUESTS.inc(method, str(code))
+            REQUEST_SECONDS.observe(time.perf_counter() - start, method)
+
+    @staticmethod
+    def _agent_method_limits(task_manager: TaskManager | None) -> dict[str, int]:
+        """Size the agent methods' lanes to the task manager's scheduler, so
+        queued runs are not shed by admission before the scheduler's own
+        queue is full."""
+        scheduler = getattr(task_manager, "agent_scheduler", None)
+        if scheduler is None:
+            return {}
+        return agent_method_limits(scheduler.max_concurrency, scheduler.max_queue_size)
+
+    @staticmethod
+    def _admission_lane(json_rpc_request: JSONRPCRequest) -> str:
+        if (
+            isinstance(json_rpc_request, GetTaskRequest)
+            and json_rpc_request.params.sinceVersion is not None
+        ):
+            return LONG_POLL_LANE
+        return json_rpc_request.method
+
+    def _apply_last_event_id(
+        self, request: Request, json_rpc_request: TaskResubscriptionRequest
+    ):
+        """Let a reconnecting EventSource resume via its Last-Event-ID header."""
+        last_event_id = request.headers.get("last-event-id")
+        if json_rpc_request.params.lastEventId is None and last_event_id:
+            try:
+                json_rpc_request.params.lastEventId = int(last_event_id)
+            except ValueError:
+                logger.warning(f"Ignoring invalid Last-Event-ID: {last_event_id}")
 
-    def _handle_exception(self, e: Exception) -> JSONResponse:
+    def _exception_to_error(self, e: Exception) -> JSONRPCError:
         if isinstance(e, json.decoder.JSONDecodeError):
             json_rpc_error = JSONParseError()
         elif isinstance(e, ValidationError):
-            json_rpc_error = InvalidRequestError(data=json.loads(e.json()))
+            if any(error["type"] == "json_invalid" for error in e.errors()):
+                json_rpc_error = JSONParseError()
+            else:
+                json_rpc_error = InvalidRequestError(data=json.loads(e.json()))
         else:
             logger.error(f"Unhandled exception: {e}")
             json_rpc_error = InternalError()
 
-        response = JSONRPCResponse(id=None, error=json_rpc_error)
-        return JSONResponse(response.model_dump(exclude_none=True), status_code=400)
+        return json_rpc_error
+
+    def _create_error_response(self, request_id, error) -> Response:
+        response = JSONRPCResponse(id=request_id, error=error)
+        return Response(
+            encode_json_rpc_response(response),
+            status_code=400,
+            media_type="application/json",
+        )
+
+    def _create_overloaded_response(self, request_id, retry_after: int) -> Response:
+        response = JSONRPCResponse(id=request_id, error=ServerBusyError())
+        return Response(
+            encode_json_rpc_response(response),
+            status_code=503,
+            headers={"Retry-After": str(retry_after)},
+            media_type="application/json",
+        )
 
-    def _create_response(self, result: Any) -> JSONResponse | EventSourceResponse:
+    def _create_response(self, result: Any) -> Response | EventSourceResponse:
         if isinstance(result, AsyncIterable):
 
             async def event_generator(result) -> AsyncIterable[dict[str, str]]:
                 async for item in result:
-                    yield {"data": item.model_dump_json(exclude_none=True)}
+                    if isinstance(item, SSEEvent):
+                        yield {"id": str(item.id), "data": item.data}
+                    else:
+                        yield {"data": item.model_dump_json(exclude_none=True)}
 
             return EventSourceResponse(event_generator(result))
         elif isinstance(result, JSONRPCResponse):
-            return JSONResponse(result.model_dump(exclude_none=True))
+            return Response(
+                encode_json_rpc_response(result), media_type="application/json"
+            )
         else:
             logger.error(f"Unexpected result type: {type(result)}")
             raise ValueError(f"Unexpected result type: {type(result)}")
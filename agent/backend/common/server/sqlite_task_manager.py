@@ -0,0 +1,303 @@
+from concurrent.futures import ThreadPoolExecutor
+from common.types import (
+    Message,
+    PushNotificationConfig,
+    Task,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+from common.server.task_manager import (
+    ACTIVE_STATES,
+    InMemoryTaskManager,
+    TERMINAL_STATES,
+)
+import asyncio
+import logging
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    session_id TEXT,
+    state TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_state_updated_at ON tasks (state, updated_at);
+CREATE TABLE IF NOT EXISTS push_notification_configs (
+    task_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+PURGE_INTERVAL = 60
+
+INTERRUPTED_TASK_MESSAGE = (
+    "The agent restarted while this task was running. Please send it again."
+)
+
+
+def interrupted_task_status() -> TaskStatus:
+    return TaskStatus(
+        state=TaskState.FAILED,
+        message=Message(role="agent", parts=[TextPart(text=INTERRUPTED_TASK_MESSAGE)]),
+    )
+
+
+class SQLiteTaskManager(InMemoryTaskManager):
+    """An InMemoryTaskManager that also persists tasks (with their history and
+    artifacts) and push-notification configs to a SQLite file in WAL mode, so
+    they survive a restart.
+
+    The in-memory store acts as a read-through cache: tasks missing from it are
+    loaded from disk on demand, and capacity eviction only drops the cached
+    copy. Writes are write-behind: changed tasks are collected and flushed in
+    batches by a background task, so request handlers never wait on disk. A
+    crash can lose at most the last flush_interval of updates.
+
+    Tasks that were submitted or working when the process stopped have no
+    agent run behind them any more; they are found when the file is opened
+    and marked failed as they are loaded, so clients polling them get an
+    answer instead of waiting forever.
+
+    All SQLite access runs on a single worker thread.
+    """
+
+    def __init__(
+        self,
+        db_path: str | None,
+        flush_interval: float = 0.05,
+        max_batch_size: int = 500,
+        persisted_task_ttl: float | None = 7 * 24 * 3600,
+        **kwargs,
+    ):
+        """
+        Args:
+            db_path: Path of the SQLite file. None disables persistence and the
+                manager behaves exactly like InMemoryTaskManager.
+            flush_interval: Seconds to collect changes before writing a batch.
+            max_batch_size: Maximum number of tasks written per transaction.
+            persisted_task_ttl: Seconds finished tasks are kept on disk.
+                None keeps them forever.
+            **kwargs: Passed on to InMemoryTaskManager.
+        """
+        super().__init__(**kwargs)
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.persisted_task_ttl = persisted_task_ttl
+        # Tasks changed since the last flush, with the push config they had.
+        self.dirty_tasks: dict[str, tuple[Task, PushNotificationConfig | None]] = {}
+        self._dirty_event = asyncio.Event()
+        self._flush_task: asyncio.Task | None = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="sqlite-task-store"
+        )
+        self._connection: sqlite3.Connection | None = None
+        self._last_purge = 0.0
+        # Tasks left submitted or working on disk by a previous process; each
+        # is failed when first loaded.
+        self.interrupted_task_ids: set[str] = set()
+
+    async def load_task(self, task_id: str) -> Task | None:
+        task = await super().load_task(task_id)
+        if task is not None or self.db_path is None:
+            return task
+
+        if task_id in self.dirty_tasks:
+            # Evicted from the cache before its latest change was flushed.
+            task, push_config = self.dirty_tasks[task_id]
+        else:
+            task_data, push_config_data = await self._run(self._read_task, task_id)
+            if task_data is None:
+                return None
+            task = Task.model_validate_json(task_data)
+            push_config = (
+                PushNotificationConfig.model_validate_json(push_config_data)
+                if push_config_data
+                else None
+            )
+
+        self.tasks[task_id] = task
+        if push_config is not None:
+            self.push_notification_infos[task_id] = push_config
+        if task.status.state in TERMINAL_STATES:
+            self.terminal_tasks[task_id] = time.monotonic()
+        if task_id in self.interrupted_task_ids:
+            self.interrupted_task_ids.discard(task_id)
+            if task.status.state in ACTIVE_STATES:
+                # No agent run is behind it any more. Same path as
+                # update_store: bumps the version, persists the change and
+                # wakes long-polling readers.
+                self._apply_update(task, interrupted_task_status(), None)
+        self._evict_tasks(keep_task_id=task_id)
+        return task
+
+    def mark_task_dirty(self, task: Task):
+        if self.db_path is None:
+            return
+
+        self.dirty_tasks[task.id] = (task, self.push_notification_infos.get(task.id))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        self._dirty_event.set()
+
+    def _evict_task(self, task_id: str, reason: str):
+        if self.db_path is None:
+            return super()._evict_task(task_id, reason)
+
+        # Only the cached copy goes; the task is read back from disk on demand.
+        logger.debug(f"Evicting cached task {task_id} ({reason})")
+        self.tasks.pop(task_id, None)
+        self.terminal_tasks.pop(task_id, None)
+        self.push_notification_infos.pop(task_id, None)
+        self.task_event_logs.pop(task_id, None)
+        self.eviction_counts[reason] += 1
+
+    async def flush(self):
+        """Write all pending changes to disk."""
+        while self.dirty_tasks:
+            batch = []
+            for task_id in list(self.dirty_tasks)[: self.max_batch_size]:
+                batch.append(self.dirty_tasks.pop(task_id))
+
+            now = time.time()
+            task_rows = [
+                (
+                    task.id,
+                    task.sessionId,
+                    task.status.state.value,
+                    task.model_dump_json(exclude_none=True),
+                    now,
+                )
+                for task, _ in batch
+            ]
+            push_config_rows = [
+                (task.id, push_config.model_dump_json(exclude_none=True))
+                for task, push_config in batch
+                if push_config is not None
+            ]
+
+            purge_before = None
+            if (
+                self.persisted_task_ttl is not None
+                and now - self._last_purge > PURGE_INTERVAL
+            ):
+                purge_before = now - self.persisted_task_ttl
+                self._last_purge = now
+
+            try:
+                await self._run(
+                    self._write_batch, task_rows, push_config_rows, purge_before
+                )
+            except Exception as e:
+                logger.error(f"Failed to persist {len(batch)} tasks: {e}")
+                for task, push_config in batch:
+                    self.dirty_tasks.setdefault(task.id, (task, push_config))
+                raise
+
+    async def aclose(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        if self.db_path is not None:
+            await self.flush()
+            await self._run(self._close)
+        # The final flush and close ran on the executor above; don't block the
+        # loop waiting for the thread to exit.
+        self._executor.shutdown(wait=False)
+
+    async def _flush_loop(self):
+        while True:
+            await self._dirty_event.wait()
+            # Let more updates pile up so they are written in one transaction.
+            await asyncio.sleep(self.flush_interval)
+            self._dirty_event.clear()
+            try:
+                await self.flush()
+            except Exception:
+                # The batch was put back; retry after the next interval.
+                self._dirty_event.set()
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, fn, *args
+        )
+
+    # The methods below run on the executor thread.
+
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._find_interrupted_tasks(connection)
+            self._connection = connection
+        return self._connection
+
+    def _find_interrupted_tasks(self, db: sqlite3.Connection):
+        active_states = [state.value for state in ACTIVE_STATES]
+        rows = db.execute(
+            "SELECT id FROM tasks WHERE state IN (?, ?)", active_states
+        ).fetchall()
+        self.interrupted_task_ids = {task_id for (task_id,) in rows}
+        if rows:
+            logger.warning(
+                f"{len(rows)} tasks were interrupted by a restart; they will be failed"
+            )
+
+    def _read_task(self, task_id: str) -> tuple[str | None, str | None]:
+        db = self._db()
+        task_row = db.execute(
+            "SELECT data FROM tasks WHERE id = ?", (task_id,)
+        ).fetchone()
+        if task_row is None:
+            return None, None
+
+        push_config_row = db.execute(
+            "SELECT data FROM push_notification_configs WHERE task_id = ?",
+            (task_id,),
+        ).fetchone()
+        return task_row[0], push_config_row[0] if push_config_row else None
+
+    def _write_batch(self, task_rows, push_config_rows, purge_before):
+        db = self._db()
+        with db:
+            db.executemany(
+                "INSERT OR REPLACE INTO tasks (id, session_id, state, data, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                task_rows,
+            )
+            db.executemany(
+                "INSERT OR REPLACE INTO push_notification_configs (task_id, data) "
+                "VALUES (?, ?)",
+                push_config_rows,
+            )
+            if purge_before is not None:
+                terminal_states = [state.value for state in TERMINAL_STATES]
+                expired = (
+                    "SELECT id FROM tasks WHERE state IN (?, ?, ?) AND updated_at < ?"
+                )
+                db.execute(
+                    f"DELETE FROM push_notification_configs WHERE task_id IN ({expired})",
+                    (*terminal_states, purge_before),
+                )
+                db.execute(
+                    f"DELETE FROM tasks WHERE id IN ({expired})",
+                    (*terminal_states, purge_before),
+                )
+
+    def _close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
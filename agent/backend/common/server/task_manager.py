@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Union, AsyncIterable, List
+from typing import Any, Union, AsyncIterable, List, NamedTuple
 from common.types import Task
 from common.types import (
     JSONRPCResponse,
@@ -30,13 +30,192 @@ from common.types import (
     JSONRPCError,
     TaskPushNotificationConfig,
     InternalError,
+    StreamOverflowError,
 )
-from common.server.utils import new_not_implemented_error
+from common.server.agent_scheduler import AgentScheduler, AgentSlot
+from common.utils.metrics import REGISTRY
+from collections import Counter, OrderedDict, deque
 import asyncio
+import itertools
+import json
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+TERMINAL_STATES = (TaskState.COMPLETED, TaskState.CANCELED, TaskState.FAILED)
+# States of a task an agent is still working on, which is never evicted.
+ACTIVE_STATES = (TaskState.SUBMITTED, TaskState.WORKING)
+
+# Longest a tasks/get with sinceVersion waits for the task to change.
+MAX_LONG_POLL_TIMEOUT = 30.0
+
+TASKS = REGISTRY.gauge("a2a_tasks", "Tasks held in memory, by state.", ("state",))
+SSE_SUBSCRIBERS = REGISTRY.gauge("a2a_sse_subscribers", "Connected SSE subscribers.")
+SSE_QUEUE_DEPTH = REGISTRY.gauge(
+    "a2a_sse_queue_depth", "Events queued across all SSE subscribers."
+)
+SSE_QUEUE_DEPTH_MAX = REGISTRY.gauge(
+    "a2a_sse_queue_depth_max", "Events queued for the most backed-up SSE subscriber."
+)
+SSE_EVENTS_DISCARDED = REGISTRY.counter(
+    "a2a_sse_events_discarded_total",
+    "Events a slow SSE subscriber never received, by overflow policy.",
+    ("policy",),
+)
+AGENT_RUNS = REGISTRY.gauge("a2a_agent_runs", "Agent runs by scheduler state.", ("state",))
+
+
+class LoggedEvent(NamedTuple):
+    """A task event as recorded in the event log and handed to subscribers.
+
+    data is the event's JSON, encoded once when the event is enqueued and
+    shared by every subscriber.
+    """
+
+    id: int
+    event: Any
+    data: str
+
+    @classmethod
+    def encode(cls, event_id: int, event) -> "LoggedEvent":
+        return cls(event_id, event, event.model_dump_json(exclude_none=True))
+
+
+class SSEEvent(NamedTuple):
+    """A SendTaskStreamingResponse, already JSON encoded, tagged with its id
+    in the task's event log."""
+
+    id: int
+    data: str
+
+
+def sse_response_encoder(request_id):
+    """Return a function that wraps an encoded event in the JSON-RPC response
+    for request_id.
+
+    Equivalent to SendTaskStreamingResponse(id=request_id, result=event)
+    .model_dump_json(exclude_none=True), but only splices strings.
+    """
+    head = '{"jsonrpc":"2.0",'
+    if request_id is not None:
+        head += f'"id":{json.dumps(request_id, ensure_ascii=False)},'
+
+    def encode(logged_event: LoggedEvent) -> str:
+        member = "error" if isinstance(logged_event.event, JSONRPCError) else "result"
+        return f'{head}"{member}":{logged_event.data}}}'
+
+    return encode
+
+
+SSE_OVERFLOW_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+
+class SSESubscriber:
+    """A bounded queue of logged events for one SSE client, with the counters
+    needed to spot slow consumers.
+
+    When the queue is full, overflow_policy decides what happens:
+    - drop_oldest: discard the oldest queued event.
+    - coalesce: discard queued status updates in favour of the new one, since
+      only the latest status matters; falls back to drop_oldest when the queue
+      holds no status update.
+    - disconnect: replace the backlog with an error that ends the stream. The
+      client can pick up where it left off with tasks/resubscribe.
+    """
+
+    def __init__(self, task_id: str, maxsize: int, overflow_policy: str):
+        self.task_id = task_id
+        self.maxsize = maxsize
+        self.overflow_policy = overflow_policy
+        # (LoggedEvent, monotonic enqueue time)
+        self.events: deque = deque()
+        self.ready = asyncio.Event()
+        self.last_delivered_id = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.disconnected = False
+
+    def offer(self, logged_event: LoggedEvent):
+        """Queue an event without waiting, applying the overflow policy."""
+        if self.disconnected:
+            return
+
+        if len(self.events) >= self.maxsize:
+            if self.overflow_policy == "disconnect":
+                self._disconnect()
+                return
+            if self.overflow_policy != "coalesce" or not self._coalesce(
+                logged_event.event
+            ):
+                self.events.popleft()
+                self.dropped += 1
+                SSE_EVENTS_DISCARDED.inc("drop_oldest")
+
+        self.events.append((logged_event, time.monotonic()))
+        self.ready.set()
+
+    def replay(self, logged_events: list[LoggedEvent]):
+        """Queue logged events on resubscription. The event log is already
+        bounded, so these bypass the overflow policy."""
+        now = time.monotonic()
+        self.events.extend((logged_event, now) for logged_event in logged_events)
+        if self.events:
+            self.ready.set()
+
+    def _coalesce(self, event) -> bool:
+        if not isinstance(event, TaskStatusUpdateEvent):
+            return False
+
+        kept = deque(
+            queued
+            for queued in self.events
+            if not isinstance(queued[0].event, TaskStatusUpdateEvent)
+        )
+        coalesced = len(self.events) - len(kept)
+        if coalesced == 0:
+            return False
+
+        self.events = kept
+        self.coalesced += coalesced
+        SSE_EVENTS_DISCARDED.inc("coalesce", amount=coalesced)
+        return True
+
+    def _disconnect(self):
+        self.dropped += len(self.events)
+        SSE_EVENTS_DISCARDED.inc("disconnect", amount=len(self.events))
+        self.events.clear()
+        self.disconnected = True
+        error = StreamOverflowError()
+        # Carry the last delivered id so a resubscribe replays the backlog.
+        self.events.append(
+            (LoggedEvent.encode(self.last_delivered_id, error), time.monotonic())
+        )
+        self.ready.set()
+
+    async def get(self) -> LoggedEvent:
+        while not self.events:
+            self.ready.clear()
+            await self.ready.wait()
+
+        logged_event, _ = self.events.popleft()
+        self.last_delivered_id = logged_event.id
+        self.delivered += 1
+        return logged_event
+
+    def get_stats(self) -> dict[str, Any]:
+        lag_seconds = time.monotonic() - self.events[0][1] if self.events else 0.0
+        return {
+            "task_id": self.task_id,
+            "depth": len(self.events),
+            "lag_seconds": lag_seconds,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "disconnected": self.disconnected,
+        }
+
 class TaskManager(ABC):
     @abstractmethod
     async def on_get_task(self, request: GetTaskRequest) -> GetTaskResponse:
@@ -74,23 +253,98 @@ class TaskManager(ABC):
     ) -> Union[AsyncIterable[SendTaskResponse], JSONRPCResponse]:
         pass
 
+    async def aclose(self):
+        """Release resources held by the task manager on server shutdown."""
+        pass
+
+    def collect_metrics(self):
+        """Update gauges in common.utils.metrics.REGISTRY before a scrape."""
+        pass
+
 
 class InMemoryTaskManager(TaskManager):
-    def __init__(self):
-        self.tasks: dict[str, Task] = {}
+    def __init__(
+        self,
+        max_tasks: int | None = 10000,
+        terminal_task_ttl: float | None = 3600,
+        lock_stripes: int = 64,
+        event_log_size: int = 100,
+        sse_queue_size: int = 256,
+        sse_overflow_policy: str = "drop_oldest",
+        agent_scheduler: AgentScheduler | None = None,
+    ):
+        """
+        Args:
+            max_tasks: Upper bound on stored tasks. When exceeded, the oldest
+                finished tasks are evicted first, then the least recently used
+                unfinished tasks that are idle: no SSE subscriber, no agent
+                run in progress, and not submitted or working. Tasks still in
+                progress are never evicted, so the store may briefly exceed
+                the bound. None disables it.
+            terminal_task_ttl: Seconds a task is kept after reaching a terminal
+                state. None keeps finished tasks until evicted for capacity.
+            lock_stripes: Number of locks task ids are hashed onto, so updates
+                to one task never make unrelated tasks wait.
+            event_log_size: Number of recent SSE events kept per task so that
+                tasks/resubscribe can replay what a client missed.
+            sse_queue_size: Maximum events buffered per SSE subscriber.
+            sse_overflow_policy: What to do when a subscriber's buffer is full;
+                one of SSE_OVERFLOW_POLICIES, see SSESubscriber.
+            agent_scheduler: Limits concurrent agent runs started with a slot
+                (see track_running_task). Defaults to AgentScheduler().
+        """
+        if sse_overflow_policy not in SSE_OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown SSE overflow policy: {sse_overflow_policy}")
+
+        # Ordered by last use, least recently used first.
+        self.tasks: OrderedDict[str, Task] = OrderedDict()
+        # Finished tasks and the monotonic time they finished, oldest first.
+        self.terminal_tasks: OrderedDict[str, float] = OrderedDict()
         self.push_notification_infos: dict[str, PushNotificationConfig] = {}
-        self.lock = asyncio.Lock()
-        self.task_sse_subscribers: dict[str, List[asyncio.Queue]] = {}
+        self.task_locks = [asyncio.Lock() for _ in range(max(1, lock_stripes))]
+        self.task_sse_subscribers: dict[str, List[SSESubscriber]] = {}
         self.subscriber_lock = asyncio.Lock()
+        # Recent LoggedEvents per task, for resubscription replay.
+        self.task_event_logs: dict[str, deque] = {}
+        self.event_log_size = event_log_size
+        self.event_ids = itertools.count(1)
+        self.sse_queue_size = sse_queue_size
+        # Agent work in flight per task, so tasks/cancel can stop it.
+        self.running_tasks: dict[str, asyncio.Task] = {}
+        # Long-polling tasks/get calls park on their task's condition, which
+        # shares the task's striped lock.
+        self.task_conditions: dict[str, asyncio.Condition] = {}
+        self.task_waiters: Counter[str] = Counter()
+        self.agent_scheduler = agent_scheduler or AgentScheduler()
+        self.sse_overflow_policy = sse_overflow_policy
+        self.max_tasks = max_tasks
+        self.terminal_task_ttl = terminal_task_ttl
+        self.eviction_counts = {"expired": 0, "terminal": 0, "idle": 0}
+        # Whether in-progress tasks keep the store above max_tasks.
+        self.over_capacity = False
+
+    def task_lock(self, task_id: str) -> asyncio.Lock:
+        """Return the lock guarding the given task's state."""
+        return self.task_locks[hash(task_id) % len(self.task_locks)]
 
     async def on_get_task(self, request: GetTaskRequest) -> GetTaskResponse:
         logger.info(f"Getting task {request.params.id}")
         task_query_params: TaskQueryParams = request.params
 
-        async with self.lock:
-            task = self.tasks.get(task_query_params.id)
+        async with self.task_lock(task_query_params.id):
+            task = await self.load_task(task_query_params.id)
+            if (
+                task is not None
+                and task_query_params.sinceVersion is not None
+                and (task.version or 0) <= task_query_params.sinceVersion
+                and task.status.state not in TERMINAL_STATES
+            ):
+                task = await self._wait_for_task_change(
+                    task.id, task_query_params.sinceVersion, task_query_params.waitTimeout
+                )
             if task is None:
                 return GetTaskResponse(id=request.id, error=TaskNotFoundError())
+            self.tasks.move_to_end(task.id)
 
             task_result = self.append_task_history(
                 task, task_query_params.historyLength
@@ -98,16 +352,103 @@ class InMemoryTaskManager(TaskManager):
 
         return GetTaskResponse(id=request.id, result=task_result)
 
+    async def _wait_for_task_change(
+        self, task_id: str, since_version: int, timeout: float | None
+    ) -> Task | None:
+        """Wait until the task's version exceeds since_version or the timeout
+        passes, and return it. Callers hold the task's lock, which is
+        released while waiting."""
+        timeout = min(
+            MAX_LONG_POLL_TIMEOUT, MAX_LONG_POLL_TIMEOUT if timeout is None else timeout
+        )
+        condition = self.task_conditions.get(task_id)
+        if condition is None:
+            condition = self.task_conditions[task_id] = asyncio.Condition(
+                self.task_lock(task_id)
+            )
+
+        def changed() -> bool:
+            task = self.tasks.get(task_id)
+            return task is None or (task.version or 0) > since_version
+
+        self.task_waiters[task_id] += 1
+        try:
+            await asyncio.wait_for(condition.wait_for(changed), max(0.0, timeout))
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self.task_waiters[task_id] -= 1
+            if not self.task_waiters[task_id]:
+                del self.task_waiters[task_id]
+                del self.task_conditions[task_id]
+        return await self.load_task(task_id)
+
+    def _task_changed(self, task: Task):
+        """Bump the task's version, schedule persistence and wake long-polling
+        readers. Callers hold the task's lock."""
+        task.version = (task.version or 0) + 1
+        self.mark_task_dirty(task)
+        condition = self.task_conditions.get(task.id)
+        if condition is not None:
+            condition.notify_all()
+
     async def on_cancel_task(self, request: CancelTaskRequest) -> CancelTaskResponse:
         logger.info(f"Cancelling task {request.params.id}")
         task_id_params: TaskIdParams = request.params
 
-        async with self.lock:
-            task = self.tasks.get(task_id_params.id)
+        # One lock hold, so the agent run cannot finish the task in between.
+        async with self.task_lock(task_id_params.id):
+            task = await self.load_task(task_id_params.id)
             if task is None:
                 return CancelTaskResponse(id=request.id, error=TaskNotFoundError())
-
-        return CancelTaskResponse(id=request.id, error=TaskNotCancelableError())
+            if task.status.state in TERMINAL_STATES:
+                return CancelTaskResponse(id=request.id, error=TaskNotCancelableError())
+
+            # Mark the task first, so whoever awaits the running work can tell
+            # a tasks/cancel apart from its own cancellation.
+            self._apply_update(task, TaskStatus(state=TaskState.CANCELED), None)
+            running_task = self.running_tasks.pop(task_id_params.id, None)
+            if running_task is not None:
+                running_task.cancel()
+
+        await self.enqueue_events_for_sse(
+            task.id, TaskStatusUpdateEvent(id=task.id, status=task.status, final=True)
+        )
+        await self.send_task_notification(task)
+
+        return CancelTaskResponse(id=request.id, result=self.append_task_history(task, 0))
+
+    def track_running_task(
+        self, task_id: str, coro, slot: AgentSlot | None = None
+    ) -> asyncio.Task:
+        """Run the work for a task (typically the agent invocation) as an
+        asyncio.Task that tasks/cancel can stop.
+
+        With a slot from agent_scheduler.admit, the work waits for its turn
+        and frees the slot when done.
+        """
+        running_task = asyncio.create_task(slot.run(coro) if slot else coro)
+        if slot is not None:
+
+            def release_slot(_):
+                # In case it was cancelled before the work started.
+                coro.close()
+                slot.release()
+
+            running_task.add_done_callback(release_slot)
+        self.running_tasks[task_id] = running_task
+
+        def untrack(done_task: asyncio.Task):
+            if self.running_tasks.get(task_id) is done_task:
+                del self.running_tasks[task_id]
+
+        running_task.add_done_callback(untrack)
+        return running_task
+
+    async def send_task_notification(self, task: Task):
+        """Push the task's state to its notification URL, if the manager
+        supports push notifications."""
+        pass
 
     @abstractmethod
     async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
@@ -120,18 +461,19 @@ class InMemoryTaskManager(TaskManager):
         pass
 
     async def set_push_notification_info(self, task_id: str, notification_config: PushNotificationConfig):
-        async with self.lock:
-            task = self.tasks.get(task_id)
+        async with self.task_lock(task_id):
+            task = await self.load_task(task_id)
             if task is None:
                 raise ValueError(f"Task not found for {task_id}")
 
             self.push_notification_infos[task_id] = notification_config
+            self.mark_task_dirty(task)
 
         return
     
     async def get_push_notification_info(self, task_id: str) -> PushNotificationConfig:
-        async with self.lock:
-            task = self.tasks.get(task_id)
+        async with self.task_lock(task_id):
+            task = await self.load_task(task_id)
             if task is None:
                 raise ValueError(f"Task not found for {task_id}")
 
@@ -140,7 +482,8 @@ class InMemoryTaskManager(TaskManager):
         return
     
     async def has_push_notification_info(self, task_id: str) -> bool:
-        async with self.lock:
+        async with self.task_lock(task_id):
+            await self.load_task(task_id)
             return task_id in self.push_notification_infos
             
 
@@ -184,8 +527,8 @@ class InMemoryTaskManager(TaskManager):
 
     async def upsert_task(self, task_send_params: TaskSendParams) -> Task:
         logger.info(f"Upserting task {task_send_params.id}")
-        async with self.lock:
-            task = self.tasks.get(task_send_params.id)
+        async with self.task_lock(task_send_params.id):
+            task = await self.load_task(task_send_params.id)
             if task is None:
                 task = Task(
                     id=task_send_params.id,
@@ -195,37 +538,203 @@ class InMemoryTaskManager(TaskManager):
                     history=[task_send_params.message],
                 )
                 self.tasks[task_send_params.id] = task
+                self._evict_tasks(keep_task_id=task.id)
             else:
                 task.history.append(task_send_params.message)
+                self.tasks.move_to_end(task.id)
+                if task.status.state in TERMINAL_STATES:
+                    # A new message starts the finished task over.
+                    task.status = TaskStatus(state=TaskState.SUBMITTED)
+                    self.terminal_tasks.pop(task.id, None)
 
+            self._task_changed(task)
             return task
 
     async def on_resubscribe_to_task(
         self, request: TaskResubscriptionRequest
     ) -> Union[AsyncIterable[SendTaskStreamingResponse], JSONRPCResponse]:
-        return new_not_implemented_error(request.id)
+        task_id = request.params.id
+        try:
+            subscriber = await self.setup_sse_consumer(
+                task_id, True, request.params.lastEventId
+            )
+        except ValueError:
+            # No events were logged for the task, e.g. it was sent with
+            # tasks/send or reloaded after a restart.
+            task = await self.get_task(task_id)
+            if task is None:
+                return JSONRPCResponse(id=request.id, error=TaskNotFoundError())
+            return self._current_status_stream(request.id, task)
+
+        return self.dequeue_events_for_sse(request.id, task_id, subscriber)
+
+    async def _current_status_stream(self, request_id, task: Task):
+        """A stream holding only the task's current status, as a final event."""
+        event = TaskStatusUpdateEvent(id=task.id, status=task.status, final=True)
+        logged_event = LoggedEvent.encode(next(self.event_ids), event)
+        yield SSEEvent(logged_event.id, sse_response_encoder(request_id)(logged_event))
 
     async def update_store(
         self, task_id: str, status: TaskStatus, artifacts: list[Artifact]
     ) -> Task:
-        async with self.lock:
-            try:
-                task = self.tasks[task_id]
-            except KeyError:
+        """Apply a status change and new artifacts to a task. A task in a
+        terminal state is returned unchanged: e.g. an agent run finishing
+        just after tasks/cancel cannot turn CANCELED into COMPLETED. Only a
+        new message (upsert_task) starts a finished task over."""
+        async with self.task_lock(task_id):
+            task = await self.load_task(task_id)
+            if task is None:
                 logger.error(f"Task {task_id} not found for updating the task")
                 raise ValueError(f"Task {task_id} not found")
 
-            task.status = status
+            if task.status.state in TERMINAL_STATES:
+                logger.info(
+                    f"Ignoring {status.state.value} update to task {task_id}, "
+                    f"already {task.status.state.value}"
+                )
+                return task
 
-            if status.message is not None:
-                task.history.append(status.message)
+            self._apply_update(task, status, artifacts)
+            return task
 
-            if artifacts is not None:
-                if task.artifacts is None:
-                    task.artifacts = []
-                task.artifacts.extend(artifacts)
+    def _apply_update(
+        self, task: Task, status: TaskStatus, artifacts: list[Artifact] | None
+    ):
+        """Callers hold the task's lock."""
+        task.status = status
+        self.tasks.move_to_end(task.id)
+        if status.state in TERMINAL_STATES:
+            self.terminal_tasks.pop(task.id, None)
+            self.terminal_tasks[task.id] = time.monotonic()
+        else:
+            self.terminal_tasks.pop(task.id, None)
 
-            return task
+        if status.message is not None:
+            task.history.append(status.message)
+
+        if artifacts is not None:
+            if task.artifacts is None:
+                task.artifacts = []
+            task.artifacts.extend(artifacts)
+
+        self._evict_tasks(keep_task_id=task.id)
+        self._task_changed(task)
+
+    async def get_task(self, task_id: str) -> Task | None:
+        async with self.task_lock(task_id):
+            return await self.load_task(task_id)
+
+    async def load_task(self, task_id: str) -> Task | None:
+        """Return the stored task, or None if it does not exist.
+
+        Callers hold the task's lock. Persistent subclasses override this to
+        read through to their backing store.
+        """
+        return self.tasks.get(task_id)
+
+    def mark_task_dirty(self, task: Task):
+        """Called after a task or its push-notification config changed.
+
+        Persistent subclasses override this to schedule a write.
+        """
+        pass
+
+    def _evict_tasks(self, keep_task_id: str | None = None):
+        """Apply the retention policy.
+
+        This never awaits, so it runs atomically with respect to other
+        coroutines and needs no lock of its own. keep_task_id is the task being
+        worked on by the caller; it is never evicted for capacity.
+        """
+        if self.terminal_task_ttl is not None:
+            expire_before = time.monotonic() - self.terminal_task_ttl
+            while self.terminal_tasks:
+                task_id, finished_at = next(iter(self.terminal_tasks.items()))
+                if finished_at > expire_before:
+                    break
+                self._evict_task(task_id, "expired")
+
+        if self.max_tasks is None or len(self.tasks) <= self.max_tasks:
+            self.over_capacity = False
+            return
+
+        while len(self.tasks) > self.max_tasks and self.terminal_tasks:
+            self._evict_task(next(iter(self.terminal_tasks)), "terminal")
+
+        excess = len(self.tasks) - self.max_tasks
+        if excess <= 0:
+            self.over_capacity = False
+            return
+
+        idle_task_ids = []
+        for task_id, task in self.tasks.items():
+            if (
+                task_id != keep_task_id
+                and task_id not in self.running_tasks
+                and task.status.state not in ACTIVE_STATES
+                and not self.task_sse_subscribers.get(task_id)
+            ):
+                idle_task_ids.append(task_id)
+                if len(idle_task_ids) == excess:
+                    break
+        for task_id in idle_task_ids:
+            self._evict_task(task_id, "idle")
+
+        if len(idle_task_ids) < excess and not self.over_capacity:
+            logger.warning(
+                f"Task store holds {len(self.tasks)} tasks, above max_tasks="
+                f"{self.max_tasks}; the rest are still in progress"
+            )
+        self.over_capacity = len(idle_task_ids) < excess
+
+    def _evict_task(self, task_id: str, reason: str):
+        logger.debug(f"Evicting task {task_id} ({reason})")
+        self.tasks.pop(task_id, None)
+        self.terminal_tasks.pop(task_id, None)
+        self.push_notification_infos.pop(task_id, None)
+        # Plain dict mutation never yields to the event loop, so this is safe
+        # without taking subscriber_lock.
+        self.task_sse_subscribers.pop(task_id, None)
+        self.task_event_logs.pop(task_id, None)
+        self.eviction_counts[reason] += 1
+
+    def get_task_store_stats(self) -> dict[str, Any]:
+        return {
+            "tasks": len(self.tasks),
+            "terminal_tasks": len(self.terminal_tasks),
+            "push_notification_infos": len(self.push_notification_infos),
+            "sse_subscribed_tasks": len(self.task_sse_subscribers),
+            "evictions": dict(self.eviction_counts),
+        }
+
+    def collect_metrics(self):
+        states = Counter(task.status.state for task in self.tasks.values())
+        for state in TaskState:
+            TASKS.set(states[state], state.value)
+
+        depths = [
+            len(subscriber.events)
+            for subscribers in self.task_sse_subscribers.values()
+            for subscriber in subscribers
+        ]
+        SSE_SUBSCRIBERS.set(len(depths))
+        SSE_QUEUE_DEPTH.set(sum(depths))
+        SSE_QUEUE_DEPTH_MAX.set(max(depths, default=0))
+
+        AGENT_RUNS.set(self.agent_scheduler.running, "running")
+        AGENT_RUNS.set(self.agent_scheduler.queued, "queued")
+
+    def get_agent_scheduler_stats(self) -> dict[str, Any]:
+        """Agent runs in progress and waiting, and recent queue wait times."""
+        return self.agent_scheduler.get_stats()
+
+    def get_sse_subscriber_stats(self) -> list[dict[str, Any]]:
+        """Per-subscriber queue depth and lag, to spot slow SSE consumers."""
+        return [
+            subscriber.get_stats()
+            for subscribers in list(self.task_sse_subscribers.values())
+            for subscriber in subscribers
+        ]
 
     def append_task_history(self, task: Task, historyLength: int | None):
         new_task = task.model_copy()
@@ -236,42 +745,85 @@ class InMemoryTaskManager(TaskManager):
 
         return new_task        
 
-    async def setup_sse_consumer(self, task_id: str, is_resubscribe: bool = False):
+    async def setup_sse_consumer(
+        self,
+        task_id: str,
+        is_resubscribe: bool = False,
+        last_event_id: int | None = None,
+    ) -> SSESubscriber:
+        """Register a subscriber for the task's SSE events.
+
+        On resubscription the events logged after last_event_id (or the whole
+        log when it is None) are queued first. Both happen under
+        subscriber_lock, so the client sees no gap and no duplicate between
+        replayed and live events.
+        """
         async with self.subscriber_lock:
+            if is_resubscribe and task_id not in self.task_event_logs:
+                raise ValueError("Task not found for resubscription")
             if task_id not in self.task_sse_subscribers:
-                if is_resubscribe:
-                    raise ValueError("Task not found for resubscription")
-                else:
-                    self.task_sse_subscribers[task_id] = []
+                self.task_sse_subscribers[task_id] = []
 
-            sse_event_queue = asyncio.Queue(maxsize=0) # <=0 is unlimited
-            self.task_sse_subscribers[task_id].append(sse_event_queue)
-            return sse_event_queue
+            subscriber = SSESubscriber(
+                task_id, self.sse_queue_size, self.sse_overflow_policy
+            )
+            if is_resubscribe:
+                self._replay_events(task_id, last_event_id, subscriber)
+            self.task_sse_subscribers[task_id].append(subscriber)
+            return subscriber
+
+    def _replay_events(
+        self, task_id: str, last_event_id: int | None, subscriber: SSESubscriber
+    ):
+        event_log = self.task_event_logs[task_id]
+        if last_event_id is not None and event_log and event_log[0].id > last_event_id + 1:
+            logger.warning(
+                f"Events after {last_event_id} of task {task_id} were dropped "
+                "from the event log; replaying from the oldest kept event"
+            )
+
+        missed = [
+            logged_event
+            for logged_event in event_log
+            if last_event_id is None or logged_event.id > last_event_id
+        ]
+        if not missed and event_log and self._is_final_event(event_log[-1].event):
+            # The client already saw the end of the stream; resend the final
+            # event so the new stream terminates instead of hanging.
+            missed = [event_log[-1]]
+
+        subscriber.replay(missed)
+
+    @staticmethod
+    def _is_final_event(event) -> bool:
+        return isinstance(event, JSONRPCError) or (
+            isinstance(event, TaskStatusUpdateEvent) and event.final
+        )
 
     async def enqueue_events_for_sse(self, task_id, task_update_event):
         async with self.subscriber_lock:
-            if task_id not in self.task_sse_subscribers:
-                return
+            logged_event = LoggedEvent.encode(next(self.event_ids), task_update_event)
+            if task_id not in self.task_event_logs:
+                self.task_event_logs[task_id] = deque(maxlen=self.event_log_size)
+            self.task_event_logs[task_id].append(logged_event)
+            current_subscribers = list(self.task_sse_subscribers.get(task_id, ()))
 
-            current_subscribers = self.task_sse_subscribers[task_id]
-            for subscriber in current_subscribers:
-                await subscriber.put(task_update_event)
+        # Delivery never waits on a subscriber, so a slow client cannot hold
+        # up the others.
+        for subscriber in current_subscribers:
+            subscriber.offer(logged_event)
 
     async def dequeue_events_for_sse(
-        self, request_id, task_id, sse_event_queue: asyncio.Queue
-    ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
+        self, request_id, task_id, subscriber: SSESubscriber
+    ) -> AsyncIterable[SSEEvent] | JSONRPCResponse:
+        encode = sse_response_encoder(request_id)
         try:
             while True:                
-                event = await sse_event_queue.get()
-                if isinstance(event, JSONRPCError):
-                    yield SendTaskStreamingResponse(id=request_id, error=event)
-                    break
-                                                
-                yield SendTaskStreamingResponse(id=request_id, result=event)
-                if isinstance(event, TaskStatusUpdateEvent) and event.final:
+                logged_event = await subscriber.get()
+                yield SSEEvent(logged_event.id, encode(logged_event))
+                if self._is_final_event(logged_event.event):
                     break
         finally:
             async with self.subscriber_lock:
                 if task_id in self.task_sse_subscribers:
-                    self.task_sse_subscribers[task_id].remove(sse_event_queue)
-
+                    self.task_sse_subscribers[task_id].remove(subscriber)
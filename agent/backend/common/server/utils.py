@@ -26,3 +26,13 @@ def new_incompatible_types_error(request_id):
 
 def new_not_implemented_error(request_id):
     return JSONRPCResponse(id=request_id, error=UnsupportedOperationError())
+
+
+def encode_json_rpc_response(response: JSONRPCResponse) -> bytes:
+    """Serialize a response straight to JSON bytes, skipping the dict round-trip
+    of model_dump + json.dumps."""
+    return response.__pydantic_serializer__.to_json(response, exclude_none=True)
+
+
+def encode_json_rpc_batch_response(responses: List[JSONRPCResponse]) -> bytes:
+    return b"[" + b",".join(encode_json_rpc_response(r) for r in responses) + b"]"
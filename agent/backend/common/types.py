@@ -89,6 +89,8 @@ class Task(BaseModel):
     artifacts: List[Artifact] | None = None
     history: List[Message] | None = None
     metadata: dict[str, Any] | None = None
+    # Incremented by the server on every change; see TaskQueryParams.sinceVersion.
+    version: int | None = None
 
 
 class TaskStatusUpdateEvent(BaseModel):
@@ -104,6 +106,21 @@ class TaskArtifactUpdateEvent(BaseModel):
     metadata: dict[str, Any] | None = None
 
 
+class TaskNotificationDelta(BaseModel):
+    """Push-notification payload in delta mode: what changed in a task since
+    the previous notification for it. sequence starts at 1 and increases by
+    one per notification, so receivers can order them and detect gaps."""
+
+    id: str
+    sessionId: str | None = None
+    sequence: int
+    status: TaskStatus
+    history: List[Message] | None = None
+    artifacts: List[Artifact] | None = None
+    metadata: dict[str, Any] | None = None
+    final: bool = False
+
+
 class AuthenticationInfo(BaseModel):
     model_config = ConfigDict(extra="allow")
 
@@ -124,6 +141,10 @@ class TaskIdParams(BaseModel):
 
 class TaskQueryParams(TaskIdParams):
     historyLength: int | None = None
+    # Long-poll: answer once the task's version is above sinceVersion, or
+    # after waitTimeout seconds (capped by the server) with the task as is.
+    sinceVersion: int | None = None
+    waitTimeout: float | None = None
 
 
 class TaskSendParams(BaseModel):
@@ -181,6 +202,9 @@ class SendTaskStreamingRequest(JSONRPCRequest):
 
 class SendTaskStreamingResponse(JSONRPCResponse):
     result: TaskStatusUpdateEvent | TaskArtifactUpdateEvent | None = None
+    # Set by A2AClient to the SSE id of the event this arrived in; pass the
+    # last one to resubscribe_task to resume. Not part of the payload.
+    eventId: int | None = Field(default=None, exclude=True)
 
 
 class GetTaskRequest(JSONRPCRequest):
@@ -219,9 +243,15 @@ class GetTaskPushNotificationResponse(JSONRPCResponse):
     result: TaskPushNotificationConfig | None = None
 
 
+class TaskResubscriptionParams(TaskIdParams):
+    # Replay only events after this SSE event id. Servers also take it from
+    # the Last-Event-ID header.
+    lastEventId: int | None = None
+
+
 class TaskResubscriptionRequest(JSONRPCRequest):
     method: Literal["tasks/resubscribe",] = "tasks/resubscribe"
-    params: TaskIdParams
+    params: TaskResubscriptionParams
 
 
 A2ARequest = TypeAdapter(
@@ -239,6 +269,31 @@ A2ARequest = TypeAdapter(
     ]
 )
 
+# Per-method adapters let the server validate a raw request body against a
+# single request type instead of walking the whole A2ARequest union.
+A2A_REQUEST_ADAPTERS: dict[str, TypeAdapter] = {
+    request_type.model_fields["method"].default: TypeAdapter(request_type)
+    for request_type in (
+        SendTaskRequest,
+        GetTaskRequest,
+        CancelTaskRequest,
+        SetTaskPushNotificationRequest,
+        GetTaskPushNotificationRequest,
+        TaskResubscriptionRequest,
+        SendTaskStreamingRequest,
+    )
+}
+
+
+class JSONRPCRequestHeader(BaseModel):
+    """The envelope fields needed to route a request before full validation."""
+
+    id: int | str | None = None
+    method: str | None = None
+
+
+JSONRPCRequestHeaderAdapter = TypeAdapter(JSONRPCRequestHeader)
+
 ## Error types
 
 
@@ -302,6 +357,21 @@ class ContentTypeNotSupportedError(JSONRPCError):
     data: None = None
 
 
+class ServerBusyError(JSONRPCError):
+    code: int = -32010
+    message: str = "Server is busy, retry later"
+    data: None = None
+
+
+class StreamOverflowError(JSONRPCError):
+    """Ends an SSE stream whose client fell too far behind; the task goes on
+    and the client can resume it with tasks/resubscribe."""
+
+    code: int = -32011
+    message: str = "SSE consumer too slow; reconnect with tasks/resubscribe"
+    data: None = None
+
+
 class AgentProvider(BaseModel):
     organization: str
     url: str | None = None
@@ -359,6 +429,12 @@ class A2AClientJSONError(A2AClientError):
         super().__init__(f"JSON Error: {message}")
 
 
+class A2AClientTimeoutError(A2AClientError):
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(f"Timeout Error: {message}")
+
+
 class MissingAPIKeyError(Exception):
     """Exception for missing API key."""
 
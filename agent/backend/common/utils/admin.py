@@ -0,0 +1,19 @@
+"""Access check for admin endpoints (diagnostics, profiling)."""
+
+from starlette.requests import Request
+import hmac
+import os
+
+ADMIN_TOKEN_ENV = "A2A_ADMIN_TOKEN"
+LOCAL_HOSTS = ("127.0.0.1", "::1", "localhost")
+
+
+def is_admin_request(request: Request) -> bool:
+    """With A2A_ADMIN_TOKEN set, require it as a bearer token; otherwise only
+    allow clients on the same machine."""
+    token = os.environ.get(ADMIN_TOKEN_ENV)
+    if token:
+        return hmac.compare_digest(
+            request.headers.get("authorization", ""), f"Bearer {token}"
+        )
+    return request.client is not None and request.client.host in LOCAL_HOSTS
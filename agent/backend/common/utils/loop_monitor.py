@@ -0,0 +1,169 @@
+"""Event-loop lag sampling and blocking-call detection.
+
+A coroutine on the loop ticks every `interval` seconds and records how late
+each tick fires. A watchdog thread watches those ticks; when the loop has
+not ticked for longer than `threshold`, something is blocking it, and the
+watchdog grabs the loop thread's current stack. Identical stacks are
+aggregated, so the report shows which code blocks the loop and how often.
+"""
+
+from collections import deque
+from typing import Any
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from common.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG_SECONDS = REGISTRY.histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a timer scheduled by the lag sampler.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_BLOCKED = REGISTRY.counter(
+    "event_loop_blocked_total",
+    "Times the watchdog found the event loop blocked for longer than the threshold.",
+)
+
+# Frames kept per stack sample, innermost last.
+MAX_STACK_DEPTH = 30
+
+
+class LoopMonitor:
+    def __init__(
+        self,
+        interval: float = 0.05,
+        threshold: float = 0.1,
+        max_stacks: int = 50,
+    ):
+        """
+        Args:
+            interval: Seconds between lag samples.
+            threshold: Seconds the loop may go without ticking before the
+                watchdog records the stack that is blocking it.
+            max_stacks: Distinct blocking stacks kept in the report.
+        """
+        self.interval = interval
+        self.threshold = threshold
+        self.max_stacks = max_stacks
+        self.heartbeat = time.monotonic()
+        self.lags: deque[float] = deque(maxlen=1200)
+        self.max_lag = 0.0
+        # Stack (tuple of frame strings) -> aggregate.
+        self.blocking_stacks: dict[tuple[str, ...], dict[str, Any]] = {}
+        self._stacks_lock = threading.Lock()
+        self._loop_thread_id: int | None = None
+        self._sampler: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Start monitoring the running event loop."""
+        if self._sampler is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._sampler = asyncio.create_task(self._sample())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-monitor", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self):
+        if self._sampler is None:
+            return
+        self._stopped.set()
+        self._sampler.cancel()
+        try:
+            await self._sampler
+        except asyncio.CancelledError:
+            pass
+        self._sampler = None
+        self._watchdog = None
+
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.heartbeat = time.monotonic()
+            self.lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG_SECONDS.observe(lag)
+
+    def _watch(self):
+        # Heartbeat of the current blocking episode and the stacks seen in it,
+        # so a long block is counted once.
+        episode = None
+        episode_stacks = set()
+        while not self._stopped.wait(self.threshold / 2):
+            heartbeat = self.heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval
+            if blocked <= self.threshold:
+                continue
+            if heartbeat != episode:
+                episode = heartbeat
+                episode_stacks = set()
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = tuple(
+                f"{entry.filename}:{entry.lineno} in {entry.name}"
+                for entry in traceback.extract_stack(frame)[-MAX_STACK_DEPTH:]
+            )
+            self._record(stack, blocked, new_episode=stack not in episode_stacks)
+            episode_stacks.add(stack)
+
+    def _record(self, stack: tuple[str, ...], blocked: float, new_episode: bool):
+        with self._stacks_lock:
+            entry = self.blocking_stacks.get(stack)
+            if entry is None:
+                if len(self.blocking_stacks) >= self.max_stacks:
+                    return
+                entry = self.blocking_stacks[stack] = {
+                    "stack": list(stack),
+                    "count": 0,
+                    "max_blocked_seconds": 0.0,
+                }
+                logger.warning(
+                    f"Event loop blocked for {blocked:.3f}s at {stack[-1] if stack else '?'}"
+                )
+            if new_episode:
+                entry["count"] += 1
+                LOOP_BLOCKED.inc()
+            entry["max_blocked_seconds"] = max(entry["max_blocked_seconds"], blocked)
+            entry["last_seen"] = time.time()
+
+    def reset(self):
+        with self._stacks_lock:
+            self.blocking_stacks.clear()
+        self.lags.clear()
+        self.max_lag = 0.0
+
+    def get_report(self) -> dict[str, Any]:
+        lags = sorted(self.lags)
+        with self._stacks_lock:
+            stacks = sorted(
+                (dict(entry) for entry in self.blocking_stacks.values()),
+                key=lambda entry: entry["max_blocked_seconds"],
+                reverse=True,
+            )
+        return {
+            "running": self._sampler is not None,
+            "interval_seconds": self.interval,
+            "threshold_seconds": self.threshold,
+            "lag_seconds": {
+                "p50": lags[int(0.5 * (len(lags) - 1))] if lags else 0.0,
+                "p99": lags[int(0.99 * (len(lags) - 1))] if lags else 0.0,
+                "max": self.max_lag,
+            },
+            "blocking_stacks": stacks,
+        }
@@ -0,0 +1,203 @@
+"""On-demand cProfile profiling of individual requests.
+
+An admin turns profiling on for a time window and a fraction of requests.
+A sampled request's coroutine is wrapped so the profiler runs only while
+that coroutine (or a task it creates) is executing, not while other
+requests run in between its awaits. Profiles are aggregated per endpoint
+and can be downloaded in pstats format (for snakeviz, pstats, etc.) or as
+text.
+
+While profiling is off, wrap() returns the coroutine untouched, and the
+event loop's task factory is the one it had before profiling was enabled.
+"""
+
+from collections import deque
+from collections.abc import Coroutine
+from contextvars import ContextVar
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+import asyncio
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import time
+
+# Profile of the request whose code is currently running.
+_current_profile: ContextVar[cProfile.Profile | None] = ContextVar(
+    "current_profile", default=None
+)
+# Only one profiler can be enabled per thread.
+_enabled_profile: cProfile.Profile | None = None
+
+
+class ProfiledCoroutine(Coroutine):
+    """Runs a coroutine with its profile enabled for each step."""
+
+    def __init__(self, coro, profile: cProfile.Profile):
+        self.coro = coro
+        self.profile = profile
+
+    def _step(self, method, *args):
+        global _enabled_profile
+        if _enabled_profile is not None:
+            # Awaited from inside another profiled step, which already counts it.
+            return method(*args)
+
+        token = _current_profile.set(self.profile)
+        _enabled_profile = self.profile
+        self.profile.enable()
+        try:
+            return method(*args)
+        finally:
+            self.profile.disable()
+            _enabled_profile = None
+            _current_profile.reset(token)
+
+    def send(self, value):
+        return self._step(self.coro.send, value)
+
+    def throw(self, *args):
+        return self._step(self.coro.throw, *args)
+
+    def close(self):
+        self.coro.close()
+
+    def __await__(self):
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.send(None)
+
+
+class RequestProfiler:
+    def __init__(self, max_profiles_per_key: int = 200):
+        """
+        Args:
+            max_profiles_per_key: Most recent request profiles kept per
+                endpoint.
+        """
+        self.max_profiles_per_key = max_profiles_per_key
+        self.sample_rate = 0.0
+        self.until = 0.0
+        self.profiles: dict[str, deque[cProfile.Profile]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._previous_task_factory = None
+        # Turns profiling off, restoring the task factory, when the window ends.
+        self._disable_handle: asyncio.TimerHandle | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 and time.monotonic() < self.until
+
+    def enable(self, sample_rate: float = 1.0, duration: float = 60.0):
+        """Profile sample_rate of requests for the next duration seconds."""
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.until = time.monotonic() + duration
+        if self._loop is None:
+            # Tasks a sampled request creates (e.g. the agent run) are
+            # profiled as part of it.
+            self._loop = asyncio.get_running_loop()
+            self._previous_task_factory = self._loop.get_task_factory()
+            self._loop.set_task_factory(self._task_factory)
+        if self._disable_handle is not None:
+            self._disable_handle.cancel()
+        self._disable_handle = self._loop.call_later(duration, self.disable)
+
+    def disable(self):
+        self.sample_rate = 0.0
+        if self._disable_handle is not None:
+            self._disable_handle.cancel()
+            self._disable_handle = None
+        if self._loop is not None:
+            self._loop.set_task_factory(self._previous_task_factory)
+            self._loop = None
+            self._previous_task_factory = None
+
+    def clear(self):
+        self.profiles.clear()
+
+    def wrap(self, key: str, coro):
+        """Return coro, profiled under key if this request is sampled."""
+        if not self.enabled or random.random() >= self.sample_rate:
+            return coro
+
+        profile = cProfile.Profile()
+        profiles = self.profiles.get(key)
+        if profiles is None:
+            profiles = self.profiles[key] = deque(maxlen=self.max_profiles_per_key)
+        profiles.append(profile)
+        return ProfiledCoroutine(coro, profile)
+
+    def _task_factory(self, loop, coro, **kwargs):
+        profile = _current_profile.get()
+        if profile is not None:
+            coro = ProfiledCoroutine(coro, profile)
+        if self._previous_task_factory is not None:
+            return self._previous_task_factory(loop, coro, **kwargs)
+        return asyncio.Task(coro, loop=loop, **kwargs)
+
+    def get_stats(self, key: str) -> pstats.Stats | None:
+        profiles = self.profiles.get(key)
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in list(profiles)[1:]:
+            stats.add(profile)
+        return stats
+
+    def get_status(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "seconds_left": max(0.0, self.until - time.monotonic()) if self.enabled else 0.0,
+            "profiled_requests": {key: len(profiles) for key, profiles in self.profiles.items()},
+        }
+
+    async def handle_admin_request(self, request: Request) -> Response:
+        """Admin endpoint:
+        - GET: status, or with ?key=<endpoint> the aggregated profile, as a
+          pstats file or with &format=text as the top functions.
+        - POST ?sample_rate=0.1&duration=60: start profiling.
+        - DELETE: stop profiling and drop collected profiles.
+        """
+        params = request.query_params
+        if request.method == "POST":
+            try:
+                self.enable(
+                    float(params.get("sample_rate", 1.0)),
+                    float(params.get("duration", 60.0)),
+                )
+            except ValueError:
+                return JSONResponse({"error": "Invalid sample_rate or duration"}, status_code=400)
+            return JSONResponse(self.get_status())
+
+        if request.method == "DELETE":
+            self.disable()
+            self.clear()
+            return JSONResponse(self.get_status())
+
+        key = params.get("key")
+        if key is None:
+            return JSONResponse(self.get_status())
+
+        stats = self.get_stats(key)
+        if stats is None:
+            return JSONResponse({"error": f"No profiles for {key}"}, status_code=404)
+
+        if params.get("format") == "text":
+            output = io.StringIO()
+            stats.stream = output
+            stats.sort_stats("cumulative").print_stats(50)
+            return PlainTextResponse(output.getvalue())
+
+        filename = key.strip("/").replace("/", "_") or "root"
+        return Response(
+            marshal.dumps(stats.stats),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.prof"'},
+        )
@@ -7,15 +7,46 @@ from typing import Any
 import jwt
 import time
 import json
+import asyncio
 import hashlib
 import httpx
 import logging
+import os
 
 from jwt import PyJWK, PyJWKClient
+from common.utils.metrics import REGISTRY
 
 logger = logging.getLogger(__name__)
+
+PUSH_NOTIFICATION_SECONDS = REGISTRY.histogram(
+    "a2a_push_notification_duration_seconds",
+    "Time to sign and deliver a push notification, by outcome.",
+    ("outcome",),
+)
+PUSH_NOTIFICATION_FAILURES = REGISTRY.counter(
+    "a2a_push_notification_failures_total", "Push notifications that could not be delivered."
+)
 AUTH_HEADER_PREFIX = 'Bearer '
 
+# Signing algorithms and the key each needs. ES256 and EdDSA sign far faster
+# than RS256 and their keys are generated in milliseconds.
+SIGNING_ALGORITHMS = {
+    "RS256": {"kty": "RSA", "size": 2048},
+    "ES256": {"kty": "EC", "crv": "P-256"},
+    "EdDSA": {"kty": "OKP", "crv": "Ed25519"},
+}
+
+# Seconds before a failed key rotation is tried again.
+KEY_ROTATION_RETRY_DELAY = 60
+
+
+def generate_signing_key(algorithm: str) -> jwk.JWK:
+    if algorithm not in SIGNING_ALGORITHMS:
+        raise ValueError(f"Unsupported signing algorithm: {algorithm}")
+    return jwk.JWK.generate(
+        **SIGNING_ALGORITHMS[algorithm], kid=str(uuid.uuid4()), use="sig", alg=algorithm
+    )
+
 class PushNotificationAuth:
     def _calculate_request_body_sha256(self, data: dict[str, Any]):
         """Calculates the SHA256 hash of a request body.
@@ -32,33 +63,245 @@ class PushNotificationAuth:
         return hashlib.sha256(body_str.encode()).hexdigest()
 
 class PushNotificationSenderAuth(PushNotificationAuth):
-    def __init__(self):
+    def __init__(
+        self,
+        algorithm: str = "RS256",
+        verified_url_ttl: float = 3600,
+        failed_url_ttl: float = 60,
+        max_cached_urls: int = 10000,
+    ):
+        """
+        Args:
+            algorithm: JWT signing algorithm, one of SIGNING_ALGORITHMS.
+            verified_url_ttl: Seconds a verified push URL is trusted before it
+                is challenged again.
+            failed_url_ttl: Seconds a URL that failed verification is rejected
+                without another challenge.
+            max_cached_urls: Verification results kept; the oldest go first.
+        """
+        if algorithm not in SIGNING_ALGORITHMS:
+            raise ValueError(f"Unsupported signing algorithm: {algorithm}")
+        self.algorithm = algorithm
         self.public_keys = []
         self.private_key_jwk: PyJWK = None
+        # Set by load_keys: the key file, and the keys in it newest first as
+        # {"created_at": epoch seconds, "jwk": private JWK dict}.
+        self.key_store_path: str | None = None
+        self.stored_keys: list[dict[str, Any]] = []
+        self.key_rotation_interval: float | None = None
+        self.key_retention: float = 0
+        # Rotates the key when it expires; started with the first delivery.
+        self._key_rotation_task: asyncio.Task | None = None
+        self._http_client: httpx.AsyncClient | None = None
+        self.verified_url_ttl = verified_url_ttl
+        self.failed_url_ttl = failed_url_ttl
+        self.max_cached_urls = max_cached_urls
+        # URL -> (verified, monotonic expiry time), oldest first.
+        self.url_verifications: dict[str, tuple[bool, float]] = {}
+        self.pending_verifications: dict[str, asyncio.Task] = {}
 
-    @staticmethod
-    async def verify_push_notification_url(url: str) -> bool:
-        async with httpx.AsyncClient(timeout=10) as client:
-            try:
-                validation_token = str(uuid.uuid4())
-                response = await client.get(
-                    url,
-                    params={"validationToken": validation_token}
-                )
-                response.raise_for_status()
-                is_verified = response.text == validation_token
-
-                logger.info(f"Verified push-notification URL: {url} => {is_verified}")            
-                return is_verified                
-            except Exception as e:
-                logger.warning(f"Error during sending push-notification for URL {url}: {e}")
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Pooled client shared by all push-notification deliveries."""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                timeout=10,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            )
+        return self._http_client
 
-        return False
+    async def aclose(self):
+        if self._key_rotation_task is not None:
+            self._key_rotation_task.cancel()
+            self._key_rotation_task = None
+        for verification in list(self.pending_verifications.values()):
+            verification.cancel()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    def get_cached_url_verification(self, url: str) -> bool | None:
+        """The unexpired verification result for url, or None if unknown."""
+        cached = self.url_verifications.get(url)
+        if cached is None:
+            return None
+        verified, expires_at = cached
+        if time.monotonic() >= expires_at:
+            del self.url_verifications[url]
+            return None
+        return verified
+
+    def check_push_notification_url(self, url: str) -> bool | None:
+        """Return the cached verification result for url without waiting.
+
+        If the URL is unknown, verification starts in the background and None
+        is returned; verify_push_notification_url then waits for it.
+        """
+        verified = self.get_cached_url_verification(url)
+        if verified is None:
+            self._start_url_verification(url)
+        return verified
+
+    async def verify_push_notification_url(self, url: str) -> bool:
+        verified = self.get_cached_url_verification(url)
+        if verified is not None:
+            return verified
+        # Shielded, since other callers may be waiting on the same check.
+        return await asyncio.shield(self._start_url_verification(url))
+
+    def _start_url_verification(self, url: str) -> asyncio.Task:
+        verification = self.pending_verifications.get(url)
+        if verification is None:
+            verification = asyncio.create_task(self._challenge_url(url))
+            self.pending_verifications[url] = verification
+            verification.add_done_callback(
+                lambda _: self.pending_verifications.pop(url, None)
+            )
+        return verification
+
+    async def _challenge_url(self, url: str) -> bool:
+        is_verified = False
+        try:
+            validation_token = str(uuid.uuid4())
+            response = await self.http_client.get(
+                url,
+                params={"validationToken": validation_token}
+            )
+            response.raise_for_status()
+            is_verified = response.text == validation_token
+
+            logger.info(f"Verified push-notification URL: {url} => {is_verified}")            
+        except Exception as e:
+            logger.warning(f"Error during sending push-notification for URL {url}: {e}")
+
+        ttl = self.verified_url_ttl if is_verified else self.failed_url_ttl
+        self.url_verifications.pop(url, None)
+        self.url_verifications[url] = (is_verified, time.monotonic() + ttl)
+        while len(self.url_verifications) > self.max_cached_urls:
+            del self.url_verifications[next(iter(self.url_verifications))]
+        return is_verified
 
     def generate_jwk(self):
-        key = jwk.JWK.generate(kty='RSA', size=2048, kid=str(uuid.uuid4()), use="sig")
+        key = generate_signing_key(self.algorithm)
         self.public_keys.append(key.export_public(as_dict=True))
         self.private_key_jwk = PyJWK.from_json(key.export_private())
+
+    def load_keys(
+        self,
+        path: str,
+        rotation_interval: float | None = 30 * 24 * 3600,
+        key_retention: float = 7 * 24 * 3600,
+    ):
+        """Use signing keys persisted in a JSON file, creating it if needed.
+
+        The same key survives restarts, so receivers' cached JWKS stay valid.
+        A new key is generated once the current one is rotation_interval
+        seconds old (or was made for another algorithm): here if it already
+        is, later by a background task off the event loop. Replaced keys stay
+        published in the JWKS for key_retention seconds, so notifications
+        signed just before a rotation still verify.
+        """
+        self.key_store_path = path
+        self.key_rotation_interval = rotation_interval
+        self.key_retention = key_retention
+        self.stored_keys = []
+        if os.path.exists(path):
+            with open(path) as f:
+                self.stored_keys = json.load(f)["keys"]
+
+        current = self.stored_keys[0] if self.stored_keys else None
+        if (
+            current is None
+            or current["jwk"].get("alg") != self.algorithm
+            or self._key_expired(current)
+        ):
+            self.rotate_key()
+        else:
+            self._use_stored_keys()
+
+    def rotate_key(self):
+        """Start signing with a new key, keeping recent keys published."""
+        self._install_keys(*self._prepare_rotation())
+
+    def _prepare_rotation(self) -> tuple[list[dict[str, Any]], list[dict], PyJWK]:
+        """Generate the next key and persist the new key set, without touching
+        the keys in use. Safe to run in a worker thread."""
+        key = generate_signing_key(self.algorithm)
+        now = time.time()
+        stored_keys = [
+            {"created_at": now, "jwk": key.export_private(as_dict=True)}
+        ] + self.stored_keys
+        # A key stops signing when its successor is created; keep it until
+        # it has been retired for key_retention.
+        stored_keys = [stored_keys[0]] + [
+            stored
+            for newer, stored in zip(stored_keys, stored_keys[1:])
+            if now - newer["created_at"] < self.key_retention
+        ]
+        if self.key_store_path is not None:
+            self._save_keys(stored_keys)
+        public_keys, private_key_jwk = self._load_key_set(stored_keys)
+        return stored_keys, public_keys, private_key_jwk
+
+    def _install_keys(
+        self,
+        stored_keys: list[dict[str, Any]],
+        public_keys: list[dict],
+        private_key_jwk: PyJWK,
+    ):
+        # Publish the new key before signing with it.
+        self.stored_keys = stored_keys
+        self.public_keys = public_keys
+        self.private_key_jwk = private_key_jwk
+        logger.info(f"Push-notification signing key rotated; kid={private_key_jwk.key_id}")
+
+    def _start_key_rotation(self):
+        if (
+            self._key_rotation_task is None
+            and self.key_rotation_interval is not None
+            and self.stored_keys
+        ):
+            self._key_rotation_task = asyncio.create_task(self._rotate_keys_when_expired())
+
+    async def _rotate_keys_when_expired(self):
+        """Rotate the signing key each time it expires. Key generation and the
+        key file write run in a thread so deliveries keep flowing."""
+        while True:
+            age = time.time() - self.stored_keys[0]["created_at"]
+            await asyncio.sleep(max(0.0, self.key_rotation_interval - age))
+            try:
+                keys = await asyncio.to_thread(self._prepare_rotation)
+            except Exception as e:
+                logger.error(f"Push-notification key rotation failed: {e}")
+                await asyncio.sleep(KEY_ROTATION_RETRY_DELAY)
+                continue
+            # Swapped in on the event loop, so a signer never pairs the new
+            # kid with the old key.
+            self._install_keys(*keys)
+
+    def _key_expired(self, stored_key: dict[str, Any]) -> bool:
+        return (
+            self.key_rotation_interval is not None
+            and time.time() - stored_key["created_at"] >= self.key_rotation_interval
+        )
+
+    def _use_stored_keys(self):
+        self.public_keys, self.private_key_jwk = self._load_key_set(self.stored_keys)
+
+    @staticmethod
+    def _load_key_set(stored_keys: list[dict[str, Any]]) -> tuple[list[dict], PyJWK]:
+        public_keys = [
+            jwk.JWK(**stored["jwk"]).export_public(as_dict=True)
+            for stored in stored_keys
+        ]
+        return public_keys, PyJWK.from_dict(stored_keys[0]["jwk"])
+
+    def _save_keys(self, stored_keys: list[dict[str, Any]]):
+        tmp_path = f"{self.key_store_path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"keys": stored_keys}, f)
+        os.replace(tmp_path, self.key_store_path)
     
     def handle_jwks_endpoint(self, _request: Request):
         """Allow clients to fetch public keys.
@@ -73,30 +316,41 @@ class PushNotificationSenderAuth(PushNotificationAuth):
         Payload is signed with private key and it ensures the integrity of payload for client.
         Including iat prevents from replay attack.
         """
-        
+        private_key_jwk = self.private_key_jwk
         iat = int(time.time())
 
         return jwt.encode(
             {"iat": iat, "request_body_sha256": self._calculate_request_body_sha256(data)},
-            key=self.private_key_jwk,
-            headers={"kid": self.private_key_jwk.key_id},
-            algorithm="RS256"
+            key=private_key_jwk,
+            headers={"kid": private_key_jwk.key_id},
+            algorithm=self.algorithm
         )
 
-    async def send_push_notification(self, url: str, data: dict[str, Any]):
+    async def post_push_notification(self, url: str, data: dict[str, Any]):
+        """Sign and deliver one push notification, raising on failure."""
+        start = time.perf_counter()
+        self._start_key_rotation()
         jwt_token = self._generate_jwt(data)
         headers = {'Authorization': f"Bearer {jwt_token}"}
-        async with httpx.AsyncClient(timeout=10) as client: 
-            try:
-                response = await client.post(
-                    url,
-                    json=data,
-                    headers=headers
-                )
-                response.raise_for_status()
-                logger.info(f"Push-notification sent for URL: {url}")                            
-            except Exception as e:
-                logger.warning(f"Error during sending push-notification for URL {url}: {e}")
+        try:
+            response = await self.http_client.post(
+                url,
+                json=data,
+                headers=headers
+            )
+            response.raise_for_status()
+        except Exception:
+            PUSH_NOTIFICATION_SECONDS.observe(time.perf_counter() - start, "failed")
+            PUSH_NOTIFICATION_FAILURES.inc()
+            raise
+        PUSH_NOTIFICATION_SECONDS.observe(time.perf_counter() - start, "sent")
+
+    async def send_push_notification(self, url: str, data: dict[str, Any]):
+        try:
+            await self.post_push_notification(url, data)
+            logger.info(f"Push-notification sent for URL: {url}")                            
+        except Exception as e:
+            logger.warning(f"Error during sending push-notification for URL {url}: {e}")
 
 class PushNotificationReceiverAuth(PushNotificationAuth):
     def __init__(self):
@@ -119,7 +373,7 @@ class PushNotificationReceiverAuth(PushNotificationAuth):
             token,
             signing_key,
             options={"require": ["iat", "request_body_sha256"]},
-            algorithms=["RS256"],
+            algorithms=list(SIGNING_ALGORITHMS),
         )
 
         actual_body_sha256 = self._calculate_request_body_sha256(await request.json())
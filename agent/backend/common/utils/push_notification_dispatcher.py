@@ -0,0 +1,238 @@
+"""Background delivery of push notifications.
+
+Task handlers hand notifications to a PushNotificationDispatcher and move
+on; a pool of workers signs and posts them over the sender's pooled
+client, retries failures with exponential backoff, and parks notifications
+that keep failing in a bounded dead-letter buffer.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+import asyncio
+import logging
+import random
+import time
+
+import httpx
+
+from common.utils.metrics import REGISTRY
+from common.utils.push_notification_auth import PushNotificationSenderAuth
+
+logger = logging.getLogger(__name__)
+
+PUSH_NOTIFICATIONS = REGISTRY.counter(
+    "a2a_push_notifications_total",
+    "Push notifications by final outcome (delivered, dead_lettered, dropped), plus retries.",
+    ("outcome",),
+)
+PUSH_NOTIFICATION_QUEUE_DEPTH = REGISTRY.gauge(
+    "a2a_push_notification_queue_depth",
+    "Push notifications waiting for delivery or a retry.",
+)
+
+# Client errors worth retrying; other 4xx responses will not change.
+RETRYABLE_STATUS_CODES = (408, 425, 429)
+
+
+@dataclass
+class PushNotification:
+    url: str
+    data: dict[str, Any]
+    attempts: int = 0
+    created_at: float = field(default_factory=time.time)
+    last_error: str | None = None
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        return status_code >= 500 or status_code in RETRYABLE_STATUS_CODES
+    return True
+
+
+class PushNotificationDispatcher:
+    def __init__(
+        self,
+        sender_auth: PushNotificationSenderAuth,
+        workers: int = 8,
+        max_queue_size: int = 10000,
+        max_attempts: int = 5,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        per_url_concurrency: int = 4,
+        dead_letter_size: int = 1000,
+    ):
+        """
+        Args:
+            sender_auth: Signs and posts the notifications.
+            workers: Deliveries in flight at once across all URLs.
+            max_queue_size: Notifications waiting for delivery; further ones
+                are dropped.
+            max_attempts: Delivery attempts before a notification is
+                dead-lettered.
+            initial_backoff: Seconds before the first retry; doubles per
+                attempt, with jitter.
+            max_backoff: Upper bound on the retry delay in seconds.
+            per_url_concurrency: Deliveries in flight at once per URL, so a
+                slow receiver cannot take up every worker.
+            dead_letter_size: Failed notifications kept for inspection.
+        """
+        self.sender_auth = sender_auth
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.per_url_concurrency = per_url_concurrency
+        self.queue: asyncio.Queue[PushNotification] = asyncio.Queue(max_queue_size)
+        self.dead_letters: deque[PushNotification] = deque(maxlen=dead_letter_size)
+        # Deliveries in flight per URL, and notifications held back because
+        # their URL was at per_url_concurrency.
+        self.url_in_flight: dict[str, int] = {}
+        self.url_backlog: dict[str, deque[PushNotification]] = {}
+        # Notifications accepted but not yet delivered or given up on.
+        self.pending = 0
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.retry_timers: set[asyncio.TimerHandle] = set()
+        self._worker_tasks: list[asyncio.Task] = []
+
+    def submit(self, url: str, data: dict[str, Any]) -> bool:
+        """Queue a notification without waiting. Returns False if it was
+        dropped because the queue is full."""
+        if not self._worker_tasks:
+            self._worker_tasks = [
+                asyncio.create_task(self._worker()) for _ in range(self.workers)
+            ]
+
+        try:
+            self.queue.put_nowait(PushNotification(url, data))
+        except asyncio.QueueFull:
+            logger.warning(f"Push-notification queue full; dropping notification for {url}")
+            PUSH_NOTIFICATIONS.inc("dropped")
+            return False
+
+        self.pending += 1
+        self.idle.clear()
+        PUSH_NOTIFICATION_QUEUE_DEPTH.set(self.pending)
+        return True
+
+    async def _worker(self):
+        while True:
+            notification = await self.queue.get()
+            url = notification.url
+            if self.url_in_flight.get(url, 0) >= self.per_url_concurrency:
+                self.url_backlog.setdefault(url, deque()).append(notification)
+                continue
+
+            self.url_in_flight[url] = self.url_in_flight.get(url, 0) + 1
+            try:
+                # Keep draining this URL's backlog while we hold its slot.
+                while notification is not None:
+                    await self._attempt(notification)
+                    backlog = self.url_backlog.get(url)
+                    notification = backlog.popleft() if backlog else None
+                    if backlog is not None and not backlog:
+                        del self.url_backlog[url]
+            finally:
+                self.url_in_flight[url] -= 1
+                if not self.url_in_flight[url]:
+                    del self.url_in_flight[url]
+
+    async def _attempt(self, notification: PushNotification):
+        notification.attempts += 1
+        try:
+            # Usually cached; waits when the URL is still being verified.
+            if not await self.sender_auth.verify_push_notification_url(notification.url):
+                notification.last_error = "URL failed verification"
+                self._dead_letter(notification)
+                return
+            await self.sender_auth.post_push_notification(notification.url, notification.data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            notification.last_error = str(e) or type(e).__name__
+            if notification.attempts < self.max_attempts and is_retryable(e):
+                self._schedule_retry(notification)
+            else:
+                self._dead_letter(notification)
+            return
+
+        logger.info(f"Push-notification sent for URL: {notification.url}")
+        PUSH_NOTIFICATIONS.inc("delivered")
+        self._done()
+
+    def _schedule_retry(self, notification: PushNotification):
+        delay = min(
+            self.max_backoff, self.initial_backoff * 2 ** (notification.attempts - 1)
+        )
+        delay *= random.uniform(0.5, 1.0)
+        logger.info(
+            f"Retrying push-notification for {notification.url} in {delay:.1f}s "
+            f"(attempt {notification.attempts}): {notification.last_error}"
+        )
+        PUSH_NOTIFICATIONS.inc("retried")
+
+        def requeue():
+            self.retry_timers.discard(timer)
+            try:
+                self.queue.put_nowait(notification)
+            except asyncio.QueueFull:
+                self._dead_letter(notification)
+
+        timer = asyncio.get_running_loop().call_later(delay, requeue)
+        self.retry_timers.add(timer)
+
+    def _dead_letter(self, notification: PushNotification):
+        logger.warning(
+            f"Giving up on push-notification for {notification.url} after "
+            f"{notification.attempts} attempts: {notification.last_error}"
+        )
+        self.dead_letters.append(notification)
+        PUSH_NOTIFICATIONS.inc("dead_lettered")
+        self._done()
+
+    def _done(self):
+        self.pending -= 1
+        PUSH_NOTIFICATION_QUEUE_DEPTH.set(self.pending)
+        if not self.pending:
+            self.idle.set()
+
+    async def aclose(self, drain_timeout: float = 5.0):
+        """Give queued notifications up to drain_timeout seconds to go out,
+        then stop the workers."""
+        try:
+            await asyncio.wait_for(self.idle.wait(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {self.pending} undelivered push-notifications on shutdown")
+
+        for timer in self.retry_timers:
+            timer.cancel()
+        self.retry_timers.clear()
+        for worker in self._worker_tasks:
+            worker.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        await self.sender_auth.aclose()
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "pending": self.pending,
+            "queued": self.queue.qsize(),
+            "retrying": len(self.retry_timers),
+            "in_flight": sum(self.url_in_flight.values()),
+            "backlogged_urls": len(self.url_backlog),
+            "dead_letters": len(self.dead_letters),
+        }
+
+    def get_dead_letters(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "url": notification.url,
+                "attempts": notification.attempts,
+                "created_at": notification.created_at,
+                "last_error": notification.last_error,
+                "data": notification.data,
+            }
+            for notification in self.dead_letters
+        ]
@@ -25,7 +25,7 @@ from host.remote_agent_connection import (
     RemoteAgentConnections,
     TaskUpdateCallback
 )
-from common.client import A2ACardResolver
+from common.client import AgentCardDiscovery
 from common.types import (
     AgentCard,
     Message,
@@ -53,32 +53,75 @@ class HostAgent:
   def __init__(
       self,
       remote_agent_addresses: List[str],
-      task_callback: TaskUpdateCallback | None = None
+      task_callback: TaskUpdateCallback | None = None,
+      card_cache_path: str | None = None,
+      hedge: bool = False,
   ):
+    """Remote agents are discovered by start(), not here.
+
+    Args:
+      remote_agent_addresses: Base URLs of the remote agents. Agents whose
+        cards share a name are used as replicas of one agent.
+      task_callback: Called with task updates from the remote agents.
+      card_cache_path: JSON file to cache agent cards in between runs.
+      hedge: Repeat unusually slow sends on a second replica of the agent.
+    """
     self.task_callback = task_callback
+    self.hedge = hedge
     self.remote_agent_connections: dict[str, RemoteAgentConnections] = {}
     self.cards: dict[str, AgentCard] = {}
-    for address in remote_agent_addresses:
-      card_resolver = A2ACardResolver(address)
-      card = card_resolver.get_agent_card()
-      remote_connection = RemoteAgentConnections(card)
-      self.remote_agent_connections[card.name] = remote_connection
-      self.cards[card.name] = card
-    agent_info = []
-    for ra in self.list_remote_agents():
-      agent_info.append(json.dumps(ra))
-    self.agents = '\n'.join(agent_info)
+    self.agents = ''
+    self.card_discovery = AgentCardDiscovery(
+        remote_agent_addresses,
+        self.register_agent_card,
+        cache_path=card_cache_path,
+    )
+
+  async def start(self):
+    """Discover the remote agents concurrently. Returns once each agent has
+    answered or timed out; agents that are down register when they come up."""
+    await self.card_discovery.start()
 
-  def register_agent_card(self, card: AgentCard):
-    """Register a new agent card and update remote agent connections."""
-    remote_connection = RemoteAgentConnections(card)
-    self.remote_agent_connections[card.name] = remote_connection
+  async def aclose(self):
+    """Close the HTTP connection pools of all remote agent connections."""
+    await self.card_discovery.aclose()
+    for connection in self.remote_agent_connections.values():
+      await connection.aclose()
+
+  def register_agent_card(self, address: str, card: AgentCard):
+    """Register the agent card discovered at address and update remote agent
+    connections."""
+    # An address that now serves another agent stops being a replica of the
+    # one it served before.
+    for name, connection in list(self.remote_agent_connections.items()):
+      if name != card.name and address in connection.replicas:
+        connection.remove_replica(address)
+        if not connection.replicas:
+          del self.remote_agent_connections[name]
+          del self.cards[name]
+    # Agents with the same name at different addresses are replicas of one
+    # agent.
+    existing = self.remote_agent_connections.get(card.name)
+    if existing is not None:
+      existing.add_replica(card, address)
+    else:
+      self.remote_agent_connections[card.name] = RemoteAgentConnections(
+          card, hedge=self.hedge, address=address
+      )
     self.cards[card.name] = card
+    logger.info(f"Registered remote agent {card.name} at {card.url}")
     agent_info = []
     for ra in self.list_remote_agents():
       agent_info.append(json.dumps(ra))
     self.agents = '\n'.join(agent_info)
 
+  def get_remote_agent_stats(self) -> list[dict]:
+    """Replica health and load of each remote agent."""
+    return [
+        connection.get_stats()
+        for connection in self.remote_agent_connections.values()
+    ]
+
   def create_agent(self) -> Agent:
     """Create and return the main agent with specific tools and instructions."""
     return Agent(
@@ -285,7 +328,12 @@ If there’s already an active agent, send the update using update_task.
     elif task.status.state == TaskState.CANCELED:
       raise ValueError(f"Agent {agent_name} task {task.id} is cancelled")
     elif task.status.state == TaskState.FAILED:
-      raise ValueError(f"Agent {agent_name} task {task.id} failed")
+      reason = ""
+      if task.status.message:
+        reason = ": " + " ".join(
+            part.text for part in task.status.message.parts if part.type == "text"
+        )
+      raise ValueError(f"Agent {agent_name} task {task.id} failed{reason}")
     response = []
     if task.status.message:
       # Extract and convert message parts
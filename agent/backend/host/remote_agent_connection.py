@@ -1,89 +1,390 @@
+from collections import OrderedDict, deque
 from typing import Callable
+import asyncio
+import logging
+import random
+import time
 import uuid
 from common.types import (
+    A2AClientHTTPError,
+    A2AClientTimeoutError,
     AgentCard,
+    Message,
     Task,
     TaskSendParams,
     TaskStatusUpdateEvent,
     TaskArtifactUpdateEvent,
     TaskStatus,
+    StreamOverflowError,
     TaskState,
+    TextPart,
 )
-from common.client import A2AClient
+from common.client import A2AClient, CircuitBreaker, TaskFetchBatcher
+from common.client.resilience import cap_timeout, time_remaining
+
+logger = logging.getLogger(__name__)
+
+# Backoff bounds, in seconds, for polling tasks an agent accepted to run in
+# the background.
+POLL_INITIAL_DELAY = 0.5
+POLL_MAX_DELAY = 5.0
+
+# Times a broken task stream is resumed with tasks/resubscribe before the
+# task is given up on.
+MAX_STREAM_RESUMES = 3
+
+# Sessions whose replica is remembered for affinity.
+MAX_AFFINITY_SESSIONS = 10000
+
+# Seconds between checks for a replaced replica's last send to finish.
+RETIRED_REPLICA_POLL_INTERVAL = 1.0
+
+# Hedging: once HEDGE_MIN_SAMPLES sends have completed, a send still
+# unanswered after the HEDGE_PERCENTILE latency of recent sends is also sent
+# to a second replica, and the first answer wins.
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
 
 TaskCallbackArg = Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
 TaskUpdateCallback = Callable[[TaskCallbackArg], Task]
 
-class RemoteAgentConnections:
-  """A class to hold the connections to the remote agents."""
 
-  def __init__(self, agent_card: AgentCard):
-    self.agent_client = A2AClient(agent_card)
+class Replica:
+  """One endpoint serving a remote agent, with its load and health."""
+
+  def __init__(self, agent_card: AgentCard, address: str | None = None):
     self.card = agent_card
+    self.url = agent_card.url
+    # Where the card was discovered; identifies the replica even if the card
+    # later announces another URL.
+    self.address = address or agent_card.url
+    self.agent_client = A2AClient(agent_card)
+    # Concurrent polls of tasks on this replica share batch requests.
+    self.task_fetcher = TaskFetchBatcher(self.agent_client)
+    # Calls in flight on this replica.
+    self.outstanding = 0
+    self.breaker = CircuitBreaker()
+
+  @property
+  def available(self) -> bool:
+    return self.breaker.available
+
+  def record_success(self):
+    self.breaker.record_success()
+
+  def record_failure(self):
+    remaining = time_remaining()
+    if remaining is not None and remaining <= 0:
+      # Our own deadline ran out; that says nothing about the replica.
+      return
+    was_open = self.breaker.state == CircuitBreaker.OPEN
+    self.breaker.record_failure()
+    if not was_open and self.breaker.state == CircuitBreaker.OPEN:
+      logger.warning(
+          f"Circuit open for replica {self.url} of {self.card.name} "
+          f"for {self.breaker.seconds_until_probe():.0f}s"
+      )
+
+  def get_stats(self) -> dict:
+    return {
+        "address": self.address,
+        "url": self.url,
+        "circuit": self.breaker.state,
+        "outstanding": self.outstanding,
+        "consecutive_failures": self.breaker.consecutive_failures,
+        "seconds_until_probe": self.breaker.seconds_until_probe(),
+    }
+
+
+class RemoteAgentConnections:
+  """A class to hold the connections to the remote agents.
+
+  A remote agent can be served by several replicas. Each task goes to the
+  available replica with the fewest calls in flight, except that all tasks
+  of a session stick to one replica, which holds the session's conversation
+  state. Each replica has a circuit breaker; while every breaker is open,
+  sends fail fast. With hedge set, a new session's send that is slower than
+  usual is repeated on a second replica.
+  """
 
+  def __init__(
+      self,
+      agent_card: AgentCard,
+      hedge: bool = False,
+      address: str | None = None,
+  ):
+    self.card = agent_card
+    self.hedge = hedge
+    # Discovery address -> replica.
+    self.replicas: dict[str, Replica] = {}
+    # Session id -> address of the replica serving it, least recently used
+    # first.
+    self.session_replicas: OrderedDict[str, str] = OrderedDict()
+    # Seconds taken by recent successful non-streaming sends.
+    self.send_latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
     self.conversation_name = None
     self.conversation = None
     self.pending_tasks = set()
+    self.add_replica(agent_card, address)
 
   def get_agent(self) -> AgentCard:
     return self.card
 
+  def add_replica(self, agent_card: AgentCard, address: str | None = None):
+    """Add the replica discovered at address (agent_card.url by default), or
+    update its card. If the card now names another URL, the replica is
+    replaced by one sending there."""
+    self.card = agent_card
+    address = address or agent_card.url
+    replica = self.replicas.get(address)
+    if replica is not None and replica.url == agent_card.url:
+      replica.card = agent_card
+      return
+    if replica is not None:
+      logger.info(f"Replica at {address} moved from {replica.url} to {agent_card.url}")
+      self._retire_replica(replica)
+    self.replicas[address] = Replica(agent_card, address)
+    logger.info(f"{agent_card.name} has {len(self.replicas)} replica(s); added {agent_card.url}")
+
+  def remove_replica(self, address: str):
+    """Stop using the replica discovered at address."""
+    replica = self.replicas.pop(address, None)
+    if replica is not None:
+      logger.info(f"{self.card.name} has {len(self.replicas)} replica(s); removed {replica.url}")
+      self._retire_replica(replica)
+
+  def _retire_replica(self, replica: Replica):
+    close = asyncio.create_task(self._close_replica(replica))
+    self.pending_tasks.add(close)
+    close.add_done_callback(self.pending_tasks.discard)
+
+  async def _close_replica(self, replica: Replica):
+    # Let sends already on the replica finish before closing its connections.
+    while replica.outstanding:
+      await asyncio.sleep(RETIRED_REPLICA_POLL_INTERVAL)
+    await replica.task_fetcher.aclose()
+    await replica.agent_client.aclose()
+
+  def pick_replica(
+      self, session_id: str | None, exclude: Replica | None = None
+  ) -> Replica | None:
+    """Return the replica to send a session's next task to, or None when no
+    replica is available."""
+    if session_id is not None:
+      address = self.session_replicas.get(session_id)
+      replica = self.replicas.get(address) if address is not None else None
+      if replica is not None and replica.available and replica is not exclude:
+        self.session_replicas.move_to_end(session_id)
+        return replica
+      if replica is not None and not replica.available:
+        logger.warning(
+            f"Moving session {session_id} off unavailable replica {replica.url} of {self.card.name}"
+        )
+
+    candidates = [
+        r for r in self.replicas.values() if r.available and r is not exclude
+    ]
+    if not candidates:
+      return None
+    fewest = min(r.outstanding for r in candidates)
+    replica = random.choice([r for r in candidates if r.outstanding == fewest])
+    if session_id is not None:
+      self._set_session_replica(session_id, replica)
+    return replica
+
+  def _set_session_replica(self, session_id: str, replica: Replica):
+    self.session_replicas[session_id] = replica.address
+    self.session_replicas.move_to_end(session_id)
+    if len(self.session_replicas) > MAX_AFFINITY_SESSIONS:
+      self.session_replicas.popitem(last=False)
+
+  def get_stats(self) -> dict:
+    return {
+        "name": self.card.name,
+        "sessions": len(self.session_replicas),
+        "hedge_delay_seconds": self._hedge_delay(),
+        "replicas": [replica.get_stats() for replica in self.replicas.values()],
+    }
+
+  async def aclose(self):
+    """Release the pooled HTTP connections held by the agent clients."""
+    if self.pending_tasks:
+      await asyncio.gather(*self.pending_tasks, return_exceptions=True)
+    for replica in self.replicas.values():
+      await replica.task_fetcher.aclose()
+      await replica.agent_client.aclose()
+
   async def send_task(
       self,
       request: TaskSendParams,
       task_callback: TaskUpdateCallback | None,
   ) -> Task | None:
-    if self.card.capabilities.streaming:
-      print("Streaming")
-      task = None
-      if task_callback:
-        task_callback(Task(
-            id=request.id,
-            sessionId=request.sessionId,
-            status=TaskStatus(
-                state=TaskState.SUBMITTED,
-                message=request.message,
-            ),
-            history=[request.message],
-        ))
-      async for response in self.agent_client.send_task_streaming(request.model_dump()):
-        merge_metadata(response.result, request)
-        # For task status updates, we need to propagate metadata and provide
-        # a unique message id.
-        if (hasattr(response.result, 'status') and
-            hasattr(response.result.status, 'message') and
-            response.result.status.message):
-          merge_metadata(response.result.status.message, request.message)
-          m = response.result.status.message
-          if not m.metadata:
-            m.metadata = {}
-          if 'message_id' in m.metadata:
-            m.metadata['last_message_id'] = m.metadata['message_id']
-          m.metadata['message_id'] = str(uuid.uuid4())
-        if task_callback:
-          task = task_callback(response.result)
-        if hasattr(response.result, 'final') and response.result.final:
-          break
-      return response.result
+    remaining = time_remaining()
+    if remaining is not None and remaining <= 0:
+      return self._failed_task(request, "Deadline exceeded before the task was sent.")
+
+    new_session = request.sessionId not in self.session_replicas
+    replica = self.pick_replica(request.sessionId)
+    if replica is None:
+      wait = min(r.breaker.seconds_until_probe() for r in self.replicas.values())
+      logger.warning(f"Failing fast: no available replica of {self.card.name}")
+      return self._failed_task(
+          request, f"{self.card.name} is unavailable; try again in {wait:.0f}s."
+      )
+
+    hedge_delay = self._hedge_delay() if new_session else None
+    if hedge_delay is None:
+      return await self._send_to(replica, request, task_callback)
+    return await self._send_hedged(replica, request, task_callback, hedge_delay)
+
+  def _failed_task(self, request: TaskSendParams, message: str) -> Task:
+    """A FAILED task standing in for one the agent could not run."""
+    return Task(
+        id=request.id,
+        sessionId=request.sessionId,
+        status=TaskStatus(
+            state=TaskState.FAILED,
+            message=Message(role="agent", parts=[TextPart(text=message)]),
+        ),
+        metadata={"agent": self.card.name},
+    )
+
+  def _hedge_delay(self) -> float | None:
+    """Seconds to wait before hedging a send, or None not to hedge."""
+    if (
+        not self.hedge
+        or self.card.capabilities.streaming
+        or len(self.send_latencies) < HEDGE_MIN_SAMPLES
+        or sum(r.available for r in self.replicas.values()) < 2
+    ):
+      return None
+    latencies = sorted(self.send_latencies)
+    return latencies[int(HEDGE_PERCENTILE * (len(latencies) - 1))]
+
+  async def _send_to(
+      self,
+      replica: Replica,
+      request: TaskSendParams,
+      task_callback: TaskUpdateCallback | None,
+  ) -> Task | None:
+    probe = replica.breaker.on_call()
+    replica.outstanding += 1
+    start = time.monotonic()
+    try:
+      result = await self._send_task(replica, request, task_callback)
+    except asyncio.CancelledError:
+      # The caller went away (e.g. the user disconnected) or another
+      # replica answered first; stop the remote work instead of letting it
+      # run to completion.
+      self._cancel_remote_task(replica, request.id)
+      raise
+    finally:
+      replica.outstanding -= 1
+      if probe and replica.breaker.probing:
+        # No success or failure was recorded for the probe.
+        replica.breaker.release_probe()
+    if (
+        not replica.card.capabilities.streaming
+        and result.status.state != TaskState.FAILED
+    ):
+      self.send_latencies.append(time.monotonic() - start)
+    return result
+
+  async def _send_hedged(
+      self,
+      replica: Replica,
+      request: TaskSendParams,
+      task_callback: TaskUpdateCallback | None,
+      hedge_delay: float,
+  ) -> Task | None:
+    sends = {
+        asyncio.create_task(self._send_to(replica, request, task_callback)): replica
+    }
+    # Updates from the backup are held back and only passed on if it wins,
+    # so the callback never sees two interleaved runs of the task.
+    backup_updates = []
+    try:
+      done, _ = await asyncio.wait(sends, timeout=hedge_delay)
+      if not done:
+        backup = self.pick_replica(None, exclude=replica)
+        if backup is not None:
+          logger.info(
+              f"Hedging task {request.id} to {backup.url} after {hedge_delay:.2f}s"
+          )
+          backup_callback = backup_updates.append if task_callback else None
+          sends[asyncio.create_task(self._send_to(backup, request, backup_callback))] = backup
+
+      pending = set(sends)
+      while True:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        # Take a success from any send that finished, or the last answer if
+        # all failed.
+        succeeded = [
+            send for send in done
+            if send.exception() is None
+            and send.result().status.state != TaskState.FAILED
+        ]
+        if succeeded or not pending:
+          winner = succeeded[0] if succeeded else next(iter(done))
+          if sends[winner] is not replica:
+            for update in backup_updates:
+              task_callback(update)
+          if request.sessionId is not None:
+            self._set_session_replica(request.sessionId, sends[winner])
+          return winner.result()
+    finally:
+      for send in sends:
+        send.cancel()
+
+  def _cancel_remote_task(self, replica: Replica, task_id: str):
+    cancel = asyncio.create_task(self._send_cancel(replica, task_id))
+    self.pending_tasks.add(cancel)
+    cancel.add_done_callback(self.pending_tasks.discard)
+
+  async def _send_cancel(self, replica: Replica, task_id: str):
+    try:
+      await replica.agent_client.cancel_task({"id": task_id})
+      logger.info(f"Cancelled task {task_id} on {replica.url}")
+    except Exception as e:
+      logger.warning(f"Failed to cancel task {task_id} on {replica.url}: {e}")
+
+  async def _send_task(
+      self,
+      replica: Replica,
+      request: TaskSendParams,
+      task_callback: TaskUpdateCallback | None,
+  ) -> Task | None:
+    if replica.card.capabilities.streaming:
+      try:
+        result = await self._send_task_streaming(replica, request, task_callback)
+      except Exception:
+        replica.record_failure()
+        raise
+      replica.record_success()
+      return result
     else: # Non-streaming
       try:
-        print("🚀 Non-streaming task initiated")
-        response = await self.agent_client.send_task(request.model_dump())
-        print("✅ Raw response:", response)
+        response = await replica.agent_client.send_task(request.model_dump())
+        replica.record_success()
+        # Lazy arguments: the response is only formatted when debugging.
+        logger.debug("Task %s response from %s: %s", request.id, replica.url, response)
+
+        if response and response.error:
+            logger.warning(f"Task {request.id} failed on {replica.url}: {response.error.message}")
+            return self._failed_task(request, response.error.message)
 
         if not response or not response.result:
-            print("❌ No result in response")
-            return {
-                "error": "Empty result received from agent.",
-                "status": "failed",
-                "agent": self.card.name,
-            }
+            logger.warning(f"Task {request.id} got an empty result from {replica.url}")
+            return self._failed_task(request, "Empty result received from agent.")
 
         result = response.result
+        if result.status.state in (TaskState.SUBMITTED, TaskState.WORKING):
+            # The agent accepted the task and runs it in the background.
+            result = await self._wait_for_task(replica, result, request)
 
         # Safe metadata merge
         if hasattr(result, 'status') and result.status.message:
-            print("📦 Merging metadata")
             merge_metadata(result.status.message, request.message)
             m = result.status.message
             m.metadata = m.metadata or {}
@@ -92,19 +393,108 @@ class RemoteAgentConnections:
             m.metadata['message_id'] = str(uuid.uuid4())
 
         if task_callback:
-            print("🔄 Invoking task callback")
             task_callback(result)
 
-        print("✅ Task completed successfully")
         return result
 
       except Exception as e:
-        print(f"❌ Exception in send_task: {str(e)}")
-        return {
-            "error": str(e),
-            "status": "failed",
-            "agent": self.card.name,
-        }
+        logger.warning(f"Sending task {request.id} to {replica.url} failed: {e}")
+        replica.record_failure()
+        return self._failed_task(request, str(e))
+
+  async def _wait_for_task(
+      self, replica: Replica, task: Task, request: TaskSendParams
+  ) -> Task:
+    """Follow the task with tasks/get until it stops working."""
+    delay = POLL_INITIAL_DELAY
+    while task.status.state in (TaskState.SUBMITTED, TaskState.WORKING):
+      # The task lives on the replica that accepted it.
+      if task.version is not None:
+        # The agent supports long-polling: one request per change.
+        response = await replica.agent_client.wait_for_task_change(
+            task.id, task.version, request.historyLength
+        )
+      else:
+        await asyncio.sleep(cap_timeout(delay))
+        delay = min(delay * 2, POLL_MAX_DELAY)
+        response = await replica.task_fetcher.get_task(
+            {"id": task.id, "historyLength": request.historyLength}
+        )
+      if response.error:
+        raise ValueError(f"Failed to get task {task.id}: {response.error.message}")
+      task = response.result
+    return task
+
+  async def _send_task_streaming(
+      self,
+      replica: Replica,
+      request: TaskSendParams,
+      task_callback: TaskUpdateCallback | None,
+  ) -> Task | None:
+    task = None
+    if task_callback:
+      task_callback(Task(
+          id=request.id,
+          sessionId=request.sessionId,
+          status=TaskStatus(
+              state=TaskState.SUBMITTED,
+              message=request.message,
+          ),
+          history=[request.message],
+      ))
+    stream = replica.agent_client.send_task_streaming(request.model_dump())
+    last_event_id = None
+    resumes = 0
+    while True:
+      response = None
+      try:
+        async for response in stream:
+          if response.eventId is not None:
+            last_event_id = response.eventId
+          if response.error is not None:
+            break
+          merge_metadata(response.result, request)
+          # For task status updates, we need to propagate metadata and provide
+          # a unique message id.
+          if (hasattr(response.result, 'status') and
+              hasattr(response.result.status, 'message') and
+              response.result.status.message):
+            merge_metadata(response.result.status.message, request.message)
+            m = response.result.status.message
+            if not m.metadata:
+              m.metadata = {}
+            if 'message_id' in m.metadata:
+              m.metadata['last_message_id'] = m.metadata['message_id']
+            m.metadata['message_id'] = str(uuid.uuid4())
+          if task_callback:
+            task = task_callback(response.result)
+          if hasattr(response.result, 'final') and response.result.final:
+            break
+      except (A2AClientHTTPError, A2AClientTimeoutError) as e:
+        # The connection dropped or went idle mid-task; pick the stream up
+        # after the last event received instead of losing the task.
+        if last_event_id is None or resumes >= MAX_STREAM_RESUMES:
+          raise
+        reason = str(e)
+      else:
+        if response is None:
+          return self._failed_task(request, "The agent's stream ended without any event.")
+        if response.error is None:
+          return response.result
+        # The agent ended the stream because we fell behind; the task itself
+        # goes on, so resume it like a dropped connection.
+        if (response.error.code != StreamOverflowError().code
+            or last_event_id is None or resumes >= MAX_STREAM_RESUMES):
+          return self._failed_task(request, response.error.message)
+        reason = response.error.message
+      resumes += 1
+      logger.warning(
+          f"Stream for task {request.id} on {replica.url} broke ({reason}); "
+          f"resuming after event {last_event_id}"
+      )
+      stream = replica.agent_client.resubscribe_task(
+          {"id": request.id}, last_event_id
+      )
 
 def merge_metadata(target, source):
   if not hasattr(target, 'metadata') or not hasattr(source, 'metadata'):
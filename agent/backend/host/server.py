@@ -1,8 +1,10 @@
+import asyncio
+import contextlib
 import os
 import sys
 import uvicorn
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
@@ -20,6 +22,11 @@ parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
+from common.client import deadline
+from common.utils.admin import is_admin_request
+from common.utils.loop_monitor import LoopMonitor
+from common.utils.profiling import RequestProfiler
+
 # 📁 Load .env from root
 root_dir = Path(__file__).resolve().parents[2]
 dotenv_path = root_dir / ".env"
@@ -31,6 +38,11 @@ session_initialized = False
 # Initialize session service and runner
 session_service = InMemorySessionService()
 
+# Reports event-loop lag and code that blocks the loop at /admin/loop
+loop_monitor = LoopMonitor()
+# Profiles sampled /query and /ws requests on demand at /admin/profile
+profiler = RequestProfiler()
+
 # Define a consistent session ID to avoid "Session not found" errors
 USER_ID = "user-1"
 SESSION_ID = "host-session-1"
@@ -48,8 +60,12 @@ async def lifespan(app: FastAPI):
     )
     session_initialized = True
     print(f"✅ Session {SESSION_ID} created successfully")
+    loop_monitor.start()
+    await host.start()
     yield
-    # Shutdown (if needed)
+    # Shutdown
+    await loop_monitor.stop()
+    await host.aclose()
 
 # 🚀 Initialize FastAPI with lifespan
 app = FastAPI(lifespan=lifespan)
@@ -64,11 +80,24 @@ app.add_middleware(
 )
 
 # 🔗 Set up HostAgent
-REMOTE_AGENTS = [ "http://localhost:10011","http://localhost:10010"]
+# Comma-separated; list several URLs of an agent to balance across replicas
+REMOTE_AGENTS = os.getenv(
+    "REMOTE_AGENTS", "http://localhost:10011,http://localhost:10010"
+).split(",")
 print("🚀 Initializing HostAgent with remote agents:")
 for url in REMOTE_AGENTS:
     print(f"🔗 {url}")
-host = HostAgent(remote_agent_addresses=REMOTE_AGENTS)
+# Agent cards are cached here so the host starts without waiting on agents
+AGENT_CARD_CACHE = os.getenv(
+    "AGENT_CARD_CACHE", str(Path(__file__).resolve().parent / ".agent_cards.json")
+)
+host = HostAgent(
+    remote_agent_addresses=REMOTE_AGENTS,
+    card_cache_path=AGENT_CARD_CACHE,
+    hedge=os.getenv("HEDGE_AGENT_REQUESTS", "").lower() in ("1", "true", "yes"),
+)
+# Seconds a query may take, including every call it makes to remote agents
+HOST_REQUEST_TIMEOUT = float(os.getenv("HOST_REQUEST_TIMEOUT", "300"))
 adk_agent = host.create_agent()
 
 # 🧠 Wrap in ADK runner
@@ -77,6 +106,29 @@ runner = Runner(agent=adk_agent, app_name="host_app", session_service=session_se
 class QueryRequest(BaseModel):
     query: str
 
+@app.api_route("/admin/loop", methods=["GET", "DELETE"])
+async def loop_report(request: Request):
+    """Event-loop lag and the stacks that blocked the loop; DELETE clears them."""
+    if not is_admin_request(request):
+        return JSONResponse({"error": "Forbidden"}, status_code=403)
+    if request.method == "DELETE":
+        loop_monitor.reset()
+    return loop_monitor.get_report()
+
+@app.api_route("/admin/profile", methods=["GET", "POST", "DELETE"])
+async def profile(request: Request):
+    """Start, stop and download on-demand profiles of /query and /ws."""
+    if not is_admin_request(request):
+        return JSONResponse({"error": "Forbidden"}, status_code=403)
+    return await profiler.handle_admin_request(request)
+
+@app.get("/admin/agents")
+async def remote_agents(request: Request):
+    """Replica health and in-flight calls of each remote agent."""
+    if not is_admin_request(request):
+        return JSONResponse({"error": "Forbidden"}, status_code=403)
+    return host.get_remote_agent_stats()
+
 @app.post("/query")
 async def query_handler(request: QueryRequest):
     """Handle user queries and return agent responses."""
@@ -94,8 +146,18 @@ async def query_handler(request: QueryRequest):
     #print("AGENT RESPONSE:")
     #print(content)
     try:
-        final_response = None
-        # Use the persistent session ID instead of generating a new one each time
+        final_response = await profiler.wrap("/query", run_query(content))
+        return {"response": final_response or "⚠️ No response from agent."}
+
+    except Exception as e:
+        print(f"❌ Error in FastAPI: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+async def run_query(content: Content) -> str | None:
+    """Run a query through the agent and return the last text it produced."""
+    final_response = None
+    # Use the persistent session ID instead of generating a new one each time
+    with deadline(HOST_REQUEST_TIMEOUT):
         async for event in runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=content):
             print("Event type:", type(event))
             print("Event content:", event)
@@ -107,12 +169,7 @@ async def query_handler(request: QueryRequest):
                         if part.text:
                             print(f"📡 Received response: {part.text}")
                             final_response = part.text
-
-        return {"response": final_response or "⚠️ No response from agent."}
-
-    except Exception as e:
-        print(f"❌ Error in FastAPI: {e}")
-        return JSONResponse({"error": str(e)}, status_code=500)
+    return final_response
 
 # New WebSocket endpoint
 @app.websocket("/ws")
@@ -132,10 +189,12 @@ async def websocket_endpoint(websocket: WebSocket):
         await websocket.close()
         return
     
+    # Messages that arrived while a previous query was being processed.
+    backlog = []
     try:
         while True:
             # Wait for messages from the client
-            data = await websocket.receive_text()
+            data = backlog.pop(0) if backlog else await websocket.receive_text()
             try:
                 data_json = json.loads(data)
                 user_query = data_json.get("query", "")
@@ -144,43 +203,15 @@ async def websocket_endpoint(websocket: WebSocket):
                     await websocket.send_json({"error": "Missing 'query'"})
                     continue
                 
-                # Send a message indicating processing has started
-                await websocket.send_json({"status": "processing", "message": "Processing your query..."})
-                
-                # Create the query content
-                content = Content(role="user", parts=[Part(text=user_query)])
-                
-                # Stream responses back to the client
-                response_parts = []
-                async for event in runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=content):
-                    print("WebSocket Event:", type(event))
-                    
-                    if hasattr(event, "content") and event.content:
-                        for part in event.content.parts:
-                            print(f"WebSocket response part: {part}")
-                            print(f"WebSocket response part TEXT: {part.text}")
-                            if part.text:
-                                chunk_text = part.text
-                                print(f"WebSocket response chunk: {chunk_text}")
-                                
-                                # Send each part of the response as it becomes available
-                                await websocket.send_json({
-                                    "status": "chunk", 
-                                    "chunk": chunk_text,
-                                    "complete": False
-                                })
-                                response_parts.append(chunk_text)
-                
-                # Send a complete message with the full response
-                full_response = "".join(response_parts) if response_parts else "⚠️ No response from agent."
-                await websocket.send_json({
-                    "status": "complete",
-                    "response": full_response,
-                    "complete": True
-                })
+                processing = asyncio.create_task(
+                    profiler.wrap("/ws", stream_query_response(websocket, user_query))
+                )
+                await run_until_disconnect(websocket, processing, backlog)
                 
             except json.JSONDecodeError:
                 await websocket.send_json({"error": "Invalid JSON"})
+            except WebSocketDisconnect:
+                raise
             except Exception as e:
                 print(f"❌ Error in agent processing: {e}")
                 await websocket.send_json({
@@ -194,6 +225,71 @@ async def websocket_endpoint(websocket: WebSocket):
     except Exception as e:
         print(f"❌ Unexpected WebSocket error: {e}")
 
+async def stream_query_response(websocket: WebSocket, user_query: str):
+    """Run a query through the agent and stream its response to the client."""
+    # Send a message indicating processing has started
+    await websocket.send_json({"status": "processing", "message": "Processing your query..."})
+    
+    # Create the query content
+    content = Content(role="user", parts=[Part(text=user_query)])
+    
+    # Stream responses back to the client
+    response_parts = []
+    with deadline(HOST_REQUEST_TIMEOUT):
+        async for event in runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=content):
+            print("WebSocket Event:", type(event))
+            
+            if hasattr(event, "content") and event.content:
+                for part in event.content.parts:
+                    print(f"WebSocket response part: {part}")
+                    print(f"WebSocket response part TEXT: {part.text}")
+                    if part.text:
+                        chunk_text = part.text
+                        print(f"WebSocket response chunk: {chunk_text}")
+                        
+                        # Send each part of the response as it becomes available
+                        await websocket.send_json({
+                            "status": "chunk", 
+                            "chunk": chunk_text,
+                            "complete": False
+                        })
+                        response_parts.append(chunk_text)
+    
+    # Send a complete message with the full response
+    full_response = "".join(response_parts) if response_parts else "⚠️ No response from agent."
+    await websocket.send_json({
+        "status": "complete",
+        "response": full_response,
+        "complete": True
+    })
+
+async def run_until_disconnect(websocket: WebSocket, processing: asyncio.Task, backlog: list):
+    """Wait for processing while watching the socket.
+
+    If the client disconnects, processing is cancelled, which also cancels any
+    task delegated to a remote agent. Messages received meanwhile are appended
+    to backlog.
+    """
+    receiving = asyncio.create_task(websocket.receive())
+    try:
+        while True:
+            done, _ = await asyncio.wait({processing, receiving}, return_when=asyncio.FIRST_COMPLETED)
+            if receiving in done:
+                message = receiving.result()
+                if message["type"] == "websocket.disconnect":
+                    processing.cancel()
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await processing
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                if message.get("text") is not None:
+                    backlog.append(message["text"])
+                receiving = asyncio.create_task(websocket.receive())
+            if processing in done:
+                return processing.result()
+    finally:
+        if not receiving.done():
+            receiving.cancel()
+
 # Add this block to run via `python server.py`
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8080, timeout_keep_alive=50000)
\ No newline at end of file
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The tests import common and benchmarks the way the agents do, with the
+# backend directory on sys.path.
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
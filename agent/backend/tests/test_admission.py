@@ -0,0 +1,143 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from benchmarks.utils import EchoTaskManager
+from common.server import (
+    A2AServer,
+    AdmissionController,
+    AdmissionRejectedError,
+    AgentScheduler,
+)
+from common.types import ServerBusyError
+
+
+def test_full_queue_sheds_requests():
+    async def scenario():
+        admission = AdmissionController(
+            method_limits={"tasks/send": 1}, max_queue_size=1, max_queue_wait=10
+        )
+        release = await admission.acquire("tasks/send")
+        waiting = asyncio.create_task(admission.acquire("tasks/send"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejectedError) as excinfo:
+            await admission.acquire("tasks/send")
+        assert excinfo.value.retry_after == 10
+
+        release()
+        (await waiting)()
+        stats = admission.get_stats()["tasks/send"]
+        assert stats["admitted"] == 2
+        assert stats["shed"] == 1
+        assert stats["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_queue_wait_sheds_requests():
+    async def scenario():
+        admission = AdmissionController(
+            method_limits={"tasks/send": 1}, max_queue_wait=0.05
+        )
+        await admission.acquire("tasks/send")
+
+        with pytest.raises(AdmissionRejectedError):
+            await admission.acquire("tasks/send")
+        stats = admission.get_stats()["tasks/send"]
+        assert stats["shed"] == 1
+        assert stats["waiting"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_methods_do_not_share_lanes():
+    async def scenario():
+        admission = AdmissionController(
+            method_limits={"tasks/send": 1}, max_queue_wait=0.05
+        )
+        async with admission.admit("tasks/send"):
+            async with admission.admit("tasks/get"):
+                pass
+
+    asyncio.run(scenario())
+
+
+def test_release_is_idempotent():
+    async def scenario():
+        admission = AdmissionController(method_limits={"tasks/send": 1})
+        release = await admission.acquire("tasks/send")
+        release()
+        release()
+
+        assert admission.get_stats()["tasks/send"]["in_flight"] == 0
+        # A double release must not let two requests in at once.
+        await admission.acquire("tasks/send")
+        assert admission.get_lane("tasks/send").semaphore.locked()
+
+    asyncio.run(scenario())
+
+
+def test_agent_lanes_follow_the_scheduler():
+    manager = EchoTaskManager(
+        agent_scheduler=AgentScheduler(max_concurrency=3, max_queue_size=7)
+    )
+    server = A2AServer(task_manager=manager)
+
+    assert server.admission.get_lane("tasks/send").limit == 10
+    assert server.admission.get_lane("tasks/sendSubscribe").limit == 10
+
+
+def test_idle_stream_gives_up_its_slot():
+    async def scenario():
+        admission = AdmissionController(
+            method_limits={"tasks/sendSubscribe": 1}, max_stream_idle=0.05
+        )
+        server = A2AServer(task_manager=EchoTaskManager(), admission=admission)
+
+        async def events():
+            for i in range(3):
+                yield i
+
+        release = await admission.acquire("tasks/sendSubscribe")
+        stream = server._release_when_done(events(), release)
+        assert await anext(stream) == 0
+
+        # The client stops reading; the stream stays open but its slot is
+        # freed for others.
+        await asyncio.sleep(0.1)
+        assert admission.get_stats()["tasks/sendSubscribe"]["in_flight"] == 0
+        assert [item async for item in stream] == [1, 2]
+
+    asyncio.run(scenario())
+
+
+def test_shed_requests_get_503():
+    async def scenario():
+        admission = AdmissionController(
+            method_limits={"tasks/get": 1}, max_queue_size=0
+        )
+        server = A2AServer(task_manager=EchoTaskManager(), admission=admission)
+        await admission.acquire("tasks/get")
+
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            response = await client.post(
+                "/",
+                json={
+                    "jsonrpc": "2.0",
+                    "id": 1,
+                    "method": "tasks/get",
+                    "params": {"id": "t"},
+                },
+            )
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "5"
+        assert json.loads(response.content)["error"]["code"] == ServerBusyError().code
+
+    asyncio.run(scenario())
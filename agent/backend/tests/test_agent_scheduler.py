@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from common.server import AgentQueueFullError, AgentScheduler
+
+
+def test_sessions_take_turns():
+    async def scenario():
+        scheduler = AgentScheduler(max_concurrency=1)
+        started = []
+
+        async def run(name: str):
+            started.append(name)
+            await asyncio.sleep(0)
+
+        blocker = scheduler.admit("other")
+        runs = [
+            scheduler.admit(session_id).run(run(name))
+            for session_id, name in [
+                ("busy", "busy-1"),
+                ("busy", "busy-2"),
+                ("busy", "busy-3"),
+                ("quiet", "quiet-1"),
+            ]
+        ]
+        running = asyncio.gather(*runs)
+        await asyncio.sleep(0)
+        assert started == []
+        assert scheduler.queued == 4
+
+        blocker.release()
+        await running
+
+        # Round-robin: the quiet session's run does not wait for the whole
+        # busy session's backlog.
+        assert started == ["busy-1", "quiet-1", "busy-2", "busy-3"]
+        assert scheduler.running == 0
+        assert scheduler.queued == 0
+
+    asyncio.run(scenario())
+
+
+def test_concurrency_is_limited():
+    async def scenario():
+        scheduler = AgentScheduler(max_concurrency=2)
+        active = 0
+        peak = 0
+
+        async def run():
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+        await asyncio.gather(
+            *(scheduler.admit(f"session-{i % 3}").run(run()) for i in range(10))
+        )
+
+        assert peak == 2
+        assert scheduler.started == 10
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_rejects_runs():
+    async def scenario():
+        scheduler = AgentScheduler(max_concurrency=1, max_queue_size=1)
+        scheduler.admit("a")
+        waiting = scheduler.admit("b")
+
+        with pytest.raises(AgentQueueFullError):
+            scheduler.admit("c")
+        assert scheduler.rejected == 1
+
+        # Giving up a place in the queue makes room for another run.
+        waiting.release()
+        assert scheduler.queued == 0
+        scheduler.admit("c")
+        assert scheduler.queued == 1
+
+    asyncio.run(scenario())
+
+
+def test_release_is_idempotent():
+    async def scenario():
+        scheduler = AgentScheduler(max_concurrency=1)
+        slot = scheduler.admit("a")
+        slot.release()
+        slot.release()
+
+        assert scheduler.running == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,153 @@
+import asyncio
+import json
+
+import httpx
+
+from benchmarks.utils import EchoTaskManager
+from common.server import A2AServer
+from common.server.server import MAX_BATCH_SIZE
+from common.types import (
+    InvalidRequestError,
+    MethodNotFoundError,
+    TaskNotFoundError,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+)
+
+
+def send_request(request_id, task_id: str) -> dict:
+    request = {
+        "jsonrpc": "2.0",
+        "method": "tasks/send",
+        "params": {
+            "id": task_id,
+            "message": {"role": "user", "parts": [{"type": "text", "text": "hi"}]},
+        },
+    }
+    if request_id is not None:
+        request["id"] = request_id
+    return request
+
+
+async def post(server: A2AServer, body, headers=None) -> httpx.Response:
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post("/", json=body, headers=headers)
+
+
+def test_batch_answers_each_entry_in_order():
+    async def scenario():
+        manager = EchoTaskManager()
+        server = A2AServer(task_manager=manager)
+        response = await post(
+            server,
+            [
+                send_request(1, "sent"),
+                {"jsonrpc": "2.0", "id": 2, "method": "tasks/get", "params": {"id": "missing"}},
+                {"jsonrpc": "2.0", "id": 3, "method": "tasks/unknown", "params": {}},
+                {"jsonrpc": "2.0", "id": 4, "method": "tasks/resubscribe", "params": {"id": "sent"}},
+                {"jsonrpc": "2.0", "id": 5, "method": "tasks/get", "params": {}},
+                42,
+            ],
+        )
+
+        assert response.status_code == 200
+        results = response.json()
+        assert [result.get("id") for result in results] == [1, 2, 3, 4, 5, None]
+        assert results[0]["result"]["status"]["state"] == "completed"
+        assert [result["error"]["code"] for result in results[1:]] == [
+            TaskNotFoundError().code,
+            MethodNotFoundError().code,
+            InvalidRequestError().code,
+            InvalidRequestError().code,
+            InvalidRequestError().code,
+        ]
+
+    asyncio.run(scenario())
+
+
+def test_batch_does_not_answer_notifications():
+    async def scenario():
+        manager = EchoTaskManager()
+        server = A2AServer(task_manager=manager)
+        response = await post(
+            server, [send_request(None, "notified"), send_request(1, "sent")]
+        )
+
+        assert [result["id"] for result in response.json()] == [1]
+        # The notification was still handled.
+        assert (await manager.get_task("notified")).status.state == TaskState.COMPLETED
+
+    asyncio.run(scenario())
+
+
+def test_batch_of_notifications_gets_no_content():
+    async def scenario():
+        server = A2AServer(task_manager=EchoTaskManager())
+        response = await post(
+            server, [send_request(None, "a"), send_request(None, "b")]
+        )
+
+        assert response.status_code == 204
+        assert response.content == b""
+
+    asyncio.run(scenario())
+
+
+def test_invalid_batches_are_rejected():
+    async def scenario():
+        server = A2AServer(task_manager=EchoTaskManager())
+        empty = await post(server, [])
+        too_big = await post(
+            server, [send_request(i, f"t{i}") for i in range(MAX_BATCH_SIZE + 1)]
+        )
+
+        for response in (empty, too_big):
+            assert response.status_code == 400
+            assert response.json()["error"]["code"] == InvalidRequestError().code
+
+    asyncio.run(scenario())
+
+
+def parse_sse(body: str) -> list[tuple[int, dict]]:
+    events = []
+    for block in body.replace("\r\n", "\n").split("\n\n"):
+        fields = dict(
+            line.split(": ", 1) for line in block.splitlines() if ": " in line
+        )
+        if "data" in fields:
+            events.append((int(fields["id"]), json.loads(fields["data"])))
+    return events
+
+
+def test_last_event_id_header_resumes_the_stream():
+    async def scenario():
+        manager = EchoTaskManager()
+        server = A2AServer(task_manager=manager)
+        await manager.upsert_task(
+            TaskSendParams.model_validate(send_request(None, "t")["params"])
+        )
+        for state, final in [
+            (TaskState.WORKING, False),
+            (TaskState.WORKING, False),
+            (TaskState.COMPLETED, True),
+        ]:
+            await manager.enqueue_events_for_sse(
+                "t",
+                TaskStatusUpdateEvent(id="t", status=TaskStatus(state=state), final=final),
+            )
+        first_id = manager.task_event_logs["t"][0].id
+
+        response = await post(
+            server,
+            {"jsonrpc": "2.0", "id": 1, "method": "tasks/resubscribe", "params": {"id": "t"}},
+            headers={"Last-Event-ID": str(first_id)},
+        )
+
+        events = parse_sse(response.text)
+        assert [event_id for event_id, _ in events] == [first_id + 1, first_id + 2]
+        assert events[-1][1]["result"]["final"] is True
+
+    asyncio.run(scenario())
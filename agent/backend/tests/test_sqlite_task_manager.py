@@ -0,0 +1,115 @@
+import asyncio
+
+from benchmarks.utils import EchoTaskManager
+from common.server import SQLiteTaskManager
+from common.server.sqlite_task_manager import INTERRUPTED_TASK_MESSAGE
+from common.types import (
+    Message,
+    PushNotificationConfig,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+
+
+class SQLiteEchoTaskManager(EchoTaskManager, SQLiteTaskManager):
+    pass
+
+
+def send_params(task_id: str) -> TaskSendParams:
+    return TaskSendParams(
+        id=task_id,
+        sessionId="session",
+        message=Message(role="user", parts=[TextPart(text="hello")]),
+    )
+
+
+async def add_task(manager, task_id: str, state: TaskState | None = None):
+    await manager.upsert_task(send_params(task_id))
+    if state is not None:
+        await manager.update_store(task_id, TaskStatus(state=state), None)
+    return await manager.get_task(task_id)
+
+
+def test_tasks_survive_a_restart(tmp_path):
+    db_path = str(tmp_path / "tasks.db")
+
+    async def scenario():
+        manager = SQLiteEchoTaskManager(db_path=db_path)
+        await add_task(manager, "done", TaskState.COMPLETED)
+        await manager.set_push_notification_info(
+            "done", PushNotificationConfig(url="https://example.com/hook")
+        )
+        await manager.aclose()
+
+        restarted = SQLiteEchoTaskManager(db_path=db_path)
+        task = await restarted.get_task("done")
+        assert task.status.state == TaskState.COMPLETED
+        assert [message.parts[0].text for message in task.history] == ["hello"]
+        push_config = await restarted.get_push_notification_info("done")
+        assert push_config.url == "https://example.com/hook"
+        assert await restarted.get_task("missing") is None
+        await restarted.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_restart_fails_interrupted_tasks(tmp_path):
+    db_path = str(tmp_path / "tasks.db")
+
+    async def scenario():
+        manager = SQLiteEchoTaskManager(db_path=db_path)
+        versions = {}
+        for task_id, state in [
+            ("submitted", None),
+            ("working", TaskState.WORKING),
+            ("waiting", TaskState.INPUT_REQUIRED),
+            ("done", TaskState.COMPLETED),
+        ]:
+            versions[task_id] = (await add_task(manager, task_id, state)).version
+        await manager.aclose()
+
+        restarted = SQLiteEchoTaskManager(db_path=db_path)
+        for task_id in ("submitted", "working"):
+            task = await restarted.get_task(task_id)
+            assert task.status.state == TaskState.FAILED
+            assert task.status.message.parts[0].text == INTERRUPTED_TASK_MESSAGE
+            # Long-polling clients see the change.
+            assert task.version > versions[task_id]
+        for task_id, state in [
+            ("waiting", TaskState.INPUT_REQUIRED),
+            ("done", TaskState.COMPLETED),
+        ]:
+            task = await restarted.get_task(task_id)
+            assert task.status.state == state
+            assert task.version == versions[task_id]
+        assert not restarted.interrupted_task_ids
+        await restarted.aclose()
+
+        # The failure was persisted, and nothing is left to fail.
+        reopened = SQLiteEchoTaskManager(db_path=db_path)
+        task = await reopened.get_task("working")
+        assert task.status.state == TaskState.FAILED
+        assert not reopened.interrupted_task_ids
+        await reopened.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_evicted_tasks_are_read_back_from_disk(tmp_path):
+    db_path = str(tmp_path / "tasks.db")
+
+    async def scenario():
+        manager = SQLiteEchoTaskManager(
+            db_path=db_path, max_tasks=1, terminal_task_ttl=None
+        )
+        await add_task(manager, "first", TaskState.COMPLETED)
+        await add_task(manager, "second", TaskState.COMPLETED)
+        assert "first" not in manager.tasks
+
+        task = await manager.get_task("first")
+        assert task.status.state == TaskState.COMPLETED
+        await manager.aclose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,426 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from benchmarks.utils import EchoTaskManager
+from common.server.task_manager import LoggedEvent, SSESubscriber
+from common.types import (
+    Artifact,
+    CancelTaskRequest,
+    GetTaskRequest,
+    Message,
+    StreamOverflowError,
+    TaskArtifactUpdateEvent,
+    TaskNotCancelableError,
+    TaskNotFoundError,
+    TaskResubscriptionRequest,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+
+
+def send_params(task_id: str, session_id: str = "session") -> TaskSendParams:
+    return TaskSendParams(
+        id=task_id,
+        sessionId=session_id,
+        message=Message(role="user", parts=[TextPart(text="hello")]),
+    )
+
+
+def status_event(task_id: str, state: TaskState, final: bool = False):
+    return TaskStatusUpdateEvent(
+        id=task_id, status=TaskStatus(state=state), final=final
+    )
+
+
+def artifact_event(task_id: str):
+    return TaskArtifactUpdateEvent(
+        id=task_id, artifact=Artifact(parts=[TextPart(text="chunk")])
+    )
+
+
+async def add_task(manager, task_id: str, state: TaskState | None = None):
+    await manager.upsert_task(send_params(task_id))
+    if state is not None:
+        await manager.update_store(task_id, TaskStatus(state=state), None)
+
+
+async def collect(stream) -> list[dict]:
+    return [json.loads(event.data) async for event in stream]
+
+
+# Eviction
+
+
+def test_eviction_drops_finished_tasks_first():
+    async def scenario():
+        manager = EchoTaskManager(max_tasks=3, terminal_task_ttl=None)
+        await add_task(manager, "done", TaskState.COMPLETED)
+        await add_task(manager, "working", TaskState.WORKING)
+        await add_task(manager, "waiting", TaskState.INPUT_REQUIRED)
+        await add_task(manager, "new")
+
+        assert await manager.get_task("done") is None
+        assert manager.eviction_counts["terminal"] == 1
+        assert list(manager.tasks) == ["working", "waiting", "new"]
+
+    asyncio.run(scenario())
+
+
+def test_eviction_keeps_tasks_in_progress():
+    async def scenario():
+        manager = EchoTaskManager(max_tasks=2, terminal_task_ttl=None)
+        await add_task(manager, "working", TaskState.WORKING)
+        await add_task(manager, "waiting", TaskState.INPUT_REQUIRED)
+        await add_task(manager, "submitted")
+
+        # The idle input-required task goes; the working one stays.
+        assert list(manager.tasks) == ["working", "submitted"]
+        assert manager.eviction_counts["idle"] == 1
+        assert not manager.over_capacity
+
+        await add_task(manager, "another")
+        assert len(manager.tasks) == 3
+        assert manager.over_capacity
+
+    asyncio.run(scenario())
+
+
+def test_eviction_skips_tasks_with_subscribers():
+    async def scenario():
+        manager = EchoTaskManager(max_tasks=1, terminal_task_ttl=None)
+        await add_task(manager, "streamed", TaskState.INPUT_REQUIRED)
+        await manager.setup_sse_consumer("streamed")
+        await add_task(manager, "new")
+
+        assert "streamed" in manager.tasks
+        assert manager.over_capacity
+
+    asyncio.run(scenario())
+
+
+def test_finished_tasks_expire():
+    async def scenario():
+        manager = EchoTaskManager(terminal_task_ttl=0.05)
+        await add_task(manager, "done", TaskState.COMPLETED)
+        await asyncio.sleep(0.1)
+        await add_task(manager, "new")
+
+        assert await manager.get_task("done") is None
+        assert manager.eviction_counts["expired"] == 1
+
+    asyncio.run(scenario())
+
+
+# SSE overflow policies
+
+
+def offer_all(subscriber: SSESubscriber, events):
+    for event_id, event in enumerate(events, start=1):
+        subscriber.offer(LoggedEvent.encode(event_id, event))
+
+
+def queued_ids(subscriber: SSESubscriber) -> list[int]:
+    return [logged_event.id for logged_event, _ in subscriber.events]
+
+
+def test_drop_oldest_discards_the_oldest_event():
+    subscriber = SSESubscriber("t", maxsize=2, overflow_policy="drop_oldest")
+    offer_all(subscriber, [status_event("t", TaskState.WORKING)] * 3)
+
+    assert queued_ids(subscriber) == [2, 3]
+    assert subscriber.dropped == 1
+
+
+def test_coalesce_replaces_queued_status_updates():
+    subscriber = SSESubscriber("t", maxsize=2, overflow_policy="coalesce")
+    offer_all(
+        subscriber,
+        [
+            artifact_event("t"),
+            status_event("t", TaskState.WORKING),
+            status_event("t", TaskState.COMPLETED, final=True),
+        ],
+    )
+
+    assert queued_ids(subscriber) == [1, 3]
+    assert subscriber.coalesced == 1
+    assert subscriber.dropped == 0
+
+
+def test_coalesce_falls_back_to_drop_oldest():
+    subscriber = SSESubscriber("t", maxsize=2, overflow_policy="coalesce")
+    offer_all(subscriber, [artifact_event("t")] * 3)
+
+    assert queued_ids(subscriber) == [2, 3]
+    assert subscriber.dropped == 1
+
+
+def test_disconnect_ends_the_stream_with_an_error():
+    async def scenario():
+        subscriber = SSESubscriber("t", maxsize=2, overflow_policy="disconnect")
+        offer_all(subscriber, [status_event("t", TaskState.WORKING)] * 2)
+        assert (await subscriber.get()).id == 1
+
+        for event_id in (3, 4, 5):
+            subscriber.offer(
+                LoggedEvent.encode(event_id, status_event("t", TaskState.WORKING))
+            )
+
+        assert subscriber.disconnected
+        assert subscriber.dropped == 2
+        error = await subscriber.get()
+        assert isinstance(error.event, StreamOverflowError)
+        # A resubscribe from this id replays what was discarded.
+        assert error.id == 1
+        assert not subscriber.events
+
+    asyncio.run(scenario())
+
+
+def test_disconnected_stream_sends_overflow_error():
+    async def scenario():
+        manager = EchoTaskManager(sse_queue_size=2, sse_overflow_policy="disconnect")
+        await add_task(manager, "t", TaskState.WORKING)
+        subscriber = await manager.setup_sse_consumer("t")
+        for _ in range(3):
+            await manager.enqueue_events_for_sse(
+                "t", status_event("t", TaskState.WORKING)
+            )
+
+        events = await collect(manager.dequeue_events_for_sse(1, "t", subscriber))
+        assert [event["error"]["code"] for event in events] == [
+            StreamOverflowError().code
+        ]
+        assert not manager.task_sse_subscribers["t"]
+
+    asyncio.run(scenario())
+
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError):
+        EchoTaskManager(sse_overflow_policy="block")
+
+
+# Resubscription replay
+
+
+async def logged_stream(manager, task_id: str) -> list[int]:
+    """Log a working, an artifact and a final event; return their ids."""
+    await add_task(manager, task_id, TaskState.WORKING)
+    events = [
+        status_event(task_id, TaskState.WORKING),
+        artifact_event(task_id),
+        status_event(task_id, TaskState.COMPLETED, final=True),
+    ]
+    for event in events:
+        await manager.enqueue_events_for_sse(task_id, event)
+    return [logged_event.id for logged_event in manager.task_event_logs[task_id]]
+
+
+def test_resubscribe_replays_events_after_last_event_id():
+    async def scenario():
+        manager = EchoTaskManager()
+        event_ids = await logged_stream(manager, "t")
+        request = TaskResubscriptionRequest(
+            id=1, params={"id": "t", "lastEventId": event_ids[0]}
+        )
+
+        stream = await manager.on_resubscribe_to_task(request)
+        events = await collect(stream)
+
+        assert "artifact" in events[0]["result"]
+        assert events[1]["result"]["final"] is True
+        assert len(events) == 2
+
+    asyncio.run(scenario())
+
+
+def test_resubscribe_after_the_end_resends_the_final_event():
+    async def scenario():
+        manager = EchoTaskManager()
+        event_ids = await logged_stream(manager, "t")
+        request = TaskResubscriptionRequest(
+            id=1, params={"id": "t", "lastEventId": event_ids[-1]}
+        )
+
+        events = await collect(await manager.on_resubscribe_to_task(request))
+
+        assert len(events) == 1
+        assert events[0]["result"]["final"] is True
+
+    asyncio.run(scenario())
+
+
+def test_resubscribe_without_event_log_sends_current_status():
+    async def scenario():
+        manager = EchoTaskManager()
+        await add_task(manager, "t", TaskState.COMPLETED)
+        request = TaskResubscriptionRequest(id=1, params={"id": "t"})
+
+        events = await collect(await manager.on_resubscribe_to_task(request))
+
+        assert len(events) == 1
+        assert events[0]["result"]["status"]["state"] == "completed"
+        assert events[0]["result"]["final"] is True
+
+    asyncio.run(scenario())
+
+
+def test_resubscribe_to_unknown_task():
+    async def scenario():
+        manager = EchoTaskManager()
+        request = TaskResubscriptionRequest(id=1, params={"id": "missing"})
+
+        response = await manager.on_resubscribe_to_task(request)
+
+        assert response.error.code == TaskNotFoundError().code
+
+    asyncio.run(scenario())
+
+
+# Cancellation
+
+
+def test_cancel_stops_the_running_agent():
+    async def scenario():
+        manager = EchoTaskManager()
+        await add_task(manager, "t", TaskState.WORKING)
+        agent_run = manager.track_running_task("t", asyncio.sleep(60))
+        await asyncio.sleep(0)
+
+        response = await manager.on_cancel_task(
+            CancelTaskRequest(id=1, params={"id": "t"})
+        )
+
+        assert response.result.status.state == TaskState.CANCELED
+        with pytest.raises(asyncio.CancelledError):
+            await agent_run
+        assert "t" not in manager.running_tasks
+
+    asyncio.run(scenario())
+
+
+def test_update_after_cancel_is_ignored():
+    async def scenario():
+        manager = EchoTaskManager()
+        await add_task(manager, "t", TaskState.WORKING)
+        await manager.on_cancel_task(CancelTaskRequest(id=1, params={"id": "t"}))
+
+        task = await manager.update_store(
+            "t", TaskStatus(state=TaskState.COMPLETED), None
+        )
+
+        assert task.status.state == TaskState.CANCELED
+
+    asyncio.run(scenario())
+
+
+def test_cancel_sends_final_event_to_subscribers():
+    async def scenario():
+        manager = EchoTaskManager()
+        await add_task(manager, "t", TaskState.WORKING)
+        subscriber = await manager.setup_sse_consumer("t")
+
+        await manager.on_cancel_task(CancelTaskRequest(id=1, params={"id": "t"}))
+
+        events = await collect(manager.dequeue_events_for_sse(1, "t", subscriber))
+        assert events[-1]["result"]["status"]["state"] == "canceled"
+        assert events[-1]["result"]["final"] is True
+
+    asyncio.run(scenario())
+
+
+def test_cancel_finished_or_unknown_task():
+    async def scenario():
+        manager = EchoTaskManager()
+        await add_task(manager, "done", TaskState.COMPLETED)
+
+        finished = await manager.on_cancel_task(
+            CancelTaskRequest(id=1, params={"id": "done"})
+        )
+        unknown = await manager.on_cancel_task(
+            CancelTaskRequest(id=2, params={"id": "missing"})
+        )
+
+        assert finished.error.code == TaskNotCancelableError().code
+        assert unknown.error.code == TaskNotFoundError().code
+
+    asyncio.run(scenario())
+
+
+# Long-polling tasks/get
+
+
+def test_long_poll_times_out_with_the_unchanged_task():
+    async def scenario():
+        manager = EchoTaskManager()
+        await add_task(manager, "t", TaskState.WORKING)
+        version = (await manager.get_task("t")).version
+        request = GetTaskRequest(
+            id=1, params={"id": "t", "sinceVersion": version, "waitTimeout": 0.1}
+        )
+
+        start = time.monotonic()
+        response = await manager.on_get_task(request)
+
+        assert time.monotonic() - start >= 0.1
+        assert response.result.version == version
+        assert not manager.task_conditions
+
+    asyncio.run(scenario())
+
+
+def test_long_poll_wakes_up_on_change():
+    async def scenario():
+        manager = EchoTaskManager()
+        await add_task(manager, "t", TaskState.WORKING)
+        version = (await manager.get_task("t")).version
+        request = GetTaskRequest(
+            id=1, params={"id": "t", "sinceVersion": version, "waitTimeout": 10}
+        )
+
+        start = time.monotonic()
+        poll = asyncio.create_task(manager.on_get_task(request))
+        await asyncio.sleep(0.05)
+        assert not poll.done()
+        await manager.update_store("t", TaskStatus(state=TaskState.COMPLETED), None)
+        response = await poll
+
+        assert time.monotonic() - start < 5
+        assert response.result.version > version
+        assert response.result.status.state == TaskState.COMPLETED
+
+    asyncio.run(scenario())
+
+
+def test_long_poll_answers_newer_or_finished_tasks_at_once():
+    async def scenario():
+        manager = EchoTaskManager()
+        await add_task(manager, "working", TaskState.WORKING)
+        await add_task(manager, "done", TaskState.COMPLETED)
+
+        start = time.monotonic()
+        newer = await manager.on_get_task(
+            GetTaskRequest(
+                id=1, params={"id": "working", "sinceVersion": 0, "waitTimeout": 10}
+            )
+        )
+        done_version = (await manager.get_task("done")).version
+        done = await manager.on_get_task(
+            GetTaskRequest(
+                id=2,
+                params={"id": "done", "sinceVersion": done_version, "waitTimeout": 10},
+            )
+        )
+
+        assert time.monotonic() - start < 5
+        assert newer.result.status.state == TaskState.WORKING
+        assert done.result.status.state == TaskState.COMPLETED
+
+    asyncio.run(scenario())